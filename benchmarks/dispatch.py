@@ -0,0 +1,91 @@
+# benchmarks/dispatch.py
+"""
+Measure MacComputer dispatch overhead against the in-memory fake backend.
+
+Usage: python -m benchmarks.dispatch [--calls N]
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from src.tools.computer import MacComputer
+from src.tools.fake_backend import FakeBackend
+from src.utils.logger import logger
+
+CASES = [
+    ("get_position", {"action": "get_position"}),
+    ("mouse_move", {"action": "mouse_move", "x": 100, "y": 100}),
+    ("click", {"action": "click", "x": 200, "y": 150}),
+    ("type short", {"action": "type", "text": "hello"}),
+    ("hotkey", {"action": "hotkey", "keys": ["command", "space"]}),
+]
+
+def make_computer(width: int = 1440, height: int = 900) -> MacComputer:
+    """A computer on the fake backend with no settle waits or screenshot storage"""
+    computer = MacComputer(
+        backend=FakeBackend(width=width, height=height),
+        save_screenshots=False,
+        frame_diff=False
+    )
+    computer.settle = None
+    return computer
+
+async def _time_calls(computer: MacComputer, action: dict, calls: int) -> list:
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        result = await computer(**action)
+        timings.append(time.perf_counter() - start)
+        if result.error:
+            raise RuntimeError(result.error)
+    return timings
+
+async def _run(calls: int) -> list[dict]:
+    computer = make_computer()
+    try:
+        rows = []
+        for name, action in CASES:
+            timings = await _time_calls(computer, action, calls)
+            rows.append(_row(name, timings))
+
+        # Twenty actions per batch, so per-action cost includes coalescing
+        actions = [dict(action) for _, action in CASES] * 4
+        timings = []
+        for _ in range(max(1, calls // 20)):
+            start = time.perf_counter()
+            await computer.batch(actions, settle=False)
+            timings.append((time.perf_counter() - start) / len(actions))
+        rows.append(_row("batch per action", timings))
+        return rows
+    finally:
+        computer.close()
+
+def _row(name: str, timings: list) -> dict:
+    return {
+        "name": name,
+        "median_ms": statistics.median(timings) * 1000,
+        "p95_ms": _percentile(timings, 95) * 1000,
+        "calls": len(timings),
+    }
+
+def _percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(q / 100 * (len(ordered) - 1)))]
+
+def run(calls: int = 500) -> list[dict]:
+    """Time each action type end to end through __call__, and batches"""
+    return asyncio.run(_run(calls))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=500)
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+
+    print(f"{'action':<18}{'median ms':>12}{'p95 ms':>10}{'calls':>8}")
+    for row in run(args.calls):
+        print(f"{row['name']:<18}{row['median_ms']:>12.3f}{row['p95_ms']:>10.3f}{row['calls']:>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# benchmarks/encoding.py
+"""
+Compare screenshot encoding formats by size and time.
+
+Usage: python -m benchmarks.encoding [--repeat N]
+"""
+import argparse
+import statistics
+from src.tools.encoding import EncodingOptions, encode_image
+from .synthetic import make_screenshot
+
+CASES = [
+    ("png", EncodingOptions(format="png")),
+    ("png@1280", EncodingOptions(format="png", max_dimension=1280)),
+    ("jpeg q85", EncodingOptions(format="jpeg", quality=85)),
+    ("jpeg q85@1280", EncodingOptions(format="jpeg", quality=85, max_dimension=1280)),
+    ("webp q80", EncodingOptions(format="webp", quality=80)),
+    ("webp q80@1280", EncodingOptions(format="webp", quality=80, max_dimension=1280)),
+]
+
+def run(repeat: int = 5, width: int = 2880, height: int = 1800) -> list[dict]:
+    """Encode a synthetic screenshot with every case and collect bytes and timings"""
+    image = make_screenshot(width, height)
+    rows = []
+    for name, options in CASES:
+        timings = []
+        for _ in range(repeat):
+            encoded = encode_image(image, options)
+            timings.append(encoded.encode_time * 1000)
+        rows.append({
+            "name": name,
+            "bytes": len(encoded.data),
+            "base64_bytes": len(encoded.base64),
+            "median_ms": statistics.median(timings),
+            "min_ms": min(timings),
+        })
+    return rows
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--width", type=int, default=2880)
+    parser.add_argument("--height", type=int, default=1800)
+    args = parser.parse_args()
+
+    print(f"{'format':<16}{'bytes':>12}{'base64':>12}{'median ms':>12}{'min ms':>10}")
+    for row in run(args.repeat, args.width, args.height):
+        print(f"{row['name']:<16}{row['bytes']:>12,}{row['base64_bytes']:>12,}"
+              f"{row['median_ms']:>12.1f}{row['min_ms']:>10.1f}")
+
+if __name__ == "__main__":
+    main()
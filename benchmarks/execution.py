@@ -0,0 +1,77 @@
+# benchmarks/execution.py
+"""
+Measure workflow execution wall-clock on the fake backend, with step delays
+and settle waits removed so only engine overhead is timed.
+
+Usage: python -m benchmarks.execution [--steps 10,50,200] [--repeat N]
+"""
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import tempfile
+import time
+from src.agent.workflow_runner import WorkflowRunner
+from src.utils.logger import logger
+from src.workflows.manager import WorkflowManager
+from .dispatch import make_computer
+from .storage import record_steps
+
+DEFAULT_STEPS = [10, 50, 200]
+
+def save_workflow(manager: WorkflowManager, steps: int) -> str:
+    """A recorded workflow of the given length ending in a screenshot, without delays"""
+    manager.start_recording()
+    record_steps(manager, steps - 1, random.Random(steps))
+    manager.add_step({"action": "screenshot"})
+    for step in manager.current_recording:
+        step.delay = 0.0
+    return manager.save_workflow(name=f"{steps} steps", description="Execution benchmark")
+
+async def _run(step_counts: list, repeat: int) -> list[dict]:
+    computer = make_computer()
+    try:
+        with tempfile.TemporaryDirectory() as storage_dir:
+            manager = WorkflowManager(storage_dir=storage_dir)
+            runner = WorkflowRunner(manager, computer)
+            rows = []
+            for steps in step_counts:
+                workflow_id = save_workflow(manager, steps)
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    result = await runner.run(workflow_id)
+                    timings.append(time.perf_counter() - start)
+                    if result.error:
+                        raise RuntimeError(result.error)
+                rows.append({
+                    "name": f"{steps} steps",
+                    "steps": steps,
+                    "median_ms": statistics.median(timings) * 1000,
+                    "min_ms": min(timings) * 1000,
+                    "per_step_ms": statistics.median(timings) * 1000 / steps,
+                })
+            return rows
+    finally:
+        computer.close()
+
+def run(step_counts: list = DEFAULT_STEPS, repeat: int = 5) -> list[dict]:
+    """Run saved workflows of each length end to end through WorkflowRunner"""
+    return asyncio.run(_run(step_counts, repeat))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", default=",".join(map(str, DEFAULT_STEPS)))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+
+    step_counts = [int(steps) for steps in args.steps.split(",")]
+    print(f"{'workflow':<14}{'median ms':>12}{'min ms':>10}{'per step ms':>13}")
+    for row in run(step_counts, args.repeat):
+        print(f"{row['name']:<14}{row['median_ms']:>12.1f}{row['min_ms']:>10.1f}"
+              f"{row['per_step_ms']:>13.3f}")
+
+if __name__ == "__main__":
+    main()
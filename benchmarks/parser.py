@@ -0,0 +1,60 @@
+# benchmarks/parser.py
+"""
+Measure action parser throughput on large synthetic model responses.
+
+Usage: python -m benchmarks.parser [--lines N] [--repeat N]
+"""
+import argparse
+import statistics
+import time
+from src.agent.action_parser import ActionParser, parse_actions
+from .synthetic import make_response
+
+CHUNK_SIZES = [16, 256]
+
+def _whole(text: str) -> int:
+    return len(parse_actions(text))
+
+def _chunked(size: int):
+    def parse(text: str) -> int:
+        parser = ActionParser()
+        count = 0
+        for i in range(0, len(text), size):
+            count += len(parser.feed(text[i:i + size]))
+        return count + len(parser.close())
+    return parse
+
+def run(lines: int = 20000, repeat: int = 5) -> list[dict]:
+    """Parse one response whole and in streamed chunks, timing each"""
+    text = make_response(lines)
+    cases = [("whole", _whole)] + [(f"chunks of {n}", _chunked(n)) for n in CHUNK_SIZES]
+    rows = []
+    for name, parse in cases:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            actions = parse(text)
+            timings.append(time.perf_counter() - start)
+        median = statistics.median(timings)
+        rows.append({
+            "name": name,
+            "actions": actions,
+            "median_ms": median * 1000,
+            "mb_per_s": len(text) / median / 1e6,
+            "lines_per_s": lines / median,
+        })
+    return rows
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'mode':<16}{'actions':>10}{'median ms':>12}{'MB/s':>10}{'lines/s':>14}")
+    for row in run(args.lines, args.repeat):
+        print(f"{row['name']:<16}{row['actions']:>10,}{row['median_ms']:>12.1f}"
+              f"{row['mb_per_s']:>10.1f}{row['lines_per_s']:>14,.0f}")
+
+if __name__ == "__main__":
+    main()
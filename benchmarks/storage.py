@@ -0,0 +1,99 @@
+# benchmarks/storage.py
+"""
+Measure WorkflowManager list, load and save times as the number of stored
+workflows grows.
+
+Usage: python -m benchmarks.storage [--sizes 10,100,1000,10000] [--samples N]
+"""
+import argparse
+import logging
+import random
+import statistics
+import tempfile
+import time
+from src.utils.logger import logger
+from src.workflows.manager import WorkflowManager
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+
+def record_steps(manager: WorkflowManager, steps: int, rng: random.Random) -> None:
+    """Record a realistic mix of input steps into the current recording"""
+    for _ in range(steps):
+        kind = rng.choice(["mouse_move", "click", "type", "hotkey", "press_key"])
+        if kind in ("mouse_move", "click"):
+            action = {"action": kind, "x": rng.randrange(1440), "y": rng.randrange(900)}
+        elif kind == "type":
+            action = {"action": "type", "text": "lorem ipsum " * rng.randrange(1, 4)}
+        elif kind == "hotkey":
+            action = {"action": "hotkey", "keys": ["command", rng.choice("acvtw")]}
+        else:
+            action = {"action": "press_key", "key": rng.choice(["enter", "tab", "escape"])}
+        manager.add_step(action)
+
+def save_workflow(manager: WorkflowManager, index: int, steps: int, rng: random.Random) -> str:
+    manager.start_recording()
+    record_steps(manager, steps, rng)
+    return manager.save_workflow(
+        name=f"Workflow {index}",
+        description="Synthetic benchmark workflow",
+        tags=[f"group{index % 10}"]
+    )
+
+def run(sizes: list = DEFAULT_SIZES, samples: int = 20, steps: int = 12) -> list[dict]:
+    """Grow one store to each size in turn, timing list, load and save at each"""
+    rng = random.Random(0)
+    rows = []
+    with tempfile.TemporaryDirectory() as storage_dir:
+        manager = WorkflowManager(storage_dir=storage_dir)
+        ids = []
+        for size in sorted(sizes):
+            while len(ids) < size:
+                ids.append(save_workflow(manager, len(ids), steps, rng))
+
+            start = time.perf_counter()
+            manager.list_summaries()
+            summaries = time.perf_counter() - start
+
+            # Listing every full workflow is linear in the store; time it once
+            start = time.perf_counter()
+            manager.list_workflows(tag="group0")
+            listed = time.perf_counter() - start
+
+            loads = []
+            for workflow_id in rng.sample(ids, min(samples, len(ids))):
+                start = time.perf_counter()
+                manager.load_workflow(workflow_id)
+                loads.append(time.perf_counter() - start)
+
+            saves = []
+            for _ in range(samples):
+                start = time.perf_counter()
+                ids.append(save_workflow(manager, len(ids), steps, rng))
+                saves.append(time.perf_counter() - start)
+            # Samples saved here count towards the next size
+            rows.append({
+                "name": f"{size} workflows",
+                "workflows": size,
+                "list_summaries_ms": summaries * 1000,
+                "list_tag_ms": listed * 1000,
+                "load_median_ms": statistics.median(loads) * 1000,
+                "save_median_ms": statistics.median(saves) * 1000,
+            })
+    return rows
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)))
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--steps", type=int, default=12)
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    print(f"{'store':<18}{'summaries ms':>14}{'list tag ms':>13}{'load ms':>10}{'save ms':>10}")
+    for row in run(sizes, args.samples, args.steps):
+        print(f"{row['name']:<18}{row['list_summaries_ms']:>14.1f}{row['list_tag_ms']:>13.1f}"
+              f"{row['load_median_ms']:>10.2f}{row['save_median_ms']:>10.2f}")
+
+if __name__ == "__main__":
+    main()
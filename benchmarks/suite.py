@@ -0,0 +1,160 @@
+# benchmarks/suite.py
+"""
+Run every benchmark into one JSON results file, and compare results files.
+
+Usage:
+    python -m benchmarks.suite run [--quick] [--only GROUP,...] [--output PATH]
+    python -m benchmarks.suite compare BASELINE [CURRENT] [--threshold 0.2]
+
+compare exits with status 1 when any timing slowed down by more than the
+threshold fraction and by at least --min-delta milliseconds, so it can gate
+CI against a saved baseline.
+"""
+import argparse
+import json
+import logging
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+from src.utils.logger import logger
+from . import dispatch, encoding, execution, parser, storage
+
+DEFAULT_OUTPUT = "data/benchmarks/latest.json"
+RESOLUTIONS = [(1280, 800), (1920, 1080), (2880, 1800)]
+
+def _encoding(quick: bool) -> List[dict]:
+    rows = []
+    for width, height in RESOLUTIONS[:1] if quick else RESOLUTIONS:
+        for row in encoding.run(repeat=2 if quick else 5, width=width, height=height):
+            rows.append({**row, "name": f"{width}x{height} {row['name']}"})
+    return rows
+
+GROUPS: Dict[str, Callable[[bool], List[dict]]] = {
+    "dispatch": lambda quick: dispatch.run(calls=100 if quick else 500),
+    "encoding": _encoding,
+    "parser": lambda quick: parser.run(lines=2000 if quick else 20000, repeat=3 if quick else 5),
+    "storage": lambda quick: storage.run(
+        sizes=[10, 100, 1000] if quick else [10, 100, 1000, 10000],
+        samples=5 if quick else 20
+    ),
+    "execution": lambda quick: execution.run(
+        step_counts=[10, 50] if quick else execution.DEFAULT_STEPS, repeat=2 if quick else 5
+    ),
+}
+
+def run_suite(groups: List[str], quick: bool = False) -> dict:
+    """Results of the given groups keyed by "group/name", with run metadata"""
+    results = {}
+    for group in groups:
+        start = time.perf_counter()
+        for row in GROUPS[group](quick):
+            results[f"{group}/{row['name']}"] = row
+        print(f"{group}: {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "quick": quick,
+            "groups": groups,
+        },
+        "results": results,
+    }
+
+def timings(results: dict) -> Dict[str, float]:
+    """Every millisecond timing in a results file, keyed by "group/name:field\""""
+    return {
+        f"{key}:{field}": value
+        for key, row in results["results"].items()
+        for field, value in row.items()
+        if field.endswith("_ms") and isinstance(value, (int, float))
+    }
+
+def compare(
+    baseline: dict,
+    current: dict,
+    threshold: float = 0.2,
+    min_delta: float = 0.05
+) -> List[dict]:
+    """Timings present in both files, with their ratio and whether they regressed
+
+    Sub-millisecond timings jitter by more than any useful threshold, so a
+    regression must also be at least min_delta milliseconds slower.
+    """
+    before, after = timings(baseline), timings(current)
+    rows = []
+    for key in sorted(before.keys() & after.keys()):
+        ratio = after[key] / before[key] if before[key] > 0 else 1.0
+        rows.append({
+            "key": key,
+            "baseline_ms": before[key],
+            "current_ms": after[key],
+            "ratio": ratio,
+            "regressed": ratio > 1 + threshold and after[key] - before[key] >= min_delta,
+        })
+    return rows
+
+def _load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+def _run_command(args: argparse.Namespace) -> int:
+    groups = args.only.split(",") if args.only else list(GROUPS)
+    unknown = [group for group in groups if group not in GROUPS]
+    if unknown:
+        print(f"Unknown benchmark groups: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(run_suite(groups, args.quick), indent=2))
+    print(f"Wrote {output}")
+    return 0
+
+def _compare_command(args: argparse.Namespace) -> int:
+    rows = compare(
+        _load(args.baseline), _load(args.current), args.threshold, args.min_delta
+    )
+    if not rows:
+        print("No timings in common", file=sys.stderr)
+        return 2
+    width = max(len(row["key"]) for row in rows)
+    print(f"{'benchmark':<{width}}{'baseline':>12}{'current':>12}{'ratio':>8}")
+    for row in rows:
+        flag = "  REGRESSED" if row["regressed"] else ""
+        print(f"{row['key']:<{width}}{row['baseline_ms']:>12.3f}{row['current_ms']:>12.3f}"
+              f"{row['ratio']:>8.2f}{flag}")
+    regressed = sum(row["regressed"] for row in rows)
+    print(f"{regressed} of {len(rows)} timings regressed by more than {args.threshold:.0%}")
+    return 1 if regressed else 0
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = argparser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run benchmarks and write JSON results")
+    run_parser.add_argument("--quick", action="store_true", help="Smaller inputs for a fast check")
+    run_parser.add_argument("--only", help=f"Comma-separated groups from: {', '.join(GROUPS)}")
+    run_parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    run_parser.set_defaults(handler=_run_command)
+
+    compare_parser = commands.add_parser("compare", help="Compare results against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current", nargs="?", default=DEFAULT_OUTPUT)
+    compare_parser.add_argument("--threshold", type=float, default=0.2,
+                                help="Allowed slowdown as a fraction (default 0.2)")
+    compare_parser.add_argument("--min-delta", type=float, default=0.05,
+                                help="Ignore slowdowns smaller than this many ms (default 0.05)")
+    compare_parser.set_defaults(handler=_compare_command)
+
+    args = argparser.parse_args()
+    logger.setLevel(logging.WARNING)
+    sys.exit(args.handler(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# benchmarks/synthetic.py
+import random
+from PIL import Image, ImageDraw
+
+def make_screenshot(width: int = 2880, height: int = 1800, seed: int = 0) -> Image.Image:
+    """Draw a desktop-like frame with windows, text lines and a gradient wallpaper"""
+    rng = random.Random(seed)
+    image = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    draw = ImageDraw.Draw(image)
+
+    # Menu bar
+    draw.rectangle([0, 0, width, height // 40], fill=(236, 236, 236))
+
+    for _ in range(6):
+        x0 = rng.randrange(0, width // 2)
+        y0 = rng.randrange(height // 40, height // 2)
+        x1 = min(width - 1, x0 + rng.randrange(width // 4, width // 2))
+        y1 = min(height - 1, y0 + rng.randrange(height // 4, height // 2))
+        draw.rectangle([x0, y0, x1, y1], fill=(250, 250, 250), outline=(180, 180, 180))
+        draw.rectangle([x0, y0, x1, y0 + 28], fill=(225, 225, 225))
+        for line_y in range(y0 + 40, y1 - 16, 22):
+            line_width = rng.randrange(40, max(41, x1 - x0 - 20))
+            draw.text((x0 + 12, line_y), "Lorem ipsum dolor sit amet " * (line_width // 160 + 1),
+                      fill=(30, 30, 30))
+
+    return image
+
+RESPONSE_LINES = [
+    "Move the mouse to {x}, {y}",
+    "Click at {x}, {y}",
+    "Double-click the {word} icon",
+    "Now I'll type \"{text}\" into the field",
+    "Press Command + {key}",
+    "Press the Enter key.",
+    "Take a screenshot to confirm the result",
+    "The {word} window should now be visible on the left side of the screen.",
+    "If that fails, we can try a different approach.",
+]
+
+WORDS = ["Safari", "Finder", "Notes", "Terminal", "Mail", "Preview", "Calendar"]
+
+def make_response(lines: int = 10000, seed: int = 0) -> str:
+    """Model-style text mixing action instructions and prose"""
+    rng = random.Random(seed)
+    return "\n".join(
+        rng.choice(RESPONSE_LINES).format(
+            x=rng.randrange(0, 1440),
+            y=rng.randrange(0, 900),
+            word=rng.choice(WORDS),
+            text=" ".join(rng.choices(WORDS, k=rng.randrange(1, 6))),
+            key=rng.choice("acstvwxz"),
+        )
+        for _ in range(lines)
+    )
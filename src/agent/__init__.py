@@ -3,11 +3,26 @@
 Agent module for handling AI interactions and computer control.
 """
 
+from .action_parser import Action, ActionParser, parse_actions
+from .conversation import ConversationMemory
 from .enhanced_agent import EnhancedComputerAgent
 from .mac_shortcuts import MAC_SHORTCUTS, get_shortcut
+from .request_builder import RequestBuilder
+from .response_cache import ResponseCache
+from .workflow_compiler import ExecutionPlan, WorkflowCompiler
+from .workflow_runner import WorkflowRunner
 
 __all__ = [
+    'Action',
+    'ActionParser',
+    'ConversationMemory',
     'EnhancedComputerAgent',
+    'ExecutionPlan',
+    'RequestBuilder',
+    'ResponseCache',
+    'WorkflowCompiler',
+    'WorkflowRunner',
     'MAC_SHORTCUTS',
     'get_shortcut',
+    'parse_actions',
 ]
\ No newline at end of file
@@ -0,0 +1,162 @@
+# src/agent/action_parser.py
+import re
+from dataclasses import asdict, dataclass
+from typing import Any, ClassVar, Dict, Iterable, List, Optional, Tuple
+
+@dataclass(frozen=True)
+class Action:
+    name: ClassVar[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Keyword arguments for MacComputer, without unset fields"""
+        fields = {k: list(v) if isinstance(v, tuple) else v
+                  for k, v in asdict(self).items() if v is not None}
+        return {"action": self.name, **fields}
+
+@dataclass(frozen=True)
+class MouseMove(Action):
+    name: ClassVar[str] = "mouse_move"
+    x: int
+    y: int
+
+@dataclass(frozen=True)
+class Click(Action):
+    name: ClassVar[str] = "click"
+    x: Optional[int] = None
+    y: Optional[int] = None
+
+@dataclass(frozen=True)
+class DoubleClick(Click):
+    name: ClassVar[str] = "double_click"
+
+@dataclass(frozen=True)
+class RightClick(Click):
+    name: ClassVar[str] = "right_click"
+
+@dataclass(frozen=True)
+class TypeText(Action):
+    name: ClassVar[str] = "type"
+    text: str
+
+@dataclass(frozen=True)
+class PressKey(Action):
+    name: ClassVar[str] = "press_key"
+    key: str
+
+@dataclass(frozen=True)
+class Hotkey(Action):
+    name: ClassVar[str] = "hotkey"
+    keys: Tuple[str, ...]
+
+@dataclass(frozen=True)
+class Screenshot(Action):
+    name: ClassVar[str] = "screenshot"
+
+# Every instruction keyword in one alternation behind a shared word boundary,
+# so a line is scanned once and most positions are rejected immediately
+KEYWORDS = re.compile(
+    r"\b(?:(?P<move>move\s+(?:the\s+)?(?:mouse|cursor)\b)"
+    r"|(?P<double_click>double[\s-]?click)"
+    r"|(?P<right_click>right[\s-]?click)"
+    r"|(?P<click>click)"
+    r"|(?P<type>typ(?:e|es|ing)\b)"
+    r"|(?P<press>press(?:es|ing)?\b)"
+    r"|(?P<screenshot>screen\s?shot))",
+    re.IGNORECASE
+)
+
+# When a line mentions several instructions the first kind listed wins
+PRIORITY = ("move", "double_click", "right_click", "click", "type", "press", "screenshot")
+
+CLICK_TYPES = {"click": Click, "double_click": DoubleClick, "right_click": RightClick}
+
+COORDINATES = re.compile(r"(\d+)\s*,\s*(\d+)")
+QUOTED = re.compile(r"(?<!\w)([\"'`])(.+?)\1(?!\w)")
+KEY = r"(?:\w+|[\[\]\-=;,./\\`'])"
+CHORD = re.compile(
+    rf"[\s\"'`]*(?:the\s+)?({KEY}(?:\s*\+\s*{KEY})*)", re.IGNORECASE
+)
+CHORD_SEPARATOR = re.compile(r"\s*\+\s*")
+
+KEY_ALIASES = {
+    "cmd": "command",
+    "ctrl": "control",
+    "opt": "option",
+    "alt": "option",
+    "return": "enter",
+    "esc": "escape",
+}
+
+class ActionParser:
+    """Incremental parser turning streamed model text into typed actions
+
+    Feed chunks as they arrive; each completed line yields at most one
+    action. Keywords are matched case-insensitively while typed text keeps
+    its original case.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self.lines = 0
+
+    def feed(self, chunk: str) -> List[Action]:
+        """Actions from every line completed by this chunk"""
+        self._buffer += chunk
+        if "\n" not in chunk:
+            return []
+        *lines, self._buffer = self._buffer.split("\n")
+        return self._parse_lines(lines)
+
+    def close(self) -> List[Action]:
+        """Actions from the final unterminated line"""
+        line, self._buffer = self._buffer, ""
+        return self._parse_lines([line]) if line else []
+
+    def _parse_lines(self, lines: Iterable[str]) -> List[Action]:
+        actions = []
+        for line in lines:
+            self.lines += 1
+            if action := parse_line(line):
+                actions.append(action)
+        return actions
+
+def parse_line(line: str) -> Optional[Action]:
+    """The action described by one line of model output, if any"""
+    found: Dict[str, re.Match] = {}
+    for match in KEYWORDS.finditer(line):
+        found.setdefault(match.lastgroup, match)
+    if not found:
+        return None
+    kind = min(found, key=PRIORITY.index)
+    rest = line[found[kind].end():]
+
+    if kind == "move":
+        if coords := COORDINATES.search(rest):
+            return MouseMove(int(coords.group(1)), int(coords.group(2)))
+        return None
+
+    if cls := CLICK_TYPES.get(kind):
+        if coords := COORDINATES.search(rest):
+            return cls(int(coords.group(1)), int(coords.group(2)))
+        return cls()
+
+    if kind == "type":
+        if quoted := QUOTED.search(rest):
+            return TypeText(quoted.group(2))
+        return None
+
+    if kind == "press":
+        if chord := CHORD.match(rest):
+            keys = tuple(
+                KEY_ALIASES.get(key.lower(), key.lower())
+                for key in CHORD_SEPARATOR.split(chord.group(1))
+            )
+            return PressKey(keys[0]) if len(keys) == 1 else Hotkey(keys)
+        return None
+
+    return Screenshot()
+
+def parse_actions(text: str) -> List[Action]:
+    """Parse a complete response"""
+    parser = ActionParser()
+    return parser.feed(text) + parser.close()
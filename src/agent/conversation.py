@@ -0,0 +1,229 @@
+# src/agent/conversation.py
+import base64
+import copy
+import io
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from PIL import Image
+from ..tools.encoding import EncodingOptions, encode_image
+from ..utils.logger import logger
+
+Message = Dict[str, Any]
+
+# Rough text density for budgeting; the API reports exact counts afterwards
+CHARS_PER_TOKEN = 4
+# Anthropic's guidance for image cost: width * height / 750 tokens
+PIXELS_PER_TOKEN = 750
+
+OMITTED_IMAGE = {"type": "text", "text": "[earlier screenshot omitted]"}
+# Base64 characters decoded to read an image header
+HEADER_CHARS = 4096
+
+@dataclass
+class _Turn:
+    """A stored turn with its collapsed form and token estimates computed once"""
+    messages: List[Message]
+    collapsed: List[Message]
+    collapsed_tokens: int
+    images: int
+    # Messages keeping only the newest n images, with their token estimate, by n
+    variants: Dict[int, Tuple[List[Message], int]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, messages: List[Message]) -> "_Turn":
+        collapsed = _collapse(messages)
+        turn = cls(
+            messages=messages,
+            collapsed=collapsed,
+            collapsed_tokens=estimate_tokens(collapsed),
+            images=sum(1 for _ in _image_blocks(messages)),
+        )
+        turn.keeping(turn.images)
+        return turn
+
+    def keeping(self, images: int) -> Tuple[List[Message], int]:
+        images = max(0, min(images, self.images))
+        if images not in self.variants:
+            messages = self.messages
+            if images < self.images:
+                messages = copy.deepcopy(messages)
+                _omit_images(messages, self.images - images)
+            self.variants[images] = (messages, estimate_tokens(messages))
+        return self.variants[images]
+
+    def omit_images(self, count: int) -> None:
+        """Permanently replace the oldest count images with a placeholder"""
+        _omit_images(self.messages, count)
+        self.images -= count
+        self.variants.clear()
+        self.keeping(self.images)
+
+class ConversationMemory:
+    """Multi-turn history for one agent session, held under a token budget
+
+    The latest keep_turns turns are sent verbatim. Older turns are collapsed to
+    their request and final answer, and the oldest are dropped once the budget
+    is exceeded. Only the newest max_images images are kept; images in stored
+    turns are downscaled to image_max_dimension when set.
+
+    Turns are trimmed and measured once when added, so building the context
+    for a request only assembles prepared messages. The returned messages
+    share structure with the stored history and must not be modified.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 50000,
+        keep_turns: int = 4,
+        max_images: int = 2,
+        image_max_dimension: Optional[int] = None
+    ):
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self.max_images = max_images
+        self.image_max_dimension = image_max_dimension
+        self.turns: List[_Turn] = []
+
+    def add_turn(self, messages: List[Message]) -> None:
+        """Store a finished turn: the user message and everything that followed"""
+        messages = copy.deepcopy(messages)
+        if messages and messages[-1]["role"] == "user":
+            # Keep roles alternating when a turn ended on tool results
+            messages.append({"role": "assistant", "content": "[turn ended]"})
+        if self.image_max_dimension:
+            for block in _image_blocks(messages):
+                _downscale_block(block, self.image_max_dimension)
+        self.turns.append(_Turn.build(messages))
+
+        # Older images can never be sent again once newer ones fill the limit
+        remaining = self.max_images
+        for turn in reversed(self.turns):
+            if turn.images > remaining:
+                turn.omit_images(turn.images - remaining)
+            remaining -= turn.images
+
+    def clear(self) -> None:
+        self.turns.clear()
+
+    def context(self, current: List[Message]) -> List[Message]:
+        """Messages for the next request: pruned history followed by the current turn"""
+        current_images = sum(1 for _ in _image_blocks(current))
+        if current_images > self.max_images:
+            current = copy.deepcopy(current)
+            _omit_images(current, current_images - self.max_images)
+        # Images in the current turn are the newest and take precedence
+        allowance = max(0, self.max_images - current_images)
+
+        recent = len(self.turns) - self.keep_turns
+        turns: List[Tuple[List[Message], int]] = []
+        for i, turn in reversed(list(enumerate(self.turns))):
+            if i < recent:
+                turns.append((turn.collapsed, turn.collapsed_tokens))
+                continue
+            turns.append(turn.keeping(allowance))
+            allowance = max(0, allowance - turn.images)
+        turns.reverse()
+
+        budget = self.token_budget - estimate_tokens(current)
+        total = sum(tokens for _, tokens in turns)
+        dropped = 0
+        while turns and total > budget:
+            total -= turns.pop(0)[1]
+            dropped += 1
+        if dropped:
+            logger.debug(f"Dropped {dropped} turn(s) to fit the {self.token_budget} token budget")
+
+        return [message for messages, _ in turns for message in messages] + list(current)
+
+def estimate_tokens(messages: List[Message]) -> int:
+    """Approximate input tokens for a list of messages"""
+    tokens = 0
+    for message in messages:
+        for block in _walk(message["content"]):
+            if block.get("type") == "image":
+                tokens += _image_tokens(block)
+            elif block.get("type") == "text":
+                tokens += len(block["text"]) // CHARS_PER_TOKEN + 1
+            elif block.get("type") == "tool_use":
+                tokens += len(json.dumps(block.get("input", {}))) // CHARS_PER_TOKEN + 10
+        if isinstance(message["content"], str):
+            tokens += len(message["content"]) // CHARS_PER_TOKEN + 1
+    return tokens
+
+def _walk(content: Any) -> Iterator[Dict[str, Any]]:
+    """Every content block, including those nested in tool results"""
+    if isinstance(content, list):
+        for block in content:
+            if isinstance(block, dict):
+                yield block
+                yield from _walk(block.get("content"))
+
+def _image_blocks(messages: List[Message]) -> Iterator[Dict[str, Any]]:
+    for message in messages:
+        for block in _walk(message["content"]):
+            if block.get("type") == "image":
+                yield block
+
+def _omit_images(messages: List[Message], count: int) -> None:
+    """Replace the oldest count images with a placeholder"""
+    for block in list(_image_blocks(messages))[:count]:
+        block.clear()
+        block.update(OMITTED_IMAGE)
+
+def _image_size(block: Dict[str, Any]) -> Optional[tuple]:
+    data = block["source"].get("data", "")
+    # Only the header is read, so decode just the start of the data when that suffices
+    for encoded in (data[:HEADER_CHARS], data) if len(data) > HEADER_CHARS else (data,):
+        try:
+            with Image.open(io.BytesIO(base64.b64decode(encoded))) as image:
+                return image.size
+        except Exception:
+            continue
+    return None
+
+def _image_tokens(block: Dict[str, Any]) -> int:
+    if size := _image_size(block):
+        return size[0] * size[1] // PIXELS_PER_TOKEN
+    return len(block["source"].get("data", "")) // CHARS_PER_TOKEN
+
+def _downscale_block(block: Dict[str, Any], max_dimension: int) -> None:
+    size = _image_size(block)
+    if size is None or max(size) <= max_dimension:
+        return
+    source = block["source"]
+    image = Image.open(io.BytesIO(base64.b64decode(source["data"])))
+    image_format = source["media_type"].split("/")[-1]
+    encoded = encode_image(image, EncodingOptions(format=image_format, max_dimension=max_dimension))
+    source["data"] = base64.b64encode(encoded.data).decode()
+
+def _collapse(turn: List[Message]) -> List[Message]:
+    """A turn reduced to its request, the actions taken and the final answer"""
+    request = next(
+        (b["text"] for b in _walk(turn[0]["content"]) if b.get("type") == "text"),
+        turn[0]["content"] if isinstance(turn[0]["content"], str) else ""
+    )
+    actions = []
+    answer = ""
+    for message in turn[1:]:
+        if message["role"] != "assistant":
+            continue
+        if isinstance(message["content"], str):
+            answer = message["content"]
+            continue
+        for block in message["content"]:
+            if block.get("type") == "tool_use":
+                if block["name"] == "batch":
+                    actions += [a.get("action", "?") for a in block["input"].get("actions", [])]
+                else:
+                    actions.append(block["name"])
+            elif block.get("type") == "text" and block["text"]:
+                answer = block["text"]
+
+    summary = answer or "(no reply)"
+    if actions:
+        summary = f"[actions: {', '.join(actions)}] {summary}"
+    return [
+        {"role": "user", "content": request},
+        {"role": "assistant", "content": summary},
+    ]
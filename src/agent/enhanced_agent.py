@@ -1,20 +1,70 @@
 # src/agent/enhanced_agent.py
-from typing import Any, Optional, List
-import anthropic
-from datetime import datetime
-import asyncio
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, List, Tuple
 import json
+import uuid
+from pathlib import Path
 from ..tools.computer import MacComputer
-from ..tools.results import ToolResult
+from ..tools.batch import BatchResult
+from ..tools.results import ToolResult, combine_results
 from ..workflows.manager import WorkflowManager
+from ..utils.config import Config
 from ..utils.logger import logger
+from ..utils.metrics import LLM_REQUEST_SECONDS, MESSAGE_SECONDS, serve_metrics
+from ..utils.tracing import Tracer, activate, span
+from .action_parser import parse_actions
+from .conversation import ConversationMemory
 from .mac_shortcuts import MAC_SHORTCUTS
+from .request_builder import RequestBuilder
+from .response_cache import ResponseCache, response_text
+from .streaming import ActionPipeline, StreamMetrics, get_async_client, replay, stream_text
+from .tool_schemas import (
+    COMPUTER_TOOLS, content_blocks, error_result_block, tool_actions, tool_result_block
+)
+from .workflow_compiler import WorkflowCompiler
+from .workflow_runner import WorkflowRunner, settle_estimate
+
+@dataclass
+class ToolTurnStats:
+    # Model requests, tool calls and computer actions for one message
+    round_trips: int = 0
+    tool_calls: int = 0
+    actions: int = 0
 
 class EnhancedComputerAgent:
-    def __init__(self):
-        self.client = anthropic.Anthropic()
-        self.computer = MacComputer()
-        self.workflow_manager = WorkflowManager()
+    def __init__(
+        self,
+        computer: Optional[MacComputer] = None,
+        workflow_manager: Optional[WorkflowManager] = None,
+        client: Optional[Any] = None
+    ):
+        self.computer = computer or MacComputer()
+        self.workflow_manager = workflow_manager or WorkflowManager()
+        # Follows the manager, so recording started from the UI saves templates too
+        self.computer.record_templates = self._recording_templates
+        self._client = client
+        self.model = Config.ANTHROPIC_MODEL
+        self.response_cache = ResponseCache(
+            max_entries=Config.RESPONSE_CACHE_SIZE,
+            ttl=Config.RESPONSE_CACHE_TTL,
+            path=Config.RESPONSE_CACHE_PATH or None,
+            max_disk_bytes=Config.RESPONSE_CACHE_MAX_MB * 1024 * 1024
+        ) if Config.RESPONSE_CACHE else None
+        self.last_stream_metrics: Optional[StreamMetrics] = None
+        self.last_tool_stats: Optional[ToolTurnStats] = None
+        self.memory = ConversationMemory(
+            token_budget=Config.CONTEXT_TOKEN_BUDGET,
+            keep_turns=Config.CONTEXT_KEEP_TURNS,
+            max_images=Config.CONTEXT_MAX_IMAGES,
+            image_max_dimension=Config.CONTEXT_IMAGE_MAX_DIMENSION
+        )
+        self.compiler = WorkflowCompiler(
+            settle_estimate=lambda action: settle_estimate(self.computer, action)
+        )
+        # Serves /metrics once per process when METRICS and METRICS_PORT are set
+        serve_metrics()
+        # Spans of this session, exported as a Chrome trace after each message
+        self.tracer = Tracer(session=uuid.uuid4().hex[:12]) if Config.TRACING else None
         
         self.system_prompt = """You are a helpful assistant that can control a Mac computer.
         You have access to the following capabilities:
@@ -45,44 +95,85 @@ class EnhancedComputerAgent:
         Always confirm actions before executing them and provide clear feedback.
         If an action fails, explain why and suggest alternatives."""
         
+        # Everything before the messages stays byte-identical so it can be cached
+        self.requests = RequestBuilder(
+            model=self.model,
+            system_prompt=f"{self.system_prompt}\n\n{_shortcut_table()}",
+            tools=COMPUTER_TOOLS,
+            cache_prompt=Config.PROMPT_CACHE
+        )
+        
+    @property
+    def client(self):
+        """Injected client, or the shared async client for the running event loop"""
+        if self._client is not None:
+            return self._client
+        return get_async_client(Config.ANTHROPIC_API_KEY, Config.ANTHROPIC_BASE_URL)
+        
     async def process_message(
         self, 
         message: str,
         workflow_id: Optional[str] = None
+    ) -> ToolResult | str:
+        with activate(self.tracer), span("process_message") as traced:
+            with MESSAGE_SECONDS.time(path="", status="ok") as labels:
+                result = await self._process_message(message, workflow_id, labels)
+                if isinstance(result, ToolResult) and result.error:
+                    labels["status"] = "error"
+            traced.set(**labels)
+        if self.tracer is not None:
+            self.export_trace()
+        return result
+    
+    def export_trace(self, path: Optional[str] = None) -> Optional[Path]:
+        """Write this session's spans as a Chrome trace; by default to TRACE_DIR"""
+        if self.tracer is None:
+            return None
+        return self.tracer.export(path or str(Path(Config.TRACE_DIR) / f"{self.tracer.session}.json"))
+    
+    async def _process_message(
+        self,
+        message: str,
+        workflow_id: Optional[str],
+        labels: Dict[str, str]
     ) -> ToolResult | str:
         try:
             # Check if this is a workflow command
             if workflow_id:
+                labels["path"] = "workflow"
                 return await self.execute_workflow(workflow_id)
             
             if self._is_workflow_command(message):
+                labels["path"] = "command"
                 return self._handle_workflow_command(message)
             
-            # Get Claude's response
-            response = await self._get_claude_response(message)
+            if Config.TOOL_USE:
+                # Structured tool calls; results go back to the model each turn
+                labels["path"] = "tools"
+                response, results = await self._run_tools(message)
+                return self._combine_results(results) if results else response
             
-            # Parse and execute actions
-            actions = self._parse_actions(response)
-            results = []
+            if Config.STREAM_RESPONSES:
+                # Actions start while the rest of the response is still streaming
+                labels["path"] = "stream"
+                response, batch = await self._stream_and_execute(message)
+            else:
+                # Get Claude's response, then run its actions as one coalesced batch
+                labels["path"] = "batch"
+                response = await self._get_claude_response(message)
+                with span("parse") as traced:
+                    actions = self._parse_actions(response)
+                    traced.set(actions=len(actions))
+                batch = await self.computer.batch(actions)
             
-            for action in actions:
-                # Add delay between actions
-                if results:
-                    await asyncio.sleep(0.5)
-                
-                # Execute action
-                result = await self.computer(**action)
-                results.append(result)
-                
-                # Record if we're recording a workflow
-                if self.workflow_manager.is_recording:
-                    self.workflow_manager.add_step(action, result)
-                
-                # Stop if there's an error
-                if result.error:
-                    break
+            # Record if we're recording a workflow
+            if self.workflow_manager.is_recording:
+                for action, result in zip(batch.actions, batch.results):
+                    self.workflow_manager.add_step(
+                        action, result, model_size=self.computer.scaler.model_size
+                    )
             
-            return self._combine_results(results) or response
+            return self._combine_results(batch.results) or response
             
         except Exception as e:
             logger.error(f"Error processing message: {str(e)}")
@@ -90,117 +181,124 @@ class EnhancedComputerAgent:
     
     async def execute_workflow(self, workflow_id: str) -> ToolResult:
         """Execute a saved workflow"""
-        try:
-            workflow = self.workflow_manager.load_workflow(workflow_id)
-            results = []
-            
-            for step in workflow.steps:
-                result = await self.computer(**step.parameters)
-                results.append(result)
-                
-                if result.error:
-                    return ToolResult(
-                        error=f"Workflow failed at step {step.action}: {result.error}"
-                    )
-                
-                await asyncio.sleep(step.delay)
-            
-            # Update workflow statistics
-            workflow.success_count += 1
-            workflow.last_run = datetime.now()
-            self.workflow_manager.update_workflow(workflow)
-            
-            return self._combine_results(results)
-            
-        except Exception as e:
-            logger.error(f"Error executing workflow: {str(e)}")
-            return ToolResult(error=f"Workflow execution failed: {str(e)}")
+        runner = WorkflowRunner(self.workflow_manager, self.computer, self.compiler)
+        return await runner.run(workflow_id)
     
-    async def _get_claude_response(self, message: str) -> str:
-        """Get response from Claude"""
-        response = await self.client.messages.create(
-            model="claude-3-opus-20240229",
-            max_tokens=1024,
-            system=self.system_prompt,
-            messages=[{"role": "user", "content": message}]
-        )
-        return response.content
+    def _recording_templates(self) -> bool:
+        return Config.RECORD_CLICK_TEMPLATES and self.workflow_manager.is_recording
     
-    def _parse_actions(self, response: str) -> List[dict[str, Any]]:
-        """Parse Claude's response into executable actions"""
-        actions = []
-        
-        # Split response into lines
-        lines = response.lower().split('\n')
+    def _is_workflow_command(self, message: str) -> bool:
+        return message.strip().lower() in ("start recording", "stop recording")
+    
+    def _handle_workflow_command(self, message: str) -> ToolResult:
+        if message.strip().lower() == "start recording":
+            self.workflow_manager.start_recording()
+            return ToolResult(output="Started recording workflow")
+        self.workflow_manager.stop_recording()
+        return ToolResult(output="Stopped recording workflow")
+    
+    async def _run_tools(self, message: str) -> Tuple[str, List[ToolResult]]:
+        """Let Claude drive the computer through tool calls until it answers in text"""
+        turn: List[Dict[str, Any]] = [{"role": "user", "content": message}]
+        results: List[ToolResult] = []
+        stats = self.last_tool_stats = ToolTurnStats()
+        text = ""
         
-        for line in lines:
-            # Parse mouse actions
-            if 'move mouse' in line or 'move cursor' in line:
-                if coords := self._extract_coordinates(line):
-                    actions.append({
-                        "action": "mouse_move",
-                        "x": coords[0],
-                        "y": coords[1]
-                    })
+        for _ in range(Config.MAX_TOOL_TURNS):
+            request = self.requests.build(self.memory.context(turn), tools=True)
+            response = await self._create(**request)
+            stats.round_trips += 1
             
-            # Parse click actions
-            elif 'click' in line:
-                if 'double click' in line:
-                    actions.append({"action": "double_click"})
-                elif 'right click' in line:
-                    actions.append({"action": "right_click"})
-                else:
-                    actions.append({"action": "click"})
+            blocks = content_blocks(response.content)
+            turn.append({"role": "assistant", "content": blocks})
+            text = "".join(b["text"] for b in blocks if b["type"] == "text")
+            tool_uses = [b for b in blocks if b["type"] == "tool_use"]
+            if not tool_uses:
+                break
             
-            # Parse typing actions
-            elif 'type' in line:
-                if text := self._extract_text(line):
-                    actions.append({
-                        "action": "type",
-                        "text": text
-                    })
-            
-            # Parse keyboard shortcuts
-            elif 'press' in line:
-                if keys := self._extract_keys(line):
-                    actions.append({
-                        "action": "hotkey",
-                        "keys": keys
-                    })
+            tool_results = []
+            previous: Optional[str] = None
+            for block in tool_uses:
+                stats.tool_calls += 1
+                try:
+                    actions = tool_actions(block["name"], block["input"])
+                except ValueError as e:
+                    tool_results.append(error_result_block(block["id"], str(e)))
+                    continue
+                
+                if previous is not None:
+                    await self.computer.wait_for_settle(previous)
+                batch = await self.computer.batch(actions)
+                stats.actions += len(batch.results)
+                results.extend(batch.results)
+                if batch.results:
+                    previous = batch.actions[len(batch.results) - 1]["action"]
+                
+                if self.workflow_manager.is_recording:
+                    for action, result in zip(batch.actions, batch.results):
+                        self.workflow_manager.add_step(
+                            action, result, model_size=self.computer.scaler.model_size
+                        )
+                tool_results.append(tool_result_block(block["id"], batch))
             
-            # Parse screenshot action
-            elif 'screenshot' in line:
-                actions.append({"action": "screenshot"})
+            turn.append({"role": "user", "content": tool_results})
+        else:
+            logger.warning(f"Stopped after {Config.MAX_TOOL_TURNS} tool turns")
         
-        return actions
+        logger.info(
+            f"Tool use: {stats.round_trips} requests, {stats.tool_calls} tool calls, "
+            f"{stats.actions} actions"
+        )
+        self.memory.add_turn(turn)
+        return text, results
     
-    def _extract_coordinates(self, text: str) -> Optional[tuple[int, int]]:
-        """Extract x,y coordinates from text"""
-        import re
-        if match := re.search(r'(\d+)\s*,\s*(\d+)', text):
-            return (int(match.group(1)), int(match.group(2)))
-        return None
+    async def _create(self, **request: Any) -> Any:
+        """Send a request and record its prompt cache usage"""
+        with LLM_REQUEST_SECONDS.time(mode="create"), span("llm.request", model=request["model"]):
+            response = await self.client.messages.create(**request)
+        if usage := getattr(response, "usage", None):
+            self.requests.record(usage)
+        return response
+    
+    async def _get_claude_response(self, message: str) -> str:
+        """Get response from Claude, reusing a cached answer for a repeated request"""
+        turn = [{"role": "user", "content": message}]
+        request = self.requests.build(self.memory.context(turn))
+        if self.response_cache is None:
+            response = response_text(await self._create(**request))
+        else:
+            response = await self.response_cache.complete(self._create, **request)
+        self.memory.add_turn(turn + [{"role": "assistant", "content": response}])
+        return response
     
-    def _extract_text(self, text: str) -> Optional[str]:
-        """Extract text to type from response"""
-        import re
-        if match := re.search(r'[\'"](.+?)[\'"]', text):
-            return match.group(1)
-        return None
+    async def _stream_and_execute(self, message: str) -> Tuple[str, BatchResult]:
+        """Stream Claude's response and execute each action line as it arrives"""
+        turn = [{"role": "user", "content": message}]
+        request = self.requests.build(self.memory.context(turn))
+        key = self.response_cache.key(**request) if self.response_cache else None
+        cached = self.response_cache.get(key) if key else None
+        chunks = replay(cached) if cached is not None else stream_text(
+            self.client, on_usage=self.requests.record, **request
+        )
+        
+        pipeline = ActionPipeline(self.computer)
+        with span("pipeline", cached=cached is not None) as traced:
+            response, batch, self.last_stream_metrics = await pipeline.run(chunks)
+            traced.set(**vars(self.last_stream_metrics))
+        if key and cached is None:
+            self.response_cache.put(key, response)
+        self.memory.add_turn(turn + [{"role": "assistant", "content": response}])
+        return response, batch
     
-    def _extract_keys(self, text: str) -> Optional[List[str]]:
-        """Extract keyboard keys from text"""
-        import re
-        if match := re.search(r'press\s+(.+?)(?:\s|$)', text):
-            keys = match.group(1).split('+')
-            return [k.strip() for k in keys]
-        return None
+    def _parse_actions(self, response: str) -> List[dict[str, Any]]:
+        """Parse Claude's response into executable actions"""
+        return [action.to_dict() for action in parse_actions(response)]
     
     def _combine_results(self, results: List[ToolResult]) -> ToolResult:
         """Combine multiple results into one"""
-        return ToolResult(
-            output="\n".join(r.output for r in results if r.output),
-            error="\n".join(r.error for r in results if r.error),
-            base64_image=next((r.base64_image for r in reversed(results) 
-                             if r.base64_image), None)
-        )
\ No newline at end of file
+        return combine_results(results)
+
+def _shortcut_table() -> str:
+    """Named shortcuts for the system prompt, in a fixed order"""
+    lines = [f"- {name}: {'+'.join(keys)}" for name, keys in MAC_SHORTCUTS.items()]
+    return "Available shortcuts:\n" + "\n".join(lines)
@@ -0,0 +1,130 @@
+# src/agent/request_builder.py
+import copy
+import hashlib
+import json
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import Any, Deque, Dict, List, Optional
+from ..utils.logger import logger
+from ..utils.metrics import LLM_TOKENS
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+@dataclass
+class CacheUsage:
+    input_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def cached_ratio(self) -> float:
+        """Share of prompt tokens served from the cache"""
+        total = self.input_tokens + self.cache_read_tokens + self.cache_write_tokens
+        return self.cache_read_tokens / total if total else 0.0
+
+@dataclass
+class PromptCacheStats:
+    """Running usage totals plus the most recent requests"""
+    history: int = 100
+    requests: Deque[CacheUsage] = field(init=False)
+    count: int = 0
+    _totals: CacheUsage = field(default_factory=CacheUsage, repr=False)
+
+    def __post_init__(self):
+        self.requests = deque(maxlen=self.history)
+
+    def record(self, usage: Any) -> CacheUsage:
+        """Add the usage block of one Messages API response"""
+        def get(name: str) -> int:
+            value = usage.get(name) if isinstance(usage, dict) else getattr(usage, name, None)
+            return value or 0
+
+        entry = CacheUsage(
+            input_tokens=get("input_tokens"),
+            cache_read_tokens=get("cache_read_input_tokens"),
+            cache_write_tokens=get("cache_creation_input_tokens"),
+            output_tokens=get("output_tokens"),
+        )
+        self.requests.append(entry)
+        self.count += 1
+        self._totals.input_tokens += entry.input_tokens
+        self._totals.cache_read_tokens += entry.cache_read_tokens
+        self._totals.cache_write_tokens += entry.cache_write_tokens
+        self._totals.output_tokens += entry.output_tokens
+        return entry
+
+    def totals(self) -> CacheUsage:
+        """Usage summed over every recorded request"""
+        return replace(self._totals)
+
+class RequestBuilder:
+    """Builds Messages API requests around a frozen, cacheable prefix
+
+    The system prompt and tool definitions are serialized once and reused
+    unchanged, with cache_control breakpoints on the system block and the
+    last tool, so every request shares a byte-identical prefix. Models only
+    cache prefixes above a minimum length (about 1024 tokens for most).
+    """
+
+    def __init__(
+        self,
+        model: str,
+        system_prompt: str,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        max_tokens: int = 1024,
+        cache_prompt: bool = True
+    ):
+        self.model = model
+        self.max_tokens = max_tokens
+        self.cache_prompt = cache_prompt
+        self.stats = PromptCacheStats()
+
+        system: Dict[str, Any] = {"type": "text", "text": system_prompt}
+        tools = copy.deepcopy(tools or [])
+        if cache_prompt:
+            system["cache_control"] = CACHE_CONTROL
+            if tools:
+                tools[-1]["cache_control"] = CACHE_CONTROL
+        self._system = [system]
+        self._tools = tools
+        self.prefix_digest = _digest(self._system, self._tools)
+
+    @property
+    def system_text(self) -> str:
+        return self._system[0]["text"]
+
+    def build(self, messages: List[Dict[str, Any]], tools: bool = False) -> Dict[str, Any]:
+        """A request with the shared prefix; include tools only when they are used"""
+        request: Dict[str, Any] = {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "system": self._system,
+            "messages": messages,
+        }
+        if tools and self._tools:
+            request["tools"] = self._tools
+        return request
+
+    def check_prefix(self) -> bool:
+        """Whether the prefix is still byte-identical to the one first built"""
+        unchanged = _digest(self._system, self._tools) == self.prefix_digest
+        if not unchanged:
+            logger.warning("Cached prompt prefix changed; the prompt cache will miss")
+        return unchanged
+
+    def record(self, usage: Any) -> CacheUsage:
+        entry = self.stats.record(usage)
+        LLM_TOKENS.inc(entry.input_tokens, kind="input")
+        LLM_TOKENS.inc(entry.cache_read_tokens, kind="cache_read")
+        LLM_TOKENS.inc(entry.cache_write_tokens, kind="cache_write")
+        LLM_TOKENS.inc(entry.output_tokens, kind="output")
+        logger.debug(
+            f"Prompt tokens: {entry.input_tokens} uncached, {entry.cache_read_tokens} "
+            f"read from cache, {entry.cache_write_tokens} written to cache"
+        )
+        return entry
+
+def _digest(*parts: Any) -> str:
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
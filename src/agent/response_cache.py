@@ -0,0 +1,213 @@
+# src/agent/response_cache.py
+import hashlib
+import inspect
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from ..utils.logger import logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+"""
+
+class ResponseCache:
+    """Model responses keyed on model, system prompt and messages
+
+    An in-memory LRU sits in front of an optional SQLite file so repeated
+    commands survive restarts. Requests carrying images are never cached.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl: Optional[float] = 3600.0,
+        path: Optional[str] = None,
+        max_disk_bytes: Optional[int] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.executescript(SCHEMA)
+
+    def key(
+        self,
+        model: str,
+        system: Optional[Union[str, List[Dict[str, Any]]]],
+        messages: List[Dict[str, Any]],
+        **params: Any
+    ) -> Optional[str]:
+        """Cache key for a request, or None when it must bypass the cache"""
+        if _has_image(messages):
+            with self._lock:
+                self.bypassed += 1
+            return None
+        if system is not None and not isinstance(system, str):
+            system = json.dumps(system, sort_keys=True)
+        system_hash = hashlib.sha256((system or "").encode()).hexdigest()
+        payload = json.dumps(
+            {"model": model, "system": system_hash, "messages": messages, "params": params},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def complete(self, create: Callable[..., Any], **request: Any) -> str:
+        """Text for a Messages API request, calling create only on a miss"""
+        key = self.key(**request)
+        if key and (cached := self.get(key)) is not None:
+            return cached
+        response = create(**request)
+        if inspect.isawaitable(response):
+            response = await response
+        text = response_text(response)
+        if key:
+            self.put(key, text)
+        return text
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            if entry := self._memory.get(key):
+                value, created = entry
+                if not self._expired(created, now):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._memory[key]
+
+            if value := self._disk_get(key, now):
+                self._remember(key, *value)
+                self.hits += 1
+                return value[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            if self._db is None:
+                return
+            try:
+                with self._db:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                        (key, value, len(value.encode()), now, now)
+                    )
+                    self._evict_disk(now)
+            except sqlite3.Error as e:
+                logger.error(f"Error writing response cache: {str(e)}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                with self._db:
+                    self._db.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._memory),
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl is not None and now - created > self.ttl
+
+    def _remember(self, key: str, value: str, created: float) -> None:
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[str, float]]:
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if self._expired(row[1], now):
+                with self._db:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            with self._db:
+                self._db.execute(
+                    "UPDATE responses SET last_access = ? WHERE key = ?", (now, key)
+                )
+            return row[0], row[1]
+        except sqlite3.Error as e:
+            logger.error(f"Error reading response cache: {str(e)}")
+            return None
+
+    def _evict_disk(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones beyond max_disk_bytes"""
+        if self.ttl is not None:
+            self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        if self.max_disk_bytes is None:
+            return
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        rows = self._db.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_disk_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+def _has_image(value: Any) -> bool:
+    """Whether any content block in a message structure is an image"""
+    if isinstance(value, dict):
+        if value.get("type") == "image":
+            return True
+        return any(_has_image(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_image(v) for v in value)
+    return False
+
+def response_text(response: Any) -> str:
+    """Text of a Messages API response, joining its text blocks"""
+    content = getattr(response, "content", response)
+    if isinstance(content, str):
+        return content
+    parts = []
+    for block in content or []:
+        text = block.get("text") if isinstance(block, dict) else getattr(block, "text", None)
+        if text:
+            parts.append(text)
+    return "".join(parts)
@@ -0,0 +1,173 @@
+# src/agent/streaming.py
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+import anthropic
+from ..tools.batch import BatchResult, coalesce_actions
+from ..tools.computer import MacComputer
+from ..utils.logger import logger
+from ..utils.metrics import LLM_REQUEST_SECONDS
+from ..utils.tracing import start_span
+from .action_parser import Action, ActionParser
+
+_clients: Dict[Tuple[Optional[str], Optional[str], Any], anthropic.AsyncAnthropic] = {}
+# Closes of evicted clients in flight, kept so they are not garbage collected
+_closing: Set[asyncio.Task] = set()
+
+def get_async_client(
+    api_key: Optional[str] = None,
+    base_url: Optional[str] = None
+) -> anthropic.AsyncAnthropic:
+    """One async client per key, endpoint and event loop, so requests share a connection pool
+
+    Connection pools are bound to the loop that opened them, and the UI runs
+    each message under its own asyncio.run().
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    for stale in [k for k in _clients if k[2] is not None and k[2].is_closed()]:
+        _close_client(_clients.pop(stale))
+
+    key = (api_key, base_url, loop)
+    if key not in _clients:
+        _clients[key] = anthropic.AsyncAnthropic(api_key=api_key, base_url=base_url)
+    return _clients[key]
+
+def _close_client(client: anthropic.AsyncAnthropic) -> None:
+    """Close a client whose event loop has ended, releasing its connection pool"""
+    async def close() -> None:
+        try:
+            await client.close()
+        except Exception as e:
+            logger.debug(f"Error closing stale client: {str(e)}")
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        asyncio.run(close())
+        return
+    task = loop.create_task(close())
+    _closing.add(task)
+    task.add_done_callback(_closing.discard)
+
+async def stream_text(
+    client: anthropic.AsyncAnthropic,
+    on_usage: Optional[Callable[[Any], Any]] = None,
+    **request: Any
+) -> AsyncIterator[str]:
+    """Text deltas of a streamed Messages API response"""
+    # Not made current: consumers run between the yields of this generator
+    traced = start_span("llm.stream", model=request.get("model"))
+    try:
+        with LLM_REQUEST_SECONDS.time(mode="stream"):
+            async with client.messages.stream(**request) as stream:
+                async for text in stream.text_stream:
+                    yield text
+                if on_usage is not None:
+                    usage = (await stream.get_final_message()).usage
+                    on_usage(usage)
+                    traced.set(output_tokens=getattr(usage, "output_tokens", None))
+    finally:
+        traced.finish()
+
+async def replay(text: str) -> AsyncIterator[str]:
+    """A complete response, such as a cached one, as a single-chunk stream"""
+    yield text
+
+@dataclass
+class StreamMetrics:
+    # Seconds from the start of the request; None if it never happened
+    time_to_first_token: Optional[float] = None
+    time_to_first_action: Optional[float] = None
+    total_time: float = 0.0
+    lines: int = 0
+    actions: int = 0
+    # Seconds spent parsing, summed over chunks
+    parse_time: float = 0.0
+
+    def __str__(self) -> str:
+        def fmt(value: Optional[float]) -> str:
+            return f"{value:.3f}s" if value is not None else "n/a"
+        return (
+            f"first token {fmt(self.time_to_first_token)}, "
+            f"first action {fmt(self.time_to_first_action)}, "
+            f"{self.actions} actions from {self.lines} lines in {self.total_time:.3f}s"
+        )
+
+class ActionPipeline:
+    """Executes actions from a streaming response while the rest is still arriving
+
+    Chunks are fed to an incremental parser and each completed line's action
+    is queued; a consumer runs them in order, waiting for the screen to settle
+    between actions as batch() does. Execution stops at the first error but
+    the stream is still read to the end so the full text is returned.
+    """
+
+    def __init__(
+        self,
+        computer: MacComputer,
+        parser_factory: Callable[[], ActionParser] = ActionParser
+    ):
+        self.computer = computer
+        self.parser_factory = parser_factory
+
+    async def run(
+        self,
+        chunks: AsyncIterator[str]
+    ) -> Tuple[str, BatchResult, StreamMetrics]:
+        start = time.perf_counter()
+        metrics = StreamMetrics()
+        batch = BatchResult(actions=[])
+        queue: asyncio.Queue = asyncio.Queue()
+        text: List[str] = []
+        parser = self.parser_factory()
+
+        def enqueue(actions: List[Action]) -> None:
+            batch.original_count += len(actions)
+            for action in coalesce_actions([a.to_dict() for a in actions]):
+                queue.put_nowait(action)
+
+        async def produce() -> None:
+            try:
+                async for chunk in chunks:
+                    if metrics.time_to_first_token is None:
+                        metrics.time_to_first_token = time.perf_counter() - start
+                    text.append(chunk)
+                    parse_start = time.perf_counter()
+                    actions = parser.feed(chunk)
+                    metrics.parse_time += time.perf_counter() - parse_start
+                    enqueue(actions)
+                enqueue(parser.close())
+            finally:
+                metrics.lines = parser.lines
+                queue.put_nowait(None)
+
+        async def consume() -> None:
+            previous: Optional[str] = None
+            while (action := await queue.get()) is not None:
+                if batch.error:
+                    continue
+                if previous is not None:
+                    await self.computer.wait_for_settle(previous)
+                action_start = time.perf_counter()
+                if metrics.time_to_first_action is None:
+                    metrics.time_to_first_action = action_start - start
+                result = await self.computer(**action)
+                batch.actions.append(action)
+                batch.results.append(result)
+                batch.timings.append(time.perf_counter() - action_start)
+                previous = action["action"]
+
+        producer = asyncio.create_task(produce())
+        try:
+            await asyncio.gather(producer, consume())
+        finally:
+            producer.cancel()
+
+        metrics.total_time = batch.total_time = time.perf_counter() - start
+        metrics.actions = len(batch.results)
+        logger.info(f"Streamed response: {metrics}")
+        return "".join(text), batch, metrics
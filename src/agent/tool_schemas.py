@@ -0,0 +1,198 @@
+# src/agent/tool_schemas.py
+from typing import Any, Dict, List, Optional
+from ..tools.batch import BatchResult
+from ..tools.results import ToolResult, combine_results
+
+COORDINATE = {"type": "integer", "minimum": 0}
+
+# Input schema for each MacComputer action
+ACTION_SCHEMAS: Dict[str, Dict[str, Any]] = {
+    "mouse_move": {
+        "description": "Move the mouse pointer to screen coordinates",
+        "properties": {"x": COORDINATE, "y": COORDINATE},
+        "required": ["x", "y"],
+    },
+    "click": {
+        "description": "Left click, at the given coordinates or the current pointer position",
+        "properties": {"x": COORDINATE, "y": COORDINATE},
+    },
+    "double_click": {
+        "description": "Double click, at the given coordinates or the current pointer position",
+        "properties": {"x": COORDINATE, "y": COORDINATE},
+    },
+    "right_click": {
+        "description": "Right click, at the given coordinates or the current pointer position",
+        "properties": {"x": COORDINATE, "y": COORDINATE},
+    },
+    "type": {
+        "description": "Type text into the focused element, preserving case",
+        "properties": {
+            "text": {"type": "string"},
+            "strategy": {
+                "type": "string",
+                "enum": ["auto", "paste", "keys"],
+                "description": "keys for fields that reject pasting; auto pastes long text",
+            },
+        },
+        "required": ["text"],
+    },
+    "press_key": {
+        "description": "Press and release a single key, e.g. enter, tab, escape, down",
+        "properties": {"key": {"type": "string"}},
+        "required": ["key"],
+    },
+    "hotkey": {
+        "description": "Press a key chord, e.g. [\"command\", \"space\"] for Spotlight",
+        "properties": {
+            "keys": {"type": "array", "items": {"type": "string"}, "minItems": 1}
+        },
+        "required": ["keys"],
+    },
+    "screenshot": {
+        "description": (
+            "Capture the screen. Unless mode is \"full\", only changed regions "
+            "may be returned when nothing else changed. Pass region [x, y, width, "
+            "height] or a window (app or title) to capture just that area, and zoom "
+            "to magnify it; the result states the capture origin and scale"
+        ),
+        "properties": {
+            "mode": {"type": "string", "enum": ["full"]},
+            "region": {"type": "array", "items": COORDINATE, "minItems": 4, "maxItems": 4},
+            "window": {"type": "string"},
+            "zoom": {"type": "number", "minimum": 1, "maximum": 4},
+        },
+    },
+    "get_position": {
+        "description": "Report the current mouse pointer position",
+        "properties": {},
+    },
+}
+
+BATCH_TOOL = "batch"
+
+def _action_tool(name: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": name,
+        "description": schema["description"],
+        "input_schema": {
+            "type": "object",
+            "properties": schema["properties"],
+            "required": schema.get("required", []),
+        },
+    }
+
+def _batch_tool() -> Dict[str, Any]:
+    parameters = "; ".join(
+        f"{name}({', '.join(schema['properties'])})"
+        for name, schema in ACTION_SCHEMAS.items()
+    )
+    return {
+        "name": BATCH_TOOL,
+        "description": (
+            "Run several computer actions in order within one turn, waiting for the "
+            "screen to settle between them. Stops at the first failing action. "
+            f"Each item names an action and its parameters: {parameters}"
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "actions": {
+                    "type": "array",
+                    "minItems": 1,
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "action": {"type": "string", "enum": list(ACTION_SCHEMAS)},
+                            **{
+                                key: value
+                                for schema in ACTION_SCHEMAS.values()
+                                for key, value in schema["properties"].items()
+                            },
+                        },
+                        "required": ["action"],
+                    },
+                },
+            },
+            "required": ["actions"],
+        },
+    }
+
+# Tool definitions for the Messages API, in a fixed order
+COMPUTER_TOOLS: List[Dict[str, Any]] = [
+    _action_tool(name, schema) for name, schema in ACTION_SCHEMAS.items()
+] + [_batch_tool()]
+
+def tool_actions(name: str, tool_input: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Computer actions requested by one tool_use block"""
+    if name == BATCH_TOOL:
+        actions = tool_input.get("actions")
+        if not isinstance(actions, list) or not actions:
+            raise ValueError("batch needs a non-empty 'actions' list")
+        for action in actions:
+            if not isinstance(action, dict) or action.get("action") not in ACTION_SCHEMAS:
+                raise ValueError(f"Unknown batch action: {action!r}")
+        return [dict(action) for action in actions]
+    if name not in ACTION_SCHEMAS:
+        raise ValueError(f"Unknown tool: {name}")
+    return [{"action": name, **tool_input}]
+
+def tool_result_block(tool_use_id: str, batch: BatchResult) -> Dict[str, Any]:
+    """Structured tool_result content for an executed tool call"""
+    lines = []
+    for i, (action, result) in enumerate(zip(batch.actions, batch.results), 1):
+        status = f"error: {result.error}" if result.error else result.output or "ok"
+        lines.append(f"{i}. {action['action']}: {status}")
+    if len(batch.results) < len(batch.actions):
+        lines.append(f"Stopped after {len(batch.results)} of {len(batch.actions)} actions")
+
+    content: List[Dict[str, Any]] = [{"type": "text", "text": "\n".join(lines)}]
+    content += image_blocks(combine_results(batch.results))
+    return {
+        "type": "tool_result",
+        "tool_use_id": tool_use_id,
+        "content": content,
+        "is_error": batch.error is not None,
+    }
+
+def error_result_block(tool_use_id: str, error: str) -> Dict[str, Any]:
+    return {
+        "type": "tool_result",
+        "tool_use_id": tool_use_id,
+        "content": [{"type": "text", "text": error}],
+        "is_error": True,
+    }
+
+def image_blocks(result: ToolResult) -> List[Dict[str, Any]]:
+    """Image content blocks for a result's full frame or changed-region crops"""
+    if result.base64_image:
+        return [_image(result.base64_image, result.media_type)]
+    blocks = []
+    for crop in result.crops or []:
+        blocks.append({
+            "type": "text",
+            "text": f"Changed region {crop['width']}x{crop['height']} at ({crop['x']}, {crop['y']})",
+        })
+        blocks.append(_image(crop["base64_image"], crop["media_type"]))
+    return blocks
+
+def _image(data: str, media_type: Optional[str]) -> Dict[str, Any]:
+    return {
+        "type": "image",
+        "source": {"type": "base64", "media_type": media_type or "image/png", "data": data},
+    }
+
+def content_blocks(content: Any) -> List[Dict[str, Any]]:
+    """Assistant content as plain dicts, so it can be sent back in the next request"""
+    blocks = []
+    for block in content or []:
+        get = block.get if isinstance(block, dict) else lambda key: getattr(block, key, None)
+        if get("type") == "text":
+            blocks.append({"type": "text", "text": get("text")})
+        elif get("type") == "tool_use":
+            blocks.append({
+                "type": "tool_use",
+                "id": get("id"),
+                "name": get("name"),
+                "input": get("input") or {},
+            })
+    return blocks
@@ -0,0 +1,202 @@
+# src/agent/workflow_compiler.py
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+from ..tools.batch import coalesce_with_sources
+from ..tools.settle import SETTLE_ACTIONS
+from ..utils.config import Config
+from ..utils.logger import logger
+from ..workflows.models import Workflow, WorkflowStep
+from .mac_shortcuts import MAC_SHORTCUTS
+
+# Rough cost of each action in seconds, excluding waits, for plan estimates
+ACTION_COSTS = {
+    "mouse_move": 0.03,
+    "click": 0.05,
+    "double_click": 0.08,
+    "right_click": 0.05,
+    "press_key": 0.03,
+    "hotkey": 0.05,
+    "screenshot": 0.3,
+    "get_position": 0.01,
+    "locate": 0.1,
+    "click_image": 0.15,
+}
+
+# Estimated settle wait used when no measured statistics are available
+DEFAULT_SETTLE_ESTIMATE = 0.3
+
+@dataclass
+class PlanStep:
+    action: Dict[str, Any]
+    # Indices of the workflow steps this plan step was built from
+    source_steps: List[int]
+    # Delay of the last source step, used when adaptive settling is off
+    delay: float = 0.5
+
+    @property
+    def name(self) -> str:
+        return self.action["action"]
+
+@dataclass
+class CompileReport:
+    original_steps: int = 0
+    compiled_steps: int = 0
+    merged_steps: int = 0
+    dropped_screenshots: int = 0
+    original_estimate: float = 0.0
+    compiled_estimate: float = 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.original_steps} -> {self.compiled_steps} steps "
+            f"({self.merged_steps} merged, {self.dropped_screenshots} screenshots dropped), "
+            f"estimated {self.original_estimate:.1f}s -> {self.compiled_estimate:.1f}s"
+        )
+
+@dataclass
+class ExecutionPlan:
+    workflow_id: str
+    cache_key: str
+    steps: List[PlanStep] = field(default_factory=list)
+    report: CompileReport = field(default_factory=CompileReport)
+
+class WorkflowCompiler:
+    """Turns recorded workflow steps into a validated, compact execution plan"""
+
+    def __init__(
+        self,
+        max_cached: int = 128,
+        settle_estimate: Optional[Callable[[str], float]] = None
+    ):
+        self.max_cached = max_cached
+        self.settle_estimate = settle_estimate or (lambda action: DEFAULT_SETTLE_ESTIMATE)
+        self._cache: "OrderedDict[str, ExecutionPlan]" = OrderedDict()
+
+    def compile(self, workflow: Workflow) -> ExecutionPlan:
+        """Compile a workflow, reusing the cached plan for an unchanged version"""
+        key = self.cache_key(workflow)
+        if plan := self._cache.get(key):
+            self._cache.move_to_end(key)
+            return plan
+
+        plan = self._compile(workflow, key)
+        self._cache[key] = plan
+        if len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+        logger.info(f"Compiled workflow {workflow.id}: {plan.report}")
+        return plan
+
+    @staticmethod
+    def cache_key(workflow: Workflow) -> str:
+        """Workflow id and version plus a digest of the steps, so edits invalidate the plan"""
+        steps = [
+            {"action": s.action, "parameters": s.parameters, "delay": s.delay}
+            for s in workflow.steps
+        ]
+        digest = hashlib.sha256(
+            json.dumps(steps, sort_keys=True, default=str).encode()
+        ).hexdigest()[:16]
+        return f"{workflow.id}:{workflow.version}:{digest}"
+
+    def _compile(self, workflow: Workflow, key: str) -> ExecutionPlan:
+        actions = [_validate(i, step) for i, step in enumerate(workflow.steps)]
+        needed = _needed_screenshots(actions)
+
+        kept = [i for i, action in enumerate(actions)
+                if action["action"] != "screenshot" or i in needed]
+        coalesced = coalesce_with_sources([actions[i] for i in kept])
+
+        plan = ExecutionPlan(workflow_id=workflow.id, cache_key=key)
+        for action, sources in coalesced:
+            sources = [kept[i] for i in sources]
+            plan.steps.append(PlanStep(
+                action=action,
+                source_steps=sources,
+                delay=workflow.steps[sources[-1]].delay
+            ))
+
+        plan.report = CompileReport(
+            original_steps=len(workflow.steps),
+            compiled_steps=len(plan.steps),
+            merged_steps=len(kept) - len(plan.steps),
+            dropped_screenshots=len(actions) - len(kept),
+            original_estimate=sum(
+                _action_cost(a) + s.delay for a, s in zip(actions, workflow.steps)
+            ),
+            compiled_estimate=sum(
+                _action_cost(step.action) + (
+                    self.settle_estimate(step.name)
+                    if step.name in SETTLE_ACTIONS and i < len(plan.steps) - 1 else 0.0
+                )
+                for i, step in enumerate(plan.steps)
+            )
+        )
+        return plan
+
+def _validate(index: int, step: WorkflowStep) -> Dict[str, Any]:
+    """Check a step's parameters once and return it as a computer action"""
+    params = dict(step.parameters)
+    action = step.action
+
+    def fail(message: str) -> ValueError:
+        return ValueError(f"Step {index} ({action}): {message}")
+
+    def require_int(*names: str) -> None:
+        for name in names:
+            if not isinstance(params.get(name), (int, float)):
+                raise fail(f"'{name}' must be a number")
+            params[name] = int(params[name])
+
+    if action == "mouse_move":
+        require_int("x", "y")
+    elif action in ("click", "double_click", "right_click"):
+        if "x" in params or "y" in params:
+            require_int("x", "y")
+        if template := params.pop("template", None):
+            # Recorded with a template: find the element, falling back to x, y
+            offset = params.pop("template_offset", None)
+            params = {"template": template, "click": action, **params}
+            if offset is not None:
+                params["offset"] = offset
+            action = "click_image"
+    elif action in ("locate", "click_image"):
+        if not isinstance(params.get("template"), str):
+            raise fail("'template' must be a string")
+    elif action == "type":
+        if not isinstance(params.get("text"), str):
+            raise fail("'text' must be a string")
+    elif action == "press_key":
+        if not isinstance(params.get("key"), str):
+            raise fail("'key' must be a string")
+    elif action == "hotkey":
+        if shortcut := params.pop("shortcut", None):
+            if shortcut not in MAC_SHORTCUTS:
+                raise fail(f"unknown shortcut '{shortcut}'")
+            params["keys"] = list(MAC_SHORTCUTS[shortcut])
+        keys = params.get("keys")
+        if not keys or not all(isinstance(k, str) for k in keys):
+            raise fail("'keys' must be a non-empty list of key names")
+    elif action not in ("screenshot", "get_position"):
+        raise fail("unknown action")
+
+    return {"action": action, **params}
+
+def _needed_screenshots(actions: List[Dict[str, Any]]) -> set:
+    """Screenshots whose image is consumed: the final one, or any marked required"""
+    needed = {i for i, a in enumerate(actions)
+              if a["action"] == "screenshot" and a.get("required")}
+    last = next((i for i in range(len(actions) - 1, -1, -1)
+                 if actions[i]["action"] == "screenshot"), None)
+    if last is not None:
+        needed.add(last)
+    return needed
+
+def _action_cost(action: Dict[str, Any]) -> float:
+    if action["action"] == "type":
+        if len(action["text"]) >= Config.PASTE_THRESHOLD:
+            return 0.1 + Config.PASTE_RESTORE_DELAY
+        return len(action["text"]) * (Config.TYPE_INTERVAL + 0.005)
+    return ACTION_COSTS.get(action["action"], 0.05)
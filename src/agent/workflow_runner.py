@@ -0,0 +1,101 @@
+# src/agent/workflow_runner.py
+import time
+from typing import Optional
+from ..tools.computer import MacComputer
+from ..tools.results import ToolResult, combine_results
+from ..tools.scaling import rescale_action
+from ..utils.logger import logger
+from ..utils.tracing import span
+from ..workflows.manager import WorkflowManager
+from ..workflows.models import WorkflowRun
+from .workflow_compiler import DEFAULT_SETTLE_ESTIMATE, WorkflowCompiler
+
+def settle_estimate(computer: MacComputer, action: str) -> float:
+    """Typical settle wait for an action, from measured statistics when available"""
+    settle = computer.settle
+    if settle is None or (p50 := settle.stats.percentile(action, 50)) is None:
+        return DEFAULT_SETTLE_ESTIMATE
+    return p50 + settle.stable_time
+
+class WorkflowRunner:
+    """Executes saved workflows against one computer, without a model in the loop"""
+
+    def __init__(
+        self,
+        workflow_manager: WorkflowManager,
+        computer: MacComputer,
+        compiler: Optional[WorkflowCompiler] = None
+    ):
+        self.workflow_manager = workflow_manager
+        self.computer = computer
+        self.compiler = compiler or WorkflowCompiler(
+            settle_estimate=lambda action: settle_estimate(computer, action)
+        )
+        # Recorded click templates live in the workflow screenshot store
+        if workflow_manager.screenshots not in computer.template_stores:
+            computer.template_stores.append(workflow_manager.screenshots)
+
+    async def run(self, workflow_id: str) -> ToolResult:
+        """Run a workflow's compiled plan and append the outcome to the run log"""
+        with span("workflow", workflow_id=workflow_id) as traced:
+            result = await self._run(workflow_id)
+            if result.error:
+                traced.set(error=result.error)
+        return result
+
+    async def _run(self, workflow_id: str) -> ToolResult:
+        try:
+            with span("workflow.compile"):
+                workflow = self.workflow_manager.load_workflow(workflow_id)
+                plan = self.compiler.compile(workflow)
+        except Exception as e:
+            logger.error(f"Error executing workflow: {str(e)}")
+            return ToolResult(error=f"Workflow execution failed: {str(e)}")
+
+        # Coordinates were recorded at another model size, or in screen points
+        # before the size was stored; move them into the current model space
+        space = workflow.model_size or (self.computer.width, self.computer.height)
+        model_size = self.computer.scaler.model_size
+
+        run = WorkflowRun(workflow_id=workflow.id, success=False)
+        start = time.perf_counter()
+        results = []
+        try:
+            for i, step in enumerate(plan.steps):
+                if i:
+                    # Continue as soon as the previous step's effect is on screen
+                    previous = plan.steps[i - 1]
+                    await self.computer.wait_for_settle(previous.name, fallback=previous.delay)
+
+                step_start = time.perf_counter()
+                with span("workflow.step", index=i, action=step.name):
+                    result = await self.computer(**rescale_action(step.action, space, model_size))
+                run.step_timings.append(time.perf_counter() - step_start)
+                results.append(result)
+
+                if result.error:
+                    run.failed_step = step.source_steps[0]
+                    run.error = result.error
+                    return ToolResult(
+                        error=f"Workflow failed at step {step.name}: {result.error}"
+                    )
+
+            run.success = True
+            return combine_results(results)
+
+        except Exception as e:
+            logger.error(f"Error executing workflow: {str(e)}")
+            run.failed_step = (
+                plan.steps[len(results)].source_steps[0]
+                if len(results) < len(plan.steps) else None
+            )
+            run.error = str(e)
+            return ToolResult(error=f"Workflow execution failed: {str(e)}")
+
+        finally:
+            # Append to the run log; the workflow definition is not rewritten.
+            # Runs cancelled by a timeout are recorded too.
+            run.duration = time.perf_counter() - start
+            if run.error is None and not run.success:
+                run.error = "Cancelled"
+            self.workflow_manager.record_run(run)
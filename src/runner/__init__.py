@@ -0,0 +1,11 @@
+"""
+Headless runner for executing saved workflows without the UI.
+"""
+
+from .scheduler import SchedulerStatus, WorkflowJob, WorkflowScheduler
+
+__all__ = [
+    'SchedulerStatus',
+    'WorkflowJob',
+    'WorkflowScheduler',
+]
@@ -0,0 +1,99 @@
+# src/runner/cli.py
+"""
+Run saved workflows headlessly.
+
+Usage:
+    python -m src.runner WORKFLOW_ID [WORKFLOW_ID ...] [options]
+    python -m src.runner --tag nightly --concurrency 4 --backend fake
+"""
+import argparse
+import asyncio
+import sys
+from typing import List
+from ..tools.fake_backend import FakeBackend
+from ..utils.config import Config
+from ..utils.metrics import serve_metrics
+from ..utils.tracing import Tracer, activate
+from ..workflows.manager import WorkflowManager
+from .scheduler import WorkflowJob, WorkflowScheduler
+
+def _backend_factory(name: str):
+    if name == "fake":
+        return FakeBackend
+    # Imported here so the fake backend works without pyautogui and Quartz
+    from ..tools.mac_backend import MacBackend
+    return MacBackend
+
+async def _run(scheduler: WorkflowScheduler, interval: float) -> List[WorkflowJob]:
+    await scheduler.start()
+    join = asyncio.create_task(scheduler.join())
+    try:
+        while not join.done():
+            await asyncio.wait({join}, timeout=interval)
+            print(scheduler.status(), file=sys.stderr)
+    finally:
+        await scheduler.stop()
+    return list(scheduler.jobs.values())
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("workflow_ids", nargs="*", help="workflows to run")
+    parser.add_argument("--tag", help="also run every workflow with this tag")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per workflow")
+    parser.add_argument("--priority", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=300.0, help="seconds per run")
+    parser.add_argument("--retries", type=int, default=0)
+    parser.add_argument(
+        "--concurrency", type=int, default=1,
+        help="parallel runs; above 1 only with an isolated backend such as fake"
+    )
+    parser.add_argument("--backend", choices=["mac", "fake"], default="mac")
+    parser.add_argument("--storage-dir", default=Config.WORKFLOWS_DIR)
+    parser.add_argument("--status-interval", type=float, default=5.0)
+    parser.add_argument("--trace", metavar="PATH", help="write a Chrome trace of the runs")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.backend == "mac" and args.concurrency > 1:
+        # Every worker would drive the same display, mouse and clipboard
+        parser.error("--backend mac shares one physical display; use --concurrency 1")
+
+    serve_metrics()
+    manager = WorkflowManager(storage_dir=args.storage_dir)
+    workflow_ids = list(args.workflow_ids)
+    if args.tag:
+        workflow_ids += [s.id for s in manager.list_summaries(tag=args.tag)]
+    if not workflow_ids:
+        parser.error("no workflows to run")
+
+    scheduler = WorkflowScheduler(
+        manager,
+        backend_factory=_backend_factory(args.backend),
+        concurrency=args.concurrency,
+        default_timeout=args.timeout,
+        default_retries=args.retries,
+        # Only real runs teach the interactive agent how long this display takes
+        settle_stats_path=Config.SETTLE_STATS_PATH if args.backend == "mac" else None
+    )
+    for _ in range(args.repeat):
+        for workflow_id in workflow_ids:
+            scheduler.submit(workflow_id, priority=args.priority)
+
+    tracer = Tracer(session="runner") if args.trace else None
+    with activate(tracer):
+        jobs = asyncio.run(_run(scheduler, args.status_interval))
+    if tracer is not None:
+        print(f"Trace written to {tracer.export(args.trace)}", file=sys.stderr)
+    for job in jobs:
+        duration = (job.finished_at or 0) - (job.started_at or 0)
+        line = f"{job.id}  {job.workflow_id}  {job.status:<9}  {duration:6.2f}s  attempts={job.attempts}"
+        if job.result and job.result.error:
+            line += f"  {job.result.error}"
+        print(line)
+    print(scheduler.status())
+    return 0 if all(job.status == "succeeded" for job in jobs) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
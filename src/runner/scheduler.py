@@ -0,0 +1,207 @@
+# src/runner/scheduler.py
+import asyncio
+import itertools
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Literal, Optional
+from ..agent.workflow_compiler import WorkflowCompiler
+from ..agent.workflow_runner import WorkflowRunner
+from ..tools.base import BaseBackend
+from ..tools.computer import MacComputer
+from ..tools.results import ToolResult
+from ..tools.settle import SettleStats
+from ..utils.logger import logger
+from ..workflows.manager import WorkflowManager
+
+JobStatus = Literal["queued", "running", "succeeded", "failed", "timed_out"]
+
+@dataclass
+class WorkflowJob:
+    workflow_id: str
+    priority: int = 0
+    timeout: Optional[float] = None
+    retries: int = 0
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    status: JobStatus = "queued"
+    attempts: int = 0
+    result: Optional[ToolResult] = None
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed", "timed_out")
+
+@dataclass
+class SchedulerStatus:
+    queued: int
+    running: int
+    succeeded: int
+    failed: int
+    retried: int
+    # Completed runs per minute over the recent window
+    throughput: float
+    uptime: float
+
+    def __str__(self) -> str:
+        return (
+            f"queued={self.queued} running={self.running} succeeded={self.succeeded} "
+            f"failed={self.failed} retried={self.retried} "
+            f"throughput={self.throughput:.1f}/min uptime={self.uptime:.0f}s"
+        )
+
+class WorkflowScheduler:
+    """Runs queued workflows by priority, up to N at once, each on its own backend
+
+    Every worker owns a MacComputer built from backend_factory, so runs never
+    share input devices. On a single physical display use concurrency=1;
+    higher values need isolated backends such as virtual displays or FakeBackend.
+    Workers share one SettleStats, persisted only when settle_stats_path is
+    set, so runs on other backends never overwrite the display's timings.
+    """
+
+    def __init__(
+        self,
+        workflow_manager: WorkflowManager,
+        backend_factory: Callable[[], BaseBackend],
+        concurrency: int = 1,
+        default_timeout: float = 300.0,
+        default_retries: int = 0,
+        throughput_window: float = 300.0,
+        settle_stats_path: Optional[str] = None
+    ):
+        self.workflow_manager = workflow_manager
+        self.backend_factory = backend_factory
+        self.concurrency = concurrency
+        self.default_timeout = default_timeout
+        self.default_retries = default_retries
+        self.throughput_window = throughput_window
+        self.jobs: Dict[str, WorkflowJob] = {}
+        self.compiler = WorkflowCompiler()
+        self.settle_stats = SettleStats(path=settle_stats_path)
+
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._order = itertools.count()
+        self._workers: List[asyncio.Task] = []
+        self._completions: Deque[float] = deque()
+        self._retried = 0
+        self._started_at: Optional[float] = None
+
+    def submit(
+        self,
+        workflow_id: str,
+        priority: int = 0,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None
+    ) -> WorkflowJob:
+        """Queue a workflow run; higher priority runs first, FIFO within a priority"""
+        job = WorkflowJob(
+            workflow_id=workflow_id,
+            priority=priority,
+            timeout=timeout or self.default_timeout,
+            retries=self.default_retries if retries is None else retries
+        )
+        self.jobs[job.id] = job
+        self._enqueue(job)
+        return job
+
+    async def start(self) -> None:
+        """Start the workers; safe to call more than once"""
+        if self._workers:
+            return
+        self._started_at = time.monotonic()
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"workflow-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+
+    async def join(self) -> None:
+        """Wait until every queued run, including retries, has finished"""
+        await self._queue.join()
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def run(self) -> List[WorkflowJob]:
+        """Run everything submitted so far to completion"""
+        await self.start()
+        try:
+            await self.join()
+        finally:
+            await self.stop()
+        return list(self.jobs.values())
+
+    def status(self) -> SchedulerStatus:
+        now = time.monotonic()
+        while self._completions and now - self._completions[0] > self.throughput_window:
+            self._completions.popleft()
+        uptime = now - self._started_at if self._started_at else 0.0
+        window = max(min(self.throughput_window, uptime), 1.0)
+
+        counts = {"queued": 0, "running": 0, "succeeded": 0, "failed": 0, "timed_out": 0}
+        for job in self.jobs.values():
+            counts[job.status] += 1
+        return SchedulerStatus(
+            queued=counts["queued"],
+            running=counts["running"],
+            succeeded=counts["succeeded"],
+            failed=counts["failed"] + counts["timed_out"],
+            retried=self._retried,
+            throughput=len(self._completions) * 60 / window,
+            uptime=uptime
+        )
+
+    def _enqueue(self, job: WorkflowJob) -> None:
+        self._queue.put_nowait((-job.priority, next(self._order), job))
+
+    async def _worker(self, index: int) -> None:
+        computer = MacComputer(backend=self.backend_factory(), settle_stats=self.settle_stats)
+        runner = WorkflowRunner(self.workflow_manager, computer, self.compiler)
+        try:
+            while True:
+                _, _, job = await self._queue.get()
+                try:
+                    await self._run_job(job, runner, computer)
+                finally:
+                    self._queue.task_done()
+        finally:
+            computer.close()
+
+    async def _run_job(
+        self,
+        job: WorkflowJob,
+        runner: WorkflowRunner,
+        computer: MacComputer
+    ) -> None:
+        job.status = "running"
+        job.attempts += 1
+        job.started_at = time.time()
+        try:
+            job.result = await asyncio.wait_for(runner.run(job.workflow_id), job.timeout)
+            job.status = "failed" if job.result.error else "succeeded"
+        except asyncio.TimeoutError:
+            computer.cancel_pending()
+            job.result = ToolResult(
+                error=f"Workflow timed out after {job.timeout:g}s", status="timeout"
+            )
+            job.status = "timed_out"
+        job.finished_at = time.time()
+
+        if job.status != "succeeded" and job.attempts <= job.retries:
+            logger.info(
+                f"Retrying workflow {job.workflow_id} (attempt {job.attempts + 1}): "
+                f"{job.result.error}"
+            )
+            self._retried += 1
+            job.status = "queued"
+            self._enqueue(job)
+            return
+
+        self._completions.append(time.monotonic())
+        logger.info(f"Workflow job {job.id} {job.status} after {job.attempts} attempt(s)")
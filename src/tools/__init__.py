@@ -3,12 +3,27 @@
 Tools module containing computer control implementations.
 """
 
-from .base import BaseTool
+from .base import BaseBackend, BaseTool
+from .batch import BatchResult, coalesce_actions
 from .computer import MacComputer
-from .results import ToolResult
+from .fake_backend import FakeBackend
+from .frame_grabber import Frame, FrameGrabber
+from .locator import Match, TemplateLocator
+from .results import ToolResult, combine_results
+from .scaling import ScreenScaler
 
 __all__ = [
+    'BaseBackend',
     'BaseTool',
+    'BatchResult',
+    'FakeBackend',
+    'Frame',
+    'FrameGrabber',
     'MacComputer',
+    'Match',
+    'ScreenScaler',
+    'TemplateLocator',
     'ToolResult',
+    'coalesce_actions',
+    'combine_results',
 ]
\ No newline at end of file
@@ -1,7 +1,74 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Optional, Tuple
+from PIL import Image
 
 class BaseTool(ABC):
     @abstractmethod
     async def __call__(self, **kwargs) -> Any:
-        pass
\ No newline at end of file
+        pass
+
+class BaseBackend(ABC):
+    """Blocking input and capture primitives that a computer tool drives"""
+
+    @abstractmethod
+    def screen_size(self) -> Tuple[float, float]:
+        pass
+
+    def scale_factor(self) -> float:
+        """Captured pixels per screen point, e.g. 2.0 on Retina displays"""
+        return 1.0
+
+    @abstractmethod
+    def move_to(self, x: int, y: int) -> None:
+        pass
+
+    @abstractmethod
+    def click(
+        self,
+        x: Optional[int] = None,
+        y: Optional[int] = None,
+        clicks: int = 1,
+        button: str = "left"
+    ) -> None:
+        pass
+
+    @abstractmethod
+    def write(self, text: str, interval: float = 0.0) -> None:
+        pass
+
+    @abstractmethod
+    def press(self, key: str) -> None:
+        pass
+
+    @abstractmethod
+    def hotkey(self, *keys: str) -> None:
+        pass
+
+    @abstractmethod
+    def position(self) -> Tuple[int, int]:
+        pass
+
+    @abstractmethod
+    def screenshot(self, region: Optional[Tuple[int, int, int, int]] = None) -> Image.Image:
+        """Capture the screen, or only region (x, y, width, height in points), in pixels"""
+        pass
+
+    def probe(self) -> Image.Image:
+        """A cheap full-screen capture for change detection, at any resolution"""
+        return self.screenshot()
+
+    def window_bounds(self, name: str) -> Optional[Tuple[int, int, int, int]]:
+        """Bounds in points of the frontmost window whose app or title matches name"""
+        return None
+
+    def focused_text(self) -> Optional[str]:
+        """Value of the focused text element, or None when it cannot be read"""
+        return None
+
+    @abstractmethod
+    def get_clipboard(self) -> str:
+        pass
+
+    @abstractmethod
+    def set_clipboard(self, text: str) -> None:
+        pass
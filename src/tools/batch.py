@@ -0,0 +1,58 @@
+# src/tools/batch.py
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from .results import ToolResult
+
+CLICK_ACTIONS = {"click", "double_click", "right_click"}
+
+@dataclass
+class BatchResult:
+    # Actions as executed, after coalescing
+    actions: List[Dict[str, Any]]
+    # One result and duration in seconds per executed action; shorter than
+    # actions when the batch stopped on an error
+    results: List[ToolResult] = field(default_factory=list)
+    timings: List[float] = field(default_factory=list)
+    total_time: float = 0.0
+    original_count: int = 0
+
+    @property
+    def error(self) -> Optional[str]:
+        return next((r.error for r in self.results if r.error), None)
+
+def coalesce_actions(actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Collapse redundant input events without changing what ends up on screen
+
+    - consecutive mouse_moves keep only the final target
+    - a mouse_move followed by a click becomes a single click at that point
+    - adjacent type actions are merged into one
+    """
+    return [action for action, _ in coalesce_with_sources(actions)]
+
+def coalesce_with_sources(
+    actions: List[Dict[str, Any]]
+) -> List[Tuple[Dict[str, Any], List[int]]]:
+    """Coalesce actions, pairing each result with the indices it was built from"""
+    coalesced: List[Tuple[Dict[str, Any], List[int]]] = []
+    for index, action in enumerate(actions):
+        action = dict(action)
+        previous, sources = coalesced[-1] if coalesced else (None, [])
+        kind = action.get("action")
+
+        if previous and previous["action"] == "mouse_move":
+            if kind == "mouse_move":
+                coalesced[-1] = (action, sources + [index])
+                continue
+            if kind in CLICK_ACTIONS:
+                if action.get("x") is None or action.get("y") is None:
+                    action["x"], action["y"] = previous["x"], previous["y"]
+                coalesced[-1] = (action, sources + [index])
+                continue
+
+        if previous and kind == "type" and previous["action"] == "type":
+            previous["text"] = previous["text"] + action["text"]
+            sources.append(index)
+            continue
+
+        coalesced.append((action, [index]))
+    return coalesced
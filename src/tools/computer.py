@@ -1,28 +1,154 @@
 # src/tools/computer.py
 import asyncio
 import base64
-from datetime import datetime
+import contextvars
+import io
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
+from functools import partial
 from pathlib import Path
-from typing import Optional, Literal, Dict, Any
-import pyautogui
-import Quartz
+from typing import Optional, Literal, Dict, Any, List, Set, Tuple, Union, Callable
+import numpy as np
 from PIL import Image
-import AppKit
+from ..utils.config import Config
 from ..utils.logger import logger
-from .base import BaseTool
+from ..utils.metrics import ACTION_SECONDS
+from ..utils.tracing import span
+from .base import BaseBackend, BaseTool
+from .batch import BatchResult, coalesce_actions
+from .encoding import EncodedImage, EncodingOptions, ScreenshotEncoder
+from .frame_diff import FrameDelta, FrameDiffer
+from .frame_grabber import Frame, FrameGrabber
+from .locator import Match, Template, TemplateLocator
 from .results import ToolResult
+from .scaling import ScreenScaler, parse_size
+from .screenshot_store import REF_PREFIX, ScreenshotStore, screenshot_ref
+from .settle import SETTLE_ACTIONS, SettleDetector, SettleStats, probe_pixels
+
+# Actions that only observe the screen and may overlap with input actions
+READ_ONLY_ACTIONS = {"screenshot", "get_position", "locate"}
+# Executor calls started by the input action running in the current context
+_backend_calls: contextvars.ContextVar[Optional[List[Future]]] = contextvars.ContextVar(
+    "backend_calls", default=None
+)
+
+# Backend click arguments per click action
+CLICK_STYLES = {
+    "click": {},
+    "double_click": {"clicks": 2},
+    "right_click": {"button": "right"},
+}
+
+# Per-action timeouts in seconds, overriding Config.ACTION_TIMEOUT
+ACTION_TIMEOUTS = {
+    "type": 120.0,
+    "screenshot": 30.0,
+}
 
 class MacComputer(BaseTool):
-    def __init__(self):
+    def __init__(
+        self,
+        encoding: Optional[EncodingOptions] = None,
+        save_screenshots: Optional[bool] = None,
+        frame_diff: Optional[bool] = None,
+        backend: Optional[BaseBackend] = None,
+        action_timeouts: Optional[Dict[str, float]] = None,
+        max_concurrent_actions: Optional[int] = None,
+        model_size: Optional[Tuple[int, int]] = None,
+        frame_grabber: Optional[bool] = None,
+        settle_stats: Optional[SettleStats] = None
+    ):
+        if backend is None:
+            # Imported here so other backends work without pyautogui and Quartz
+            from .mac_backend import MacBackend
+            backend = MacBackend()
+        self.backend = backend
+        
         # Get screen dimensions
-        screen = Quartz.CGDisplayBounds(Quartz.CGMainDisplayID())
-        self.width = screen.size.width
-        self.height = screen.size.height
+        self.width, self.height = backend.screen_size()
+        
+        encoding = encoding or EncodingOptions(
+            format=Config.SCREENSHOT_FORMAT,
+            quality=Config.SCREENSHOT_QUALITY,
+            max_dimension=Config.SCREENSHOT_MAX_DIMENSION
+        )
+        # Screenshots are sent at model_size and the model's coordinates are
+        # mapped back to screen points, whatever the display's pixel density
+        self.scaler = ScreenScaler(
+            (self.width, self.height),
+            target=model_size or parse_size(Config.MODEL_SCREEN_SIZE),
+            max_dimension=encoding.max_dimension,
+            scale_factor=backend.scale_factor()
+        )
+        
+        # Blocking backend calls run here instead of on the event loop
+        self._executor = ThreadPoolExecutor(
+            max_workers=Config.ACTION_WORKERS,
+            thread_name_prefix="mac-computer"
+        )
+        self.action_timeout = Config.ACTION_TIMEOUT
+        self.action_timeouts = {**ACTION_TIMEOUTS, **(action_timeouts or {})}
+        self.max_concurrent_actions = (
+            max_concurrent_actions or Config.MAX_CONCURRENT_ACTIONS
+        )
+        self._limits_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Set[asyncio.Future] = set()
+        self._cancelled: Set[asyncio.Future] = set()
+        
+        self.save_screenshots = (
+            Config.SAVE_SCREENSHOTS if save_screenshots is None else save_screenshots
+        )
+        self.screenshot_store = ScreenshotStore(
+            root=Config.SCREENSHOTS_DIR,
+            max_bytes=Config.SCREENSHOT_STORE_MAX_MB * 1024 * 1024 or None,
+            max_age=Config.SCREENSHOT_STORE_MAX_AGE_DAYS * 86400 or None
+        ) if self.save_screenshots else None
+        
+        self.encoder = ScreenshotEncoder(
+            options=encoding,
+            max_workers=Config.SCREENSHOT_ENCODER_WORKERS
+        )
+        
+        # Waits for the screen to stop changing instead of fixed sleeps
+        self.settle = SettleDetector(
+            capture=self._probe_frame,
+            stable_time=Config.SETTLE_STABLE_MS / 1000,
+            max_wait=Config.SETTLE_MAX_WAIT,
+            quiet_time=Config.SETTLE_QUIET_MS / 1000,
+            poll_interval=Config.SETTLE_POLL_MS / 1000,
+            stats=settle_stats or SettleStats(path=Config.SETTLE_STATS_PATH)
+        ) if Config.ADAPTIVE_SETTLE else None
         
-        # Configure PyAutoGUI
-        pyautogui.FAILSAFE = False
-        self.screenshot_dir = Path("data/screenshots")
-        self.screenshot_dir.mkdir(parents=True, exist_ok=True)
+        # Previous frame of this session, used to send only what changed
+        if Config.SCREENSHOT_DIFF if frame_diff is None else frame_diff:
+            self.frame_differ = FrameDiffer(full_frame_ratio=Config.SCREENSHOT_DIFF_FULL_RATIO)
+        else:
+            self.frame_differ = None
+        
+        # Frames captured ahead of time so screenshots skip the capture cost
+        self._last_input = 0.0
+        self._probe_after = 0.0
+        # Action name and settle probe captured just before the last input action
+        self._settle_baseline: Optional[Tuple[str, np.ndarray]] = None
+        if Config.FRAME_GRABBER if frame_grabber is None else frame_grabber:
+            self.grabber = FrameGrabber(
+                capture=backend.screenshot,
+                fps=Config.FRAME_GRABBER_FPS,
+                buffer_size=Config.FRAME_GRABBER_BUFFER,
+                idle_timeout=Config.FRAME_GRABBER_IDLE
+            ).start()
+        else:
+            self.grabber = None
+        
+        # Finds recorded template images on screen; templates referenced by
+        # store ref are looked up in template_stores
+        self.locator = TemplateLocator(threshold=Config.LOCATE_THRESHOLD)
+        self.template_stores: List[ScreenshotStore] = (
+            [self.screenshot_store] if self.screenshot_store else []
+        )
+        # Asked at click time whether a workflow is recording, so clicks save a template crop
+        self.record_templates: Callable[[], bool] = lambda: False
         
     async def __call__(
         self,
@@ -35,62 +161,615 @@ class MacComputer(BaseTool):
             "screenshot",
             "get_position",
             "press_key",
-            "hotkey"
+            "hotkey",
+            "locate",
+            "click_image"
         ],
+        timeout: Optional[float] = None,
         **kwargs
     ) -> ToolResult:
-        try:
-            method = getattr(self, f"_handle_{action}")
-            return await method(**kwargs)
-        except AttributeError:
+        method = getattr(self, f"_handle_{action}", None)
+        if method is None:
             return ToolResult(error=f"Unknown action: {action}")
+        
+        with span("action", action=action) as traced:
+            start = time.perf_counter()
+            result = await self._call(action, method, timeout, kwargs)
+            status = _status(result)
+            ACTION_SECONDS.observe(time.perf_counter() - start, action=action, status=status)
+            traced.set(status=status)
+        return result
+        
+    async def _call(
+        self,
+        action: str,
+        method,
+        timeout: Optional[float],
+        kwargs: Dict[str, Any]
+    ) -> ToolResult:
+        """Run one action under its timeout, turning failures into error results"""
+        timeout = timeout or self.action_timeouts.get(action, self.action_timeout)
+        task = asyncio.ensure_future(self._dispatch(action, method, kwargs))
+        self._pending.add(task)
+        try:
+            return await asyncio.wait_for(task, timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Computer action {action} timed out after {timeout}s")
+            error = f"Timed out after {timeout:g}s performing {action}"
+            if action not in READ_ONLY_ACTIONS:
+                error += "; the input may still complete"
+            return ToolResult(error=error, status="timeout")
+        except asyncio.CancelledError:
+            # Only swallow cancellations requested through cancel_pending()
+            if task not in self._cancelled:
+                raise
+            return ToolResult(error=f"Cancelled {action}", status="cancelled")
         except Exception as e:
             logger.error(f"Error in computer action {action}: {str(e)}")
             return ToolResult(error=f"Error performing {action}: {str(e)}")
+        finally:
+            self._pending.discard(task)
+            self._cancelled.discard(task)
+            
+    async def batch(
+        self,
+        actions: List[Dict[str, Any]],
+        coalesce: bool = True,
+        stop_on_error: bool = True,
+        settle: bool = True
+    ) -> BatchResult:
+        """Run actions back to back, coalescing redundant input events first
+
+        With settle, each action waits for the screen to settle after the
+        previous one; the final action does not wait.
+        """
+        planned = coalesce_actions(actions) if coalesce else [dict(a) for a in actions]
+        batch = BatchResult(actions=planned, original_count=len(actions))
+        
+        start = time.perf_counter()
+        for i, action in enumerate(planned):
+            if i and settle:
+                await self.wait_for_settle(planned[i - 1]["action"])
+            action_start = time.perf_counter()
+            result = await self(**action)
+            batch.timings.append(time.perf_counter() - action_start)
+            batch.results.append(result)
+            if result.error and stop_on_error:
+                break
+        batch.total_time = time.perf_counter() - start
+        
+        logger.debug(
+            f"Ran {len(batch.results)} of {len(planned)} actions "
+            f"({len(actions)} before coalescing) in {batch.total_time:.3f}s"
+        )
+        return batch
             
+    async def wait_for_settle(self, action: str, fallback: float = 0.0) -> float:
+        """Wait until the screen stops changing after an action
+        
+        Sleeps for the fallback delay instead when adaptive settling is disabled;
+        otherwise the fallback is the least time to wait for a first change.
+        """
+        if self.settle is None:
+            with span("delay", action=action, seconds=fallback):
+                await asyncio.sleep(fallback)
+            return fallback
+        if action not in SETTLE_ACTIONS:
+            return 0.0
+        baseline, self._settle_baseline = self._settle_baseline, None
+        with span("settle", action=action) as traced:
+            waited = await self.settle.wait(
+                action,
+                hint=fallback,
+                baseline=baseline[1] if baseline and baseline[0] == action else None
+            )
+            traced.set(seconds=waited)
+        return waited
+        
+    async def _capture_screen(self) -> Image.Image:
+        """A full-screen capture showing the effect of the last input action"""
+        if self.grabber is not None:
+            frame = await self._run(
+                self.grabber.wait_for, self._last_input, max(1.0, 3 * self.grabber.interval)
+            )
+            if frame is not None:
+                return frame.image()
+            logger.warning("No fresh frame from the frame grabber; capturing directly")
+        return await self._run(self.backend.screenshot)
+        
+    async def _baseline_probe(self) -> Optional[np.ndarray]:
+        """A settle probe of the screen before an input action"""
+        try:
+            if self.grabber is not None and (frame := self.grabber.latest()) is not None:
+                return await self.encoder.run(_frame_probe, frame, self.settle.probe_width)
+            image = await self._run(self.backend.probe)
+            return await self.encoder.run(probe_pixels, image, self.settle.probe_width)
+        except Exception as e:
+            logger.debug(f"Settle baseline probe failed: {str(e)}")
+            return None
+        
+    async def _probe_frame(self) -> np.ndarray:
+        """A settle probe, from the frame grabber when it has a newer frame"""
+        if self.grabber is not None:
+            # Each probe needs a frame captured after both the input and the last probe
+            after = max(self._last_input, self._probe_after)
+            frame = await self._run(
+                self.grabber.wait_for, after, max(1.0, 3 * self.grabber.interval)
+            )
+            if frame is not None:
+                self._probe_after = frame.timestamp + 1e-6
+                return await self.encoder.run(_frame_probe, frame, self.settle.probe_width)
+        image = await self._run(self.backend.probe)
+        return await self.encoder.run(probe_pixels, image, self.settle.probe_width)
+            
+    def cancel_pending(self) -> int:
+        """Cancel in-flight actions and return how many this call cancelled
+        
+        Their callers receive a cancelled ToolResult.
+        """
+        count = 0
+        for task in self._pending:
+            if not task.done() and task not in self._cancelled:
+                self._cancelled.add(task)
+                task.cancel()
+                count += 1
+        return count
+        
+    def close(self) -> None:
+        """Release the worker threads"""
+        if self.grabber is not None:
+            self.grabber.stop()
+        if self.settle is not None:
+            self.settle.stats.save()
+        self._executor.shutdown(wait=False)
+        self.encoder.shutdown(wait=False)
+            
+    async def _dispatch(self, action: str, method, kwargs: Dict[str, Any]) -> ToolResult:
+        slots, input_lock = self._limits()
+        async with slots:
+            if action in READ_ONLY_ACTIONS:
+                return await method(**kwargs)
+            # Input events from concurrent callers must not interleave
+            await input_lock.acquire()
+            calls: List[Future] = []
+            token = _backend_calls.set(calls)
+            try:
+                if self.settle is not None and action in SETTLE_ACTIONS:
+                    self._settle_baseline = (action, await self._baseline_probe())
+                return await method(**kwargs)
+            finally:
+                _backend_calls.reset(token)
+                self._release_input(input_lock, calls)
+                
+    def _release_input(self, input_lock: asyncio.Lock, calls: List[Future]) -> None:
+        """Release the input lock once every backend call of the action has finished
+        
+        A timed-out or cancelled action stops awaiting its backend calls, but
+        a call already running on the executor keeps sending input.
+        """
+        loop = asyncio.get_running_loop()
+        running = [call for call in calls if not call.done()]
+        
+        def release() -> None:
+            # Later screenshots must be captured after this input
+            self._last_input = time.monotonic()
+            input_lock.release()
+        
+        if not running:
+            release()
+            return
+        logger.warning(f"Holding input until {len(running)} abandoned backend call(s) finish")
+        remaining = len(running)
+        
+        def finished() -> None:
+            nonlocal remaining
+            remaining -= 1
+            if not remaining:
+                release()
+        
+        def on_done(_: Future) -> None:
+            try:
+                loop.call_soon_threadsafe(finished)
+            except RuntimeError:
+                # The event loop has closed; nothing waits on the lock any more
+                pass
+        
+        for call in running:
+            call.add_done_callback(on_done)
+                
+    def _limits(self):
+        """Concurrency primitives bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._limits_loop is not loop:
+            self._limits_loop = loop
+            self._action_slots = asyncio.Semaphore(self.max_concurrent_actions)
+            self._input_lock = asyncio.Lock()
+        return self._action_slots, self._input_lock
+        
+    async def _run(self, fn, *args, **kwargs):
+        """Run a blocking backend call on the executor"""
+        call = self._executor.submit(partial(fn, *args, **kwargs))
+        calls = _backend_calls.get()
+        if calls is not None:
+            calls.append(call)
+        return await asyncio.wrap_future(call)
+            
+    def _to_screen(
+        self,
+        x: Optional[int],
+        y: Optional[int]
+    ) -> Tuple[Optional[int], Optional[int]]:
+        """Map optional model coordinates to screen points"""
+        if x is None or y is None:
+            return None, None
+        return self.scaler.to_screen(x, y)
+        
     async def _handle_mouse_move(self, x: int, y: int, **kwargs) -> ToolResult:
-        pyautogui.moveTo(x, y)
+        await self._run(self.backend.move_to, *self.scaler.to_screen(x, y))
         return ToolResult(output=f"Moved mouse to {x}, {y}")
         
-    async def _handle_click(self, **kwargs) -> ToolResult:
-        pyautogui.click()
-        return ToolResult(output="Clicked")
+    async def _handle_click(
+        self,
+        x: Optional[int] = None,
+        y: Optional[int] = None,
+        **kwargs
+    ) -> ToolResult:
+        template = await self._record_template(x, y)
+        await self._run(self.backend.click, *self._to_screen(x, y))
+        return ToolResult(output=f"Clicked{_at(x, y)}", template=template)
         
-    async def _handle_double_click(self, **kwargs) -> ToolResult:
-        pyautogui.click(clicks=2)
-        return ToolResult(output="Double clicked")
+    async def _handle_double_click(
+        self,
+        x: Optional[int] = None,
+        y: Optional[int] = None,
+        **kwargs
+    ) -> ToolResult:
+        template = await self._record_template(x, y)
+        await self._run(self.backend.click, *self._to_screen(x, y), clicks=2)
+        return ToolResult(output=f"Double clicked{_at(x, y)}", template=template)
         
-    async def _handle_right_click(self, **kwargs) -> ToolResult:
-        pyautogui.click(button='right')
-        return ToolResult(output="Right clicked")
+    async def _handle_right_click(
+        self,
+        x: Optional[int] = None,
+        y: Optional[int] = None,
+        **kwargs
+    ) -> ToolResult:
+        template = await self._record_template(x, y)
+        await self._run(self.backend.click, *self._to_screen(x, y), button='right')
+        return ToolResult(output=f"Right clicked{_at(x, y)}", template=template)
         
-    async def _handle_type(self, text: str, **kwargs) -> ToolResult:
-        pyautogui.write(text, interval=0.01)
+    async def _record_template(
+        self,
+        x: Optional[int],
+        y: Optional[int]
+    ) -> Optional[Dict[str, Any]]:
+        """A crop around a click target, taken before the click while recording"""
+        if not self.record_templates() or x is None or y is None:
+            return None
+        px, py = self.scaler.to_screen(x, y)
+        half = Config.CLICK_TEMPLATE_SIZE / 2
+        points = self.scaler.clip(px - half, py - half, 2 * half, 2 * half)
+        if points is None:
+            return None
+        capture = await self._run(self.backend.screenshot, points)
+        density = capture.width / points[2]
+        buffer = io.BytesIO()
+        await self.encoder.run(partial(capture.save, buffer, format="PNG"))
+        return {
+            "base64_image": base64.b64encode(buffer.getvalue()).decode(),
+            # Click point within the crop, in template pixels
+            "offset": [round((px - points[0]) * density), round((py - points[1]) * density)],
+        }
+        
+    async def _handle_locate(
+        self,
+        template: str,
+        region: Optional[List[float]] = None,
+        threshold: Optional[float] = None,
+        **kwargs
+    ) -> ToolResult:
+        found = await self._locate(template, region, threshold)
+        if isinstance(found, ToolResult):
+            return found
+        match, center = found
+        x, y = self.scaler.to_model(*center)
+        return ToolResult(
+            output=f"Found template at {x}, {y} with confidence {match.score:.2f}",
+            match={"x": x, "y": y, "confidence": match.score, "scale": match.scale}
+        )
+        
+    async def _handle_click_image(
+        self,
+        template: str,
+        region: Optional[List[float]] = None,
+        threshold: Optional[float] = None,
+        click: str = "click",
+        offset: Optional[List[int]] = None,
+        x: Optional[int] = None,
+        y: Optional[int] = None,
+        **kwargs
+    ) -> ToolResult:
+        """Click a template found on screen, falling back to x, y when it is not found"""
+        if click not in CLICK_STYLES:
+            return ToolResult(error=f"Unknown click type: {click}")
+        
+        found = None
+        if region is None and x is not None and y is not None:
+            # Look near the recorded position first, where the element usually is
+            margin = 4 * Config.CLICK_TEMPLATE_SIZE / self.scaler.x_ratio
+            found = await self._locate(
+                template, [x - margin, y - margin, 2 * margin, 2 * margin], threshold, offset
+            )
+        if found is None or isinstance(found, ToolResult):
+            found = await self._locate(template, region, threshold, offset)
+        
+        if isinstance(found, ToolResult):
+            if x is None or y is None:
+                return found
+            logger.warning(f"Template not found; clicking recorded position {x}, {y}")
+            await self._run(self.backend.click, *self.scaler.to_screen(x, y), **CLICK_STYLES[click])
+            return ToolResult(output=f"Template not found; clicked recorded position {x}, {y}")
+        
+        match, center = found
+        await self._run(self.backend.click, *center, **CLICK_STYLES[click])
+        mx, my = self.scaler.to_model(*center)
+        return ToolResult(
+            output=f"Clicked template at {mx}, {my} with confidence {match.score:.2f}",
+            match={"x": mx, "y": my, "confidence": match.score, "scale": match.scale}
+        )
+        
+    async def _locate(
+        self,
+        template: str,
+        region: Optional[List[float]],
+        threshold: Optional[float],
+        offset: Optional[List[int]] = None
+    ) -> Union[ToolResult, Tuple[Match, Tuple[int, int]]]:
+        """The best match and its click point in screen points, or an error result"""
+        if region is not None:
+            points = self.scaler.region_to_screen(*region)
+            if points is None:
+                return ToolResult(error="Region lies outside the screen")
+        else:
+            points = (0, 0, self.width, self.height)
+        
+        try:
+            prepared = self._template(template)
+        except (OSError, ValueError) as e:
+            return ToolResult(error=f"Cannot load template: {str(e)}")
+        capture = await self._run(self.backend.screenshot, points)
+        match: Optional[Match] = await self.encoder.run(
+            self.locator.locate, capture, prepared, threshold
+        )
+        if match is None:
+            return ToolResult(error="Template not found on screen")
+        
+        # Capture pixels back to screen points
+        density = capture.width / points[2]
+        if offset is not None:
+            cx, cy = match.x + offset[0] * match.scale, match.y + offset[1] * match.scale
+        else:
+            cx, cy = match.center
+        return match, (round(points[0] + cx / density), round(points[1] + cy / density))
+        
+    def _template(self, template: str) -> Template:
+        """A prepared template from a store ref, a file path or base64 image data"""
+        if template.startswith(REF_PREFIX):
+            def load() -> Image.Image:
+                for store in self.template_stores:
+                    if (data := store.load(template)) is not None:
+                        return Image.open(io.BytesIO(data))
+                raise ValueError(f"unknown template {template}")
+            return self.locator.template(template, load)
+        if len(template) < 1024 and Path(template).is_file():
+            return self.locator.template(template, lambda: Image.open(template))
+        data = base64.b64decode(template, validate=True)
+        return self.locator.template(screenshot_ref(data), lambda: Image.open(io.BytesIO(data)))
+        
+    async def _handle_type(
+        self,
+        text: str,
+        strategy: Literal["auto", "paste", "keys"] = "auto",
+        **kwargs
+    ) -> ToolResult:
+        start = time.perf_counter()
+        used = "keys"
+        if strategy == "paste" or (strategy == "auto" and len(text) >= Config.PASTE_THRESHOLD):
+            try:
+                if await self._paste(text):
+                    used = "paste"
+                elif strategy == "paste":
+                    return ToolResult(error="Paste had no effect on the focused element")
+                else:
+                    logger.warning("Focused element ignored the paste, typing instead")
+            except Exception as e:
+                if strategy == "paste":
+                    raise
+                logger.warning(f"Clipboard paste failed, typing instead: {str(e)}")
+        if used == "keys":
+            await self._run(self.backend.write, text, interval=Config.TYPE_INTERVAL)
+        
+        elapsed = time.perf_counter() - start
+        logger.info(f"Typed {len(text)} characters via {used} in {elapsed:.3f}s")
         return ToolResult(output=f"Typed: {text}")
         
-    async def _handle_screenshot(self, **kwargs) -> ToolResult:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = self.screenshot_dir / f"screenshot_{timestamp}.png"
+    async def _paste(self, text: str) -> bool:
+        """Paste text through the clipboard, restoring the user's clipboard after
         
-        screenshot = pyautogui.screenshot()
-        screenshot.save(filename)
+        Returns False when the focused element's value did not change, e.g. a
+        field that ignores Cmd+V. Elements whose value cannot be read count as
+        pasted. Raises only if the paste keystroke was not sent; failures after
+        it are logged so the caller never types the text a second time.
+        """
+        before = await self._focused_text()
+        previous = await self._run(self.backend.get_clipboard)
+        await self._run(self.backend.set_clipboard, text)
+        try:
+            await self._run(self.backend.hotkey, "command", "v")
+            # The target app reads the clipboard asynchronously after the keystroke
+            await asyncio.sleep(Config.PASTE_RESTORE_DELAY)
+        finally:
+            try:
+                await self._run(self.backend.set_clipboard, previous)
+            except Exception as e:
+                logger.error(f"Could not restore the clipboard after pasting: {str(e)}")
+        after = await self._focused_text()
+        return before is None or after is None or after != before
         
-        with open(filename, "rb") as f:
-            base64_image = base64.b64encode(f.read()).decode()
-            
+    async def _focused_text(self) -> Optional[str]:
+        try:
+            return await self._run(self.backend.focused_text)
+        except Exception as e:
+            logger.warning(f"Could not read the focused element: {str(e)}")
+            return None
+        
+    async def _handle_screenshot(
+        self,
+        mode: Optional[str] = None,
+        region: Optional[List[float]] = None,
+        window: Optional[str] = None,
+        zoom: Optional[float] = None,
+        **kwargs
+    ) -> ToolResult:
+        if region is not None or window is not None:
+            return await self._capture_region(region, window, zoom or 1.0)
+        
+        with span("capture", grabber=self.grabber is not None):
+            screenshot = await self._capture_screen()
+        frame = await self.encoder.run(self.scaler.fit, screenshot)
+        
+        if self.frame_differ is not None:
+            if mode == "full":
+                await self.encoder.run(self.frame_differ.reset, frame)
+            else:
+                delta = await self.encoder.run(self.frame_differ.diff, frame)
+                if delta.kind == "unchanged":
+                    return ToolResult(output="Screen unchanged since last screenshot")
+                if delta.kind == "partial":
+                    return await self._delta_result(frame, delta)
+        
+        encoded = await self.encoder.encode(frame)
         return ToolResult(
             output="Screenshot taken",
-            base64_image=base64_image
+            base64_image=encoded.base64,
+            media_type=encoded.media_type,
+            image_ref=await self._store_screenshot(encoded)
+        )
+        
+    async def _capture_region(
+        self,
+        region: Optional[List[float]],
+        window: Optional[str],
+        zoom: float
+    ) -> ToolResult:
+        """Capture only a model-space rectangle or one window, optionally magnified"""
+        if window is not None:
+            bounds = await self._run(self.backend.window_bounds, window)
+            if bounds is None:
+                return ToolResult(error=f"No visible window matches {window!r}")
+            points = self.scaler.clip(*bounds)
+        else:
+            if len(region) != 4 or region[2] <= 0 or region[3] <= 0:
+                return ToolResult(error="region must be [x, y, width, height] with a positive size")
+            points = self.scaler.region_to_screen(*region)
+        if points is None:
+            return ToolResult(error="Region lies outside the screen")
+        if zoom <= 0:
+            return ToolResult(error="zoom must be positive")
+        
+        # Captured and region frames bypass the frame differ, which tracks full frames
+        capture = await self._run(self.backend.screenshot, points)
+        x, y, width, height = self.scaler.region_to_model(*points)
+        # Magnify up to the captured pixel density, within the encoder's size limit
+        scale = min(zoom, capture.width / width, capture.height / height)
+        if self.encoder.options.max_dimension:
+            scale = min(scale, self.encoder.options.max_dimension / max(width, height))
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        image = capture if capture.size == size else await self.encoder.run(
+            capture.resize, size, Image.Resampling.LANCZOS
+        )
+        
+        encoded = await self.encoder.encode(
+            image, replace(self.encoder.options, max_dimension=None)
+        )
+        return ToolResult(
+            output=(
+                f"Captured region {width}x{height} at ({x}, {y}) at {scale:g}x; "
+                f"image pixel (px, py) is model coordinate "
+                f"({x} + px / {scale:g}, {y} + py / {scale:g}), as used for clicks"
+            ),
+            base64_image=encoded.base64,
+            media_type=encoded.media_type,
+            image_ref=await self._store_screenshot(encoded),
+            region={"x": x, "y": y, "width": width, "height": height, "scale": scale}
+        )
+        
+    async def _store_screenshot(self, encoded: EncodedImage) -> Optional[str]:
+        """Save a frame to the screenshot store; its ref, or None if it was not saved
+        
+        The result carries the image inline either way, so a failed write only
+        loses the reference, never the frame.
+        """
+        if self.screenshot_store is None:
+            return None
+        try:
+            return await self.encoder.run(
+                self.screenshot_store.save, encoded.data, encoded.media_type
+            )
+        except Exception as e:
+            logger.error(f"Error saving screenshot: {str(e)}")
+            return None
+        
+    async def _delta_result(self, frame: Image.Image, delta: FrameDelta) -> ToolResult:
+        """Encode only the changed regions of a frame"""
+        # The frame is already at model size, so crop offsets are model coordinates
+        options = replace(self.encoder.options, max_dimension=None)
+        encoded = await asyncio.gather(*(
+            self.encoder.encode(frame.crop(region.box), options)
+            for region in delta.regions
+        ))
+        
+        refs = await asyncio.gather(*(self._store_screenshot(image) for image in encoded))
+        
+        crops = [
+            {
+                "x": region.x,
+                "y": region.y,
+                "width": region.width,
+                "height": region.height,
+                "base64_image": image.base64,
+                "media_type": image.media_type,
+                "image_ref": ref,
+            }
+            for region, image, ref in zip(delta.regions, encoded, refs)
+        ]
+        regions = ", ".join(
+            f"{r.width}x{r.height} at ({r.x}, {r.y})" for r in delta.regions
+        )
+        return ToolResult(
+            output=f"Screen changed in {len(crops)} region(s): {regions}",
+            crops=crops
         )
         
     async def _handle_get_position(self, **kwargs) -> ToolResult:
-        x, y = pyautogui.position()
+        x, y = self.scaler.to_model(*await self._run(self.backend.position))
         return ToolResult(output=f"Mouse position: {x}, {y}")
         
     async def _handle_press_key(self, key: str, **kwargs) -> ToolResult:
-        pyautogui.press(key)
+        await self._run(self.backend.press, key)
         return ToolResult(output=f"Pressed key: {key}")
         
     async def _handle_hotkey(self, keys: list[str], **kwargs) -> ToolResult:
-        pyautogui.hotkey(*keys)
-        return ToolResult(output=f"Pressed hotkey: {'+'.join(keys)}")
\ No newline at end of file
+        await self._run(self.backend.hotkey, *keys)
+        return ToolResult(output=f"Pressed hotkey: {'+'.join(keys)}")
+
+def _frame_probe(frame: Frame, width: int) -> np.ndarray:
+    return probe_pixels(frame.image(), width)
+
+def _status(result: ToolResult) -> str:
+    if result.status:
+        return result.status
+    return "error" if result.error else "ok"
+
+def _at(x: Optional[int], y: Optional[int]) -> str:
+    return f" at {x}, {y}" if x is not None and y is not None else ""
@@ -0,0 +1,142 @@
+# src/tools/encoding.py
+import asyncio
+import base64
+import io
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Literal, Optional
+from PIL import Image
+from ..utils.logger import logger
+from ..utils.metrics import SCREENSHOT_BYTES, SCREENSHOT_ENCODE_SECONDS
+from ..utils.tracing import span
+
+ImageFormat = Literal["png", "jpeg", "webp"]
+
+MEDIA_TYPES = {
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "webp": "image/webp",
+}
+
+FILE_EXTENSIONS = {
+    "png": "png",
+    "jpeg": "jpg",
+    "webp": "webp",
+}
+
+@dataclass
+class EncodingOptions:
+    format: ImageFormat = "png"
+    quality: int = 85
+    max_dimension: Optional[int] = None
+
+    def __post_init__(self):
+        self.format = self.format.lower()
+        if self.format == "jpg":
+            self.format = "jpeg"
+        if self.format not in MEDIA_TYPES:
+            raise ValueError(f"Unsupported image format: {self.format}")
+        if not 1 <= self.quality <= 100:
+            raise ValueError("Quality must be between 1 and 100")
+
+@dataclass
+class EncodedImage:
+    data: bytes
+    format: str
+    width: int
+    height: int
+    encode_time: float
+
+    @property
+    def media_type(self) -> str:
+        return MEDIA_TYPES[self.format]
+
+    @property
+    def extension(self) -> str:
+        return FILE_EXTENSIONS[self.format]
+
+    @property
+    def base64(self) -> str:
+        return base64.b64encode(self.data).decode()
+
+def downscale(image: Image.Image, max_dimension: Optional[int]) -> Image.Image:
+    """Shrink an image so its longest side fits within max_dimension"""
+    if not max_dimension or max(image.size) <= max_dimension:
+        return image
+    ratio = max_dimension / max(image.size)
+    size = (max(1, round(image.width * ratio)), max(1, round(image.height * ratio)))
+    return image.resize(size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+
+def encode_image(image: Image.Image, options: EncodingOptions) -> EncodedImage:
+    """Encode a PIL image to bytes in memory"""
+    start = time.perf_counter()
+    image = downscale(image, options.max_dimension)
+
+    buffer = io.BytesIO()
+    if options.format == "png":
+        # Level 1 is several times faster than the default and only slightly larger
+        image.save(buffer, format="PNG", compress_level=1)
+    elif options.format == "jpeg":
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        image.save(buffer, format="JPEG", quality=options.quality)
+    else:
+        image.save(buffer, format="WEBP", quality=options.quality, method=0)
+
+    return EncodedImage(
+        data=buffer.getvalue(),
+        format=options.format,
+        width=image.width,
+        height=image.height,
+        encode_time=time.perf_counter() - start
+    )
+
+class ScreenshotEncoder:
+    """Encodes screenshots on a worker pool so the event loop is never blocked"""
+
+    def __init__(
+        self,
+        options: Optional[EncodingOptions] = None,
+        max_workers: int = 2
+    ):
+        self.options = options or EncodingOptions()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="screenshot-encoder"
+        )
+
+    async def encode(
+        self,
+        image: Image.Image,
+        options: Optional[EncodingOptions] = None
+    ) -> EncodedImage:
+        """Encode an image on the worker pool"""
+        loop = asyncio.get_running_loop()
+        with span("encode", width=image.width, height=image.height) as traced:
+            encoded = await loop.run_in_executor(
+                self._executor, encode_image, image, options or self.options
+            )
+            traced.set(format=encoded.format, bytes=len(encoded.data))
+        SCREENSHOT_ENCODE_SECONDS.observe(encoded.encode_time, format=encoded.format)
+        SCREENSHOT_BYTES.observe(len(encoded.data), format=encoded.format)
+        return encoded
+
+    async def run(self, fn, *args):
+        """Run other CPU-bound image work on the same worker pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    def persist(self, fn, *args) -> Future:
+        """Run a disk write in the background, logging rather than raising errors"""
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._log_persist_error)
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    @staticmethod
+    def _log_persist_error(future: Future) -> None:
+        if error := future.exception():
+            logger.error(f"Error saving screenshot: {str(error)}")
@@ -0,0 +1,103 @@
+# src/tools/fake_backend.py
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from PIL import Image
+from .base import BaseBackend
+
+class FakeBackend(BaseBackend):
+    """In-memory backend that records input events and serves a synthetic frame"""
+
+    def __init__(
+        self,
+        width: int = 1440,
+        height: int = 900,
+        latency: float = 0.0,
+        scale: float = 1.0
+    ):
+        self.width = width
+        self.height = height
+        self.latency = latency
+        # Frames are served in pixels, scale per point, like a HiDPI display
+        self.scale = scale
+        self.events: List[Tuple[Any, ...]] = []
+        self.cursor = (0, 0)
+        self.clipboard = ""
+        # Contents of the focused text field; a field may ignore Cmd+V
+        self.text = ""
+        self.accepts_paste = True
+        # Window bounds in points by app or window name
+        self.windows: Dict[str, Tuple[int, int, int, int]] = {}
+        self.frame = Image.new(
+            "RGB", (round(width * scale), round(height * scale)), (255, 255, 255)
+        )
+
+    def set_frame(self, image: Image.Image) -> None:
+        self.frame = image
+
+    def screen_size(self) -> Tuple[float, float]:
+        return self.width, self.height
+
+    def scale_factor(self) -> float:
+        return self.scale
+
+    def move_to(self, x: int, y: int) -> None:
+        self._record("move_to", x, y)
+        self.cursor = (x, y)
+
+    def click(
+        self,
+        x: Optional[int] = None,
+        y: Optional[int] = None,
+        clicks: int = 1,
+        button: str = "left"
+    ) -> None:
+        if x is not None and y is not None:
+            self.move_to(x, y)
+        self._record("click", clicks, button)
+
+    def write(self, text: str, interval: float = 0.0) -> None:
+        self._record("write", text)
+        self.text += text
+
+    def press(self, key: str) -> None:
+        self._record("press", key)
+
+    def hotkey(self, *keys: str) -> None:
+        if keys == ("command", "v"):
+            self._record("paste", self.clipboard)
+            if self.accepts_paste:
+                self.text += self.clipboard
+        else:
+            self._record("hotkey", *keys)
+
+    def position(self) -> Tuple[int, int]:
+        return self.cursor
+
+    def screenshot(self, region: Optional[Tuple[int, int, int, int]] = None) -> Image.Image:
+        if region is None:
+            self._record("screenshot")
+            return self.frame.copy()
+        self._record("screenshot", region)
+        x, y, width, height = (round(v * self.scale) for v in region)
+        return self.frame.crop((x, y, x + width, y + height))
+
+    def probe(self) -> Image.Image:
+        # Settle probes are not input events and cost nothing here
+        return self.frame.copy()
+
+    def window_bounds(self, name: str) -> Optional[Tuple[int, int, int, int]]:
+        return self.windows.get(name)
+
+    def focused_text(self) -> Optional[str]:
+        return self.text
+
+    def get_clipboard(self) -> str:
+        return self.clipboard
+
+    def set_clipboard(self, text: str) -> None:
+        self.clipboard = text
+
+    def _record(self, *event: Any) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        self.events.append(event)
@@ -0,0 +1,125 @@
+# src/tools/frame_diff.py
+from collections import deque
+from dataclasses import dataclass, field
+from typing import List, Literal, Optional, Tuple
+import numpy as np
+from PIL import Image
+
+DeltaKind = Literal["unchanged", "partial", "full"]
+
+@dataclass
+class DirtyRegion:
+    x: int
+    y: int
+    width: int
+    height: int
+
+    @property
+    def box(self) -> Tuple[int, int, int, int]:
+        return (self.x, self.y, self.x + self.width, self.y + self.height)
+
+    @property
+    def area(self) -> int:
+        return self.width * self.height
+
+@dataclass
+class FrameDelta:
+    kind: DeltaKind
+    regions: List[DirtyRegion] = field(default_factory=list)
+    changed_ratio: float = 0.0
+
+class FrameDiffer:
+    """Compares each frame with the previous one and reports the changed rectangles"""
+
+    def __init__(
+        self,
+        tile_size: int = 32,
+        pixel_threshold: int = 8,
+        full_frame_ratio: float = 0.5,
+        max_regions: int = 8
+    ):
+        self.tile_size = tile_size
+        self.pixel_threshold = pixel_threshold
+        self.full_frame_ratio = full_frame_ratio
+        self.max_regions = max_regions
+        self._previous: Optional[np.ndarray] = None
+
+    def reset(self, image: Optional[Image.Image] = None) -> None:
+        """Forget the previous frame, or replace it with the given image"""
+        self._previous = None if image is None else _to_array(image)
+
+    def diff(self, image: Image.Image) -> FrameDelta:
+        """Diff an image against the previous frame and keep it as the new baseline"""
+        frame = _to_array(image)
+        previous, self._previous = self._previous, frame
+        if previous is None or previous.shape != frame.shape:
+            return FrameDelta(kind="full", changed_ratio=1.0)
+
+        tiles = self._changed_tiles(previous, frame)
+        if not tiles.any():
+            return FrameDelta(kind="unchanged")
+
+        regions = self._regions(tiles, frame.shape[1], frame.shape[0])
+        if len(regions) > self.max_regions:
+            regions = [_bounding_region(regions)]
+
+        changed_ratio = sum(r.area for r in regions) / (frame.shape[0] * frame.shape[1])
+        if changed_ratio > self.full_frame_ratio:
+            return FrameDelta(kind="full", changed_ratio=changed_ratio)
+        return FrameDelta(kind="partial", regions=regions, changed_ratio=changed_ratio)
+
+    def _changed_tiles(self, previous: np.ndarray, frame: np.ndarray) -> np.ndarray:
+        # Absolute difference without upcasting the whole frame
+        delta = np.maximum(previous, frame) - np.minimum(previous, frame)
+        changed = delta.max(axis=2) > self.pixel_threshold
+
+        tile = self.tile_size
+        height, width = changed.shape
+        rows, cols = -(-height // tile), -(-width // tile)
+        padded = np.zeros((rows * tile, cols * tile), dtype=bool)
+        padded[:height, :width] = changed
+        return padded.reshape(rows, tile, cols, tile).any(axis=(1, 3))
+
+    def _regions(self, tiles: np.ndarray, width: int, height: int) -> List[DirtyRegion]:
+        """Bounding boxes of 8-connected groups of changed tiles"""
+        tile = self.tile_size
+        rows, cols = tiles.shape
+        seen = np.zeros_like(tiles)
+        regions = []
+
+        for start in zip(*np.nonzero(tiles)):
+            if seen[start]:
+                continue
+            seen[start] = True
+            queue = deque([start])
+            top, left, bottom, right = start[0], start[1], start[0], start[1]
+            while queue:
+                row, col = queue.popleft()
+                top, bottom = min(top, row), max(bottom, row)
+                left, right = min(left, col), max(right, col)
+                for r in range(max(row - 1, 0), min(row + 2, rows)):
+                    for c in range(max(col - 1, 0), min(col + 2, cols)):
+                        if tiles[r, c] and not seen[r, c]:
+                            seen[r, c] = True
+                            queue.append((r, c))
+
+            x, y = int(left * tile), int(top * tile)
+            regions.append(DirtyRegion(
+                x=x,
+                y=y,
+                width=min((right + 1) * tile, width) - x,
+                height=min((bottom + 1) * tile, height) - y
+            ))
+        return regions
+
+def _to_array(image: Image.Image) -> np.ndarray:
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    return np.asarray(image)
+
+def _bounding_region(regions: List[DirtyRegion]) -> DirtyRegion:
+    left = min(r.x for r in regions)
+    top = min(r.y for r in regions)
+    right = max(r.x + r.width for r in regions)
+    bottom = max(r.y + r.height for r in regions)
+    return DirtyRegion(x=left, y=top, width=right - left, height=bottom - top)
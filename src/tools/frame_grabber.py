@@ -0,0 +1,186 @@
+# src/tools/frame_grabber.py
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional
+import numpy as np
+from PIL import Image
+from ..utils.logger import logger
+
+@dataclass(frozen=True)
+class Frame:
+    seq: int
+    # time.monotonic() when the capture started; the frame shows the screen no
+    # earlier than this
+    timestamp: float
+    pixels: np.ndarray
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.timestamp
+
+    def image(self) -> Image.Image:
+        return Image.fromarray(self.pixels)
+
+class FrameGrabber:
+    """Captures frames on a background thread into a fixed-size ring buffer
+
+    Consumers take the freshest frame without paying the capture cost, or wait
+    for the first frame captured after a given time. Capturing pauses once no
+    frame has been requested for idle_timeout seconds and resumes on the next
+    request.
+    """
+
+    def __init__(
+        self,
+        capture: Callable[[], Image.Image],
+        fps: float = 10.0,
+        buffer_size: int = 4,
+        idle_timeout: float = 5.0,
+        stats_window: int = 200
+    ):
+        if fps <= 0 or buffer_size < 1:
+            raise ValueError("fps must be positive and buffer_size at least 1")
+        self.capture = capture
+        self.interval = 1.0 / fps
+        self.idle_timeout = idle_timeout
+        self._slots: List[Optional[Frame]] = [None] * buffer_size
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._last_request = time.monotonic()
+        self.paused = False
+
+        self.captured = 0
+        self.served = 0
+        self.errors = 0
+        self._ages: Deque[float] = deque(maxlen=stats_window)
+        self._capture_times: Deque[float] = deque(maxlen=stats_window)
+
+    def start(self) -> "FrameGrabber":
+        with self._cond:
+            if self._running:
+                return self
+            self._running = True
+            self._last_request = time.monotonic()
+        self._thread = threading.Thread(target=self._loop, name="frame-grabber", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def latest(self) -> Optional[Frame]:
+        """The freshest buffered frame, without waiting"""
+        with self._cond:
+            self._touch()
+            frame = self._newest()
+            if frame is not None:
+                self._served(frame)
+            return frame
+
+    def wait_for(self, after: Optional[float] = None, timeout: float = 2.0) -> Optional[Frame]:
+        """The first frame whose capture started at or after the given monotonic time
+
+        Defaults to now, i.e. the next frame. Returns None on timeout.
+        """
+        after = time.monotonic() if after is None else after
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._touch()
+            while True:
+                frame = self._newest()
+                if frame is not None and frame.timestamp >= after:
+                    self._served(frame)
+                    return frame
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._running:
+                    return None
+                self._cond.wait(remaining)
+
+    def frames(self) -> List[Frame]:
+        """Buffered frames, oldest first"""
+        with self._cond:
+            return sorted((f for f in self._slots if f is not None), key=lambda f: f.seq)
+
+    def stats(self) -> Dict[str, float]:
+        """Capture counters, effective frame rate and the age of served frames"""
+        with self._cond:
+            ages = list(self._ages)
+            times = list(self._capture_times)
+            newest = self._newest()
+        span = times[-1] - times[0] if len(times) > 1 else 0.0
+        return {
+            "captured": self.captured,
+            "served": self.served,
+            "errors": self.errors,
+            "paused": self.paused,
+            "fps": (len(times) - 1) / span if span else 0.0,
+            "frame_age": newest.age if newest is not None else None,
+            "served_age_p50": float(np.percentile(ages, 50)) if ages else None,
+            "served_age_p95": float(np.percentile(ages, 95)) if ages else None,
+        }
+
+    def _newest(self) -> Optional[Frame]:
+        if not self._seq:
+            return None
+        return self._slots[(self._seq - 1) % len(self._slots)]
+
+    def _touch(self) -> None:
+        self._last_request = time.monotonic()
+        if self.paused:
+            self._cond.notify_all()
+
+    def _served(self, frame: Frame) -> None:
+        self.served += 1
+        self._ages.append(frame.age)
+
+    def _loop(self) -> None:
+        next_capture = time.monotonic()
+        while True:
+            with self._cond:
+                # Sleep until the next tick, or until a consumer wakes an idle grabber
+                while self._running:
+                    now = time.monotonic()
+                    idle = now - self._last_request > self.idle_timeout
+                    if idle != self.paused:
+                        self.paused = idle
+                        logger.debug("Frame grabber paused" if idle else "Frame grabber resumed")
+                    if idle:
+                        self._cond.wait()
+                        next_capture = time.monotonic()
+                    elif now < next_capture:
+                        self._cond.wait(next_capture - now)
+                    else:
+                        break
+                if not self._running:
+                    return
+
+            started = time.monotonic()
+            try:
+                pixels = np.asarray(self.capture())
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Frame capture failed: {str(e)}")
+                next_capture = started + self.interval
+                continue
+
+            with self._cond:
+                self._slots[self._seq % len(self._slots)] = Frame(self._seq, started, pixels)
+                self._seq += 1
+                self.captured += 1
+                self._capture_times.append(started)
+                self._cond.notify_all()
+            # Fixed rate; a capture slower than the interval is followed immediately
+            next_capture = max(started + self.interval, time.monotonic())
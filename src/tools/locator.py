@@ -0,0 +1,223 @@
+# src/tools/locator.py
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from PIL import Image
+
+# Templates smaller than this at the coarse level are matched at full resolution
+MIN_COARSE_SIZE = 8
+
+@dataclass
+class Match:
+    # Top-left corner and size of the match, in pixels of the searched image
+    x: int
+    y: int
+    width: int
+    height: int
+    score: float
+    scale: float
+
+    @property
+    def center(self) -> Tuple[float, float]:
+        return self.x + self.width / 2, self.y + self.height / 2
+
+@dataclass
+class _Kernel:
+    """A template resized and normalized for one scale and pyramid level"""
+    pixels: np.ndarray
+    norm: float
+
+@dataclass
+class Template:
+    """Grayscale template with kernels prepared lazily per scale and level"""
+    pixels: np.ndarray
+    kernels: Dict[Tuple[float, int], Optional[_Kernel]] = field(default_factory=dict)
+
+    @classmethod
+    def from_image(cls, image: Image.Image) -> "Template":
+        return cls(_gray(image))
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.pixels.shape[1], self.pixels.shape[0]
+
+    def kernel(self, scale: float, factor: int) -> Optional[_Kernel]:
+        key = (scale, factor)
+        if key not in self.kernels:
+            width = round(self.size[0] * scale / factor)
+            height = round(self.size[1] * scale / factor)
+            kernel = None
+            if width >= 2 and height >= 2:
+                pixels = _resize(self.pixels, (width, height))
+                pixels = pixels - pixels.mean()
+                norm = float(np.sqrt((pixels * pixels).sum()))
+                # A flat template matches everything equally badly
+                kernel = _Kernel(pixels, norm) if norm > 1e-6 else None
+            self.kernels[key] = kernel
+        return self.kernels[key]
+
+class TemplateLocator:
+    """Finds template images on screen by normalized cross-correlation
+
+    The screen and every candidate scale of the template are first matched
+    at a coarse pyramid level, then the best candidates are refined at full
+    resolution in a small window. Prepared templates are kept in an LRU cache
+    keyed by the caller's template reference.
+    """
+
+    def __init__(
+        self,
+        scales: Sequence[float] = (0.8, 0.9, 1.0, 1.1, 1.25),
+        coarse_factor: int = 4,
+        threshold: float = 0.8,
+        max_cached: int = 64,
+        max_candidates: int = 32,
+        coarse_tolerance: float = 0.1
+    ):
+        self.scales = tuple(scales)
+        self.coarse_factor = coarse_factor
+        self.threshold = threshold
+        self.max_cached = max_cached
+        self.max_candidates = max_candidates
+        self.coarse_tolerance = coarse_tolerance
+        self._cache: "OrderedDict[str, Template]" = OrderedDict()
+
+    def template(self, key: str, load=None) -> Template:
+        """The prepared template for key, built from load() on a cache miss"""
+        if template := self._cache.get(key):
+            self._cache.move_to_end(key)
+            return template
+        if load is None:
+            raise KeyError(f"Template not cached: {key}")
+        template = Template.from_image(load())
+        self._cache[key] = template
+        if len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+        return template
+
+    def locate(
+        self,
+        screen: Image.Image,
+        template: Template,
+        threshold: Optional[float] = None
+    ) -> Optional[Match]:
+        """Best match of template in screen, or None below the threshold"""
+        threshold = self.threshold if threshold is None else threshold
+        pixels = _gray(screen)
+        factor = self._coarse_factor(pixels, template)
+
+        # Coarse pass over the whole image for every scale
+        coarse = _resize(pixels, (
+            max(1, pixels.shape[1] // factor), max(1, pixels.shape[0] // factor)
+        )) if factor > 1 else pixels
+        candidates = []
+        for scale in self.scales:
+            kernel = template.kernel(scale, factor)
+            if kernel is None or not _fits(coarse, kernel.pixels):
+                continue
+            scores = _ncc(coarse, kernel)
+            for score, x, y in _peaks(scores, kernel.pixels.shape, self.max_candidates):
+                candidates.append((score, scale, x * factor, y * factor))
+        # Similar elements blur together at the coarse level, so every candidate
+        # close to the best coarse score is refined
+        candidates.sort(key=lambda c: c[0], reverse=True)
+        if candidates:
+            floor = candidates[0][0] - self.coarse_tolerance
+            candidates = [c for c in candidates if c[0] >= floor][:self.max_candidates]
+
+        # Refine at full resolution in a small window around each coarse hit
+        best: Optional[Match] = None
+        for _, scale, x, y in candidates:
+            match = self._refine(pixels, template, scale, x, y, factor)
+            if match is not None and (best is None or match.score > best.score):
+                best = match
+        if best is None or best.score < threshold:
+            return None
+        return best
+
+    def _coarse_factor(self, pixels: np.ndarray, template: Template) -> int:
+        factor = self.coarse_factor
+        smallest = min(template.size) * min(self.scales)
+        while factor > 1 and smallest / factor < MIN_COARSE_SIZE:
+            factor //= 2
+        return max(1, factor)
+
+    def _refine(
+        self,
+        pixels: np.ndarray,
+        template: Template,
+        scale: float,
+        x: int,
+        y: int,
+        factor: int
+    ) -> Optional[Match]:
+        kernel = template.kernel(scale, 1)
+        if kernel is None:
+            return None
+        height, width = kernel.pixels.shape
+        margin = 2 * factor
+        left, top = max(0, x - margin), max(0, y - margin)
+        window = pixels[top:y + margin + height, left:x + margin + width]
+        if not _fits(window, kernel.pixels):
+            return None
+        scores = _ncc(window, kernel)
+        dy, dx = np.unravel_index(int(np.argmax(scores)), scores.shape)
+        return Match(
+            x=int(left + dx), y=int(top + dy), width=width, height=height,
+            score=float(scores[dy, dx]), scale=scale
+        )
+
+def _peaks(
+    scores: np.ndarray,
+    shape: Tuple[int, int],
+    count: int
+) -> List[Tuple[float, int, int]]:
+    """The highest scores, suppressing neighbours closer than half the template"""
+    scores = scores.copy()
+    half_height, half_width = max(1, shape[0] // 2), max(1, shape[1] // 2)
+    peaks = []
+    for _ in range(count):
+        y, x = np.unravel_index(int(np.argmax(scores)), scores.shape)
+        if scores[y, x] <= -1.0:
+            break
+        peaks.append((float(scores[y, x]), int(x), int(y)))
+        scores[max(0, y - half_height):y + half_height + 1,
+               max(0, x - half_width):x + half_width + 1] = -1.0
+    return peaks
+
+def _gray(image: Image.Image) -> np.ndarray:
+    return np.asarray(image.convert("L"), dtype=np.float32)
+
+def _resize(pixels: np.ndarray, size: Tuple[int, int]) -> np.ndarray:
+    image = Image.fromarray(pixels)
+    return np.asarray(image.resize(size, Image.Resampling.BOX), dtype=np.float32)
+
+def _fits(image: np.ndarray, kernel: np.ndarray) -> bool:
+    return kernel.shape[0] <= image.shape[0] and kernel.shape[1] <= image.shape[1]
+
+def _window_sums(values: np.ndarray, height: int, width: int) -> np.ndarray:
+    """Sum over every height x width window, from an integral image"""
+    integral = np.zeros((values.shape[0] + 1, values.shape[1] + 1), dtype=np.float64)
+    integral[1:, 1:] = values.cumsum(0).cumsum(1)
+    return (
+        integral[height:, width:] - integral[:-height, width:]
+        - integral[height:, :-width] + integral[:-height, :-width]
+    )
+
+def _ncc(image: np.ndarray, kernel: _Kernel) -> np.ndarray:
+    """Normalized cross-correlation of a zero-mean kernel at every valid offset"""
+    height, width = kernel.pixels.shape
+    shape = (image.shape[0] + height - 1, image.shape[1] + width - 1)
+    # Correlation as convolution with the flipped kernel, in the frequency domain
+    spectrum = np.fft.rfft2(image, shape) * np.fft.rfft2(kernel.pixels[::-1, ::-1], shape)
+    correlation = np.fft.irfft2(spectrum, shape)[height - 1:image.shape[0], width - 1:image.shape[1]]
+
+    count = height * width
+    sums = _window_sums(image, height, width)
+    squares = _window_sums(image.astype(np.float64) ** 2, height, width)
+    deviation = np.sqrt(np.maximum(squares - sums * sums / count, 0.0))
+    denominator = deviation * kernel.norm
+    scores = np.zeros_like(correlation)
+    np.divide(correlation, denominator, out=scores, where=denominator > 1e-3 * kernel.norm)
+    return np.clip(scores, -1.0, 1.0)
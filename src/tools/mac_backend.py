@@ -0,0 +1,121 @@
+# src/tools/mac_backend.py
+from typing import Optional, Tuple
+import pyautogui
+import pyperclip
+import Quartz
+from PIL import Image
+from ..utils.config import Config
+from .base import BaseBackend
+
+class MacBackend(BaseBackend):
+    """Drives the local macOS session through pyautogui and Quartz"""
+
+    def __init__(self, pause: Optional[float] = None):
+        pyautogui.FAILSAFE = False
+        # Gap pyautogui inserts after every call
+        pyautogui.PAUSE = Config.INPUT_PAUSE if pause is None else pause
+
+    def screen_size(self) -> Tuple[float, float]:
+        screen = Quartz.CGDisplayBounds(Quartz.CGMainDisplayID())
+        return screen.size.width, screen.size.height
+
+    def scale_factor(self) -> float:
+        display = Quartz.CGMainDisplayID()
+        mode = Quartz.CGDisplayCopyDisplayMode(display)
+        points = Quartz.CGDisplayBounds(display).size.width
+        return Quartz.CGDisplayModeGetPixelWidth(mode) / points if points else 1.0
+
+    def move_to(self, x: int, y: int) -> None:
+        pyautogui.moveTo(x, y)
+
+    def click(
+        self,
+        x: Optional[int] = None,
+        y: Optional[int] = None,
+        clicks: int = 1,
+        button: str = "left"
+    ) -> None:
+        pyautogui.click(x, y, clicks=clicks, button=button)
+
+    def write(self, text: str, interval: float = 0.0) -> None:
+        pyautogui.write(text, interval=interval)
+
+    def press(self, key: str) -> None:
+        pyautogui.press(key)
+
+    def hotkey(self, *keys: str) -> None:
+        pyautogui.hotkey(*keys)
+
+    def position(self) -> Tuple[int, int]:
+        x, y = pyautogui.position()
+        return x, y
+
+    def screenshot(self, region: Optional[Tuple[int, int, int, int]] = None) -> Image.Image:
+        if region is None:
+            return pyautogui.screenshot()
+        # Quartz renders only the requested rectangle, at the display's pixel density
+        return _capture(Quartz.CGRectMake(*region), Quartz.kCGWindowImageDefault)
+
+    def probe(self) -> Image.Image:
+        # One pixel per point, a quarter of the pixels of a Retina capture
+        return _capture(Quartz.CGRectInfinite, Quartz.kCGWindowImageNominalResolution)
+
+    def window_bounds(self, name: str) -> Optional[Tuple[int, int, int, int]]:
+        windows = Quartz.CGWindowListCopyWindowInfo(
+            Quartz.kCGWindowListOptionOnScreenOnly | Quartz.kCGWindowListExcludeDesktopElements,
+            Quartz.kCGNullWindowID
+        )
+        name = name.lower()
+        # Front to back, normal windows only
+        for window in windows:
+            if window.get("kCGWindowLayer", 0) != 0:
+                continue
+            owner = str(window.get("kCGWindowOwnerName", "")).lower()
+            title = str(window.get("kCGWindowName", "") or "").lower()
+            if name == owner or (title and name in title):
+                bounds = window["kCGWindowBounds"]
+                return (
+                    int(bounds["X"]), int(bounds["Y"]),
+                    int(bounds["Width"]), int(bounds["Height"])
+                )
+        return None
+
+    def focused_text(self) -> Optional[str]:
+        try:
+            import ApplicationServices
+        except ImportError:
+            return None
+        system = ApplicationServices.AXUIElementCreateSystemWide()
+        error, element = ApplicationServices.AXUIElementCopyAttributeValue(
+            system, ApplicationServices.kAXFocusedUIElementAttribute, None
+        )
+        if error or element is None:
+            return None
+        error, value = ApplicationServices.AXUIElementCopyAttributeValue(
+            element, ApplicationServices.kAXValueAttribute, None
+        )
+        return str(value) if not error and isinstance(value, str) else None
+
+    def get_clipboard(self) -> str:
+        return pyperclip.paste()
+
+    def set_clipboard(self, text: str) -> None:
+        pyperclip.copy(text)
+
+def _capture(rect, options: int) -> Image.Image:
+    image = Quartz.CGWindowListCreateImage(
+        rect,
+        Quartz.kCGWindowListOptionOnScreenOnly,
+        Quartz.kCGNullWindowID,
+        options
+    )
+    data = Quartz.CGDataProviderCopyData(Quartz.CGImageGetDataProvider(image))
+    return Image.frombuffer(
+        "RGBA",
+        (Quartz.CGImageGetWidth(image), Quartz.CGImageGetHeight(image)),
+        bytes(data),
+        "raw",
+        "BGRA",
+        Quartz.CGImageGetBytesPerRow(image),
+        1
+    ).convert("RGB")
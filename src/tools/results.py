@@ -1,9 +1,39 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 @dataclass
 class ToolResult:
     output: Optional[str] = None
     error: Optional[str] = None
     base64_image: Optional[str] = None
-    system: Optional[str] = None
\ No newline at end of file
+    system: Optional[str] = None
+    # Why an action did not complete: "timeout" or "cancelled"
+    status: Optional[str] = None
+    media_type: Optional[str] = None
+    # Content reference of the image in the screenshot store
+    image_ref: Optional[str] = None
+    # Changed regions of a delta screenshot: x, y, width, height, base64_image,
+    # media_type and image_ref
+    crops: Optional[List[Dict[str, Any]]] = None
+    # Model-space origin, size and magnification of a region capture
+    region: Optional[Dict[str, Any]] = None
+    # Template located by locate or click_image: x, y, confidence and scale
+    match: Optional[Dict[str, Any]] = None
+    # Crop around a click target taken while recording: base64_image and the
+    # click offset within it
+    template: Optional[Dict[str, Any]] = None
+
+def combine_results(results: List[ToolResult]) -> ToolResult:
+    """Combine multiple results into one"""
+    # Carry forward the most recent frame, whether full or a delta
+    latest = next((r for r in reversed(results)
+                   if r.base64_image or r.crops), ToolResult())
+    return ToolResult(
+        output="\n".join(r.output for r in results if r.output),
+        error="\n".join(r.error for r in results if r.error),
+        base64_image=latest.base64_image,
+        media_type=latest.media_type,
+        image_ref=latest.image_ref,
+        crops=latest.crops,
+        region=latest.region
+    )
@@ -0,0 +1,144 @@
+# src/tools/scaling.py
+from typing import Any, Dict, Optional, Tuple
+from PIL import Image
+
+def parse_size(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Parse a WIDTHxHEIGHT setting such as "1280x800"; empty means unset"""
+    if not value:
+        return None
+    try:
+        width, height = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"Expected a size like 1280x800, got {value!r}")
+    if width <= 0 or height <= 0:
+        raise ValueError(f"Size must be positive, got {value!r}")
+    return width, height
+
+class ScreenScaler:
+    """Maps between model space, the screenshots the model sees, and screen points
+
+    Input events use logical points while captures come back in physical
+    pixels (scale_factor per point on HiDPI displays). Screenshots are resized
+    to model_size, which fits the screen's aspect ratio inside the target and
+    max_dimension without upscaling, and every coordinate the model sends is
+    mapped back to points.
+    """
+
+    def __init__(
+        self,
+        screen_size: Tuple[float, float],
+        target: Optional[Tuple[int, int]] = None,
+        max_dimension: Optional[int] = None,
+        scale_factor: float = 1.0
+    ):
+        self.screen_width, self.screen_height = screen_size
+        self.scale_factor = scale_factor
+
+        ratio = 1.0
+        if target:
+            ratio = min(ratio, target[0] / self.screen_width, target[1] / self.screen_height)
+        if max_dimension:
+            ratio = min(ratio, max_dimension / max(self.screen_width, self.screen_height))
+        self.model_size = (
+            max(1, round(self.screen_width * ratio)),
+            max(1, round(self.screen_height * ratio)),
+        )
+
+    @property
+    def capture_size(self) -> Tuple[int, int]:
+        """Physical pixel size of a full-screen capture"""
+        return (
+            round(self.screen_width * self.scale_factor),
+            round(self.screen_height * self.scale_factor),
+        )
+
+    @property
+    def x_ratio(self) -> float:
+        """Screen points per model pixel horizontally"""
+        return self.screen_width / self.model_size[0]
+
+    @property
+    def y_ratio(self) -> float:
+        return self.screen_height / self.model_size[1]
+
+    def to_screen(self, x: float, y: float) -> Tuple[int, int]:
+        """Model coordinates to screen points, clamped to the display"""
+        return (
+            _clamp(round(x * self.x_ratio), self.screen_width),
+            _clamp(round(y * self.y_ratio), self.screen_height),
+        )
+
+    def to_model(self, x: float, y: float) -> Tuple[int, int]:
+        """Screen points to model coordinates"""
+        return (
+            _clamp(round(x / self.x_ratio), self.model_size[0]),
+            _clamp(round(y / self.y_ratio), self.model_size[1]),
+        )
+
+    def region_to_screen(
+        self,
+        x: float,
+        y: float,
+        width: float,
+        height: float
+    ) -> Optional[Tuple[int, int, int, int]]:
+        """A model-space rectangle as screen points, clipped; None if it is off screen"""
+        return self.clip(
+            x * self.x_ratio, y * self.y_ratio, width * self.x_ratio, height * self.y_ratio
+        )
+
+    def clip(
+        self,
+        x: float,
+        y: float,
+        width: float,
+        height: float
+    ) -> Optional[Tuple[int, int, int, int]]:
+        """A rectangle in screen points clipped to the display"""
+        left, top = max(0, round(x)), max(0, round(y))
+        right = min(round(self.screen_width), round(x + width))
+        bottom = min(round(self.screen_height), round(y + height))
+        if right <= left or bottom <= top:
+            return None
+        return left, top, right - left, bottom - top
+
+    def region_to_model(
+        self,
+        x: float,
+        y: float,
+        width: float,
+        height: float
+    ) -> Tuple[int, int, int, int]:
+        """A rectangle in screen points as model coordinates"""
+        return (
+            round(x / self.x_ratio), round(y / self.y_ratio),
+            max(1, round(width / self.x_ratio)), max(1, round(height / self.y_ratio)),
+        )
+
+    def fit(self, image: Image.Image) -> Image.Image:
+        """Resize a full-screen capture to model_size"""
+        if image.size == self.model_size:
+            return image
+        return image.resize(self.model_size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+
+def rescale_action(
+    action: Dict[str, Any],
+    source: Tuple[float, float],
+    target: Tuple[float, float]
+) -> Dict[str, Any]:
+    """An action's x, y and region moved from one coordinate space to another"""
+    if tuple(source) == tuple(target):
+        return action
+    sx, sy = target[0] / source[0], target[1] / source[1]
+    action = dict(action)
+    if action.get("x") is not None:
+        action["x"] = round(action["x"] * sx)
+    if action.get("y") is not None:
+        action["y"] = round(action["y"] * sy)
+    if action.get("region") is not None:
+        x, y, width, height = action["region"]
+        action["region"] = [x * sx, y * sy, width * sx, height * sy]
+    return action
+
+def _clamp(value: int, limit: float) -> int:
+    return max(0, min(value, int(limit) - 1))
@@ -0,0 +1,199 @@
+# src/tools/screenshot_store.py
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from ..utils.logger import logger
+
+REF_PREFIX = "sha256:"
+
+EXTENSIONS = {
+    "image/png": "png",
+    "image/jpeg": "jpg",
+    "image/webp": "webp",
+}
+
+def screenshot_ref(data: bytes) -> str:
+    """Stable content reference for an encoded image"""
+    return REF_PREFIX + hashlib.sha256(data).hexdigest()
+
+class ScreenshotStore:
+    """Content-addressed screenshot storage with LRU eviction by size and age
+
+    New and evicted frames are appended to a journal; the full index is only
+    rewritten on flush, evict, or once the journal outgrows it.
+    """
+
+    INDEX_FILE = "index.json"
+    JOURNAL_FILE = "index.jsonl"
+
+    def __init__(
+        self,
+        root: str = "data/screenshots",
+        max_bytes: Optional[int] = None,
+        max_age: Optional[float] = None
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._journal_lines = 0
+        self._index: Dict[str, Dict[str, Any]] = self._read_index()
+        self._dirty = False
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(entry["size"] for entry in self._index.values())
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, ref: str) -> bool:
+        return self._digest(ref) in self._index
+
+    def save(self, data: bytes, media_type: str = "image/png") -> str:
+        """Store an encoded image once and return its reference"""
+        ref = screenshot_ref(data)
+        digest = self._digest(ref)
+        now = time.time()
+
+        with self._lock:
+            if entry := self._index.get(digest):
+                entry["last_access"] = now
+                self._dirty = True
+                return ref
+
+            file = f"{digest[:2]}/{digest}.{EXTENSIONS.get(media_type, 'bin')}"
+            path = self.root / file
+            path.parent.mkdir(exist_ok=True)
+            path.write_bytes(data)
+            self._index[digest] = {
+                "file": file,
+                "size": len(data),
+                "media_type": media_type,
+                "created": now,
+                "last_access": now,
+            }
+            self._append([{"digest": digest, **self._index[digest]}])
+            self._evict(now)
+            if self._journal_lines > max(1000, len(self._index)):
+                self._write_index()
+        return ref
+
+    def load(self, ref: str) -> Optional[bytes]:
+        """Read an image by reference, or None if it is missing or evicted"""
+        digest = self._digest(ref)
+        with self._lock:
+            entry = self._index.get(digest)
+            if entry is None:
+                return None
+            entry["last_access"] = time.time()
+            self._dirty = True
+            path = self.root / entry["file"]
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                self._index.pop(digest, None)
+            return None
+
+    def load_base64(self, ref: str) -> Optional[str]:
+        data = self.load(ref)
+        return base64.b64encode(data).decode() if data is not None else None
+
+    def media_type(self, ref: str) -> Optional[str]:
+        entry = self._index.get(self._digest(ref))
+        return entry["media_type"] if entry else None
+
+    def evict(self) -> int:
+        """Apply the retention limits now and return the number of frames removed"""
+        with self._lock:
+            removed = self._evict(time.time())
+            self._write_index()
+        return removed
+
+    def flush(self) -> None:
+        """Persist access times recorded since the last write"""
+        with self._lock:
+            if self._dirty:
+                self._write_index()
+
+    def _evict(self, now: float) -> int:
+        victims = []
+        by_age = sorted(self._index.items(), key=lambda item: item[1]["last_access"])
+
+        if self.max_age is not None:
+            victims = [d for d, e in by_age if now - e["last_access"] > self.max_age]
+
+        if self.max_bytes is not None:
+            total = self.total_bytes - sum(self._index[d]["size"] for d in victims)
+            for digest, entry in by_age:
+                if total <= self.max_bytes:
+                    break
+                if digest not in victims:
+                    victims.append(digest)
+                    total -= entry["size"]
+
+        for digest in victims:
+            entry = self._index.pop(digest)
+            try:
+                (self.root / entry["file"]).unlink()
+            except FileNotFoundError:
+                pass
+        if victims:
+            self._append([{"digest": digest, "removed": True} for digest in victims])
+            logger.debug(f"Evicted {len(victims)} screenshots")
+        return len(victims)
+
+    def _read_index(self) -> Dict[str, Dict[str, Any]]:
+        index: Dict[str, Dict[str, Any]] = {}
+        path = self.root / self.INDEX_FILE
+        if path.exists():
+            try:
+                with open(path, "r") as f:
+                    index = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f"Error reading screenshot index: {str(e)}")
+
+        journal = self.root / self.JOURNAL_FILE
+        if not journal.exists():
+            return index
+        with open(journal, "r") as f:
+            for line in f:
+                self._journal_lines += 1
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A write cut short by a crash; the frame is not referenced
+                    continue
+                digest = record.pop("digest")
+                if record.get("removed"):
+                    index.pop(digest, None)
+                else:
+                    index[digest] = record
+        return index
+
+    def _append(self, records: List[Dict[str, Any]]) -> None:
+        with open(self.root / self.JOURNAL_FILE, "a") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+        self._journal_lines += len(records)
+
+    def _write_index(self) -> None:
+        path = self.root / self.INDEX_FILE
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, path)
+        # Everything journaled so far is in the snapshot now
+        (self.root / self.JOURNAL_FILE).unlink(missing_ok=True)
+        self._journal_lines = 0
+        self._dirty = False
+
+    @staticmethod
+    def _digest(ref: str) -> str:
+        return ref[len(REF_PREFIX):] if ref.startswith(REF_PREFIX) else ref
@@ -0,0 +1,207 @@
+# src/tools/settle.py
+import asyncio
+import json
+import time
+from collections import deque
+from pathlib import Path
+from typing import Awaitable, Callable, Deque, Dict, Optional
+import numpy as np
+from PIL import Image
+from ..utils.logger import logger
+
+# Actions whose effect on screen may lag behind the input event
+SETTLE_ACTIONS = {
+    "click", "double_click", "right_click", "click_image", "type", "press_key", "hotkey"
+}
+
+class SettleStats:
+    """Rolling per-action record of how long the screen took to settle"""
+
+    def __init__(
+        self,
+        window: int = 50,
+        path: Optional[str] = None,
+        save_every: int = 20
+    ):
+        self.window = window
+        self.path = Path(path) if path else None
+        self.save_every = save_every
+        self._samples: Dict[str, Deque[float]] = {}
+        self._timeouts: Dict[str, int] = {}
+        # Waits that saw no change at all; they say nothing about settle times
+        self._quiet: Dict[str, int] = {}
+        self._unsaved = 0
+        self._load()
+
+    def record(
+        self,
+        action: str,
+        seconds: float,
+        settled: bool = True,
+        changed: bool = True
+    ) -> None:
+        if changed:
+            self._samples.setdefault(action, deque(maxlen=self.window)).append(seconds)
+        else:
+            self._quiet[action] = self._quiet.get(action, 0) + 1
+        if not settled:
+            self._timeouts[action] = self._timeouts.get(action, 0) + 1
+        self._unsaved += 1
+        if self.path and self._unsaved >= self.save_every:
+            self.save()
+
+    def count(self, action: str) -> int:
+        return len(self._samples.get(action, ()))
+
+    def percentile(self, action: str, q: float) -> Optional[float]:
+        samples = self._samples.get(action)
+        if not samples:
+            return None
+        return float(np.percentile(samples, q))
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Sample count, p50, p95, timeouts and waits without a change per action"""
+        return {
+            action: {
+                "count": len(samples),
+                "p50": self.percentile(action, 50),
+                "p95": self.percentile(action, 95),
+                "timeouts": self._timeouts.get(action, 0),
+                "quiet": self._quiet.get(action, 0),
+            }
+            for action in {*self._samples, *self._quiet}
+            for samples in [self._samples.get(action, ())]
+        }
+
+    def save(self) -> None:
+        if not self.path or not self._unsaved:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump({
+                "samples": {a: list(s) for a, s in self._samples.items()},
+                "timeouts": self._timeouts,
+                "quiet": self._quiet,
+            }, f)
+        self._unsaved = 0
+
+    def _load(self) -> None:
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading settle statistics: {str(e)}")
+            return
+        for action, samples in data.get("samples", {}).items():
+            self._samples[action] = deque(samples, maxlen=self.window)
+        self._timeouts = data.get("timeouts", {})
+        self._quiet = data.get("quiet", {})
+
+def probe_pixels(image: Image.Image, width: int) -> np.ndarray:
+    """A small grayscale copy of a frame for change detection"""
+    height = max(1, round(image.height * width / image.width))
+    # Downscale first so only the small image is converted
+    probe = image.resize((width, height), Image.Resampling.BOX, reducing_gap=2.0)
+    return np.asarray(probe.convert("L"), dtype=np.int16)
+
+class SettleDetector:
+    """Waits until consecutive low-resolution probes of the screen stop changing
+
+    Stability counts only after a first change. When none is seen, the wait
+    lasts at least quiet_time, the action's learned p50 or the caller's hint,
+    so a slow app launch is not mistaken for an action without visible effect.
+
+    capture returns a probe such as probe_pixels(frame, probe_width); it runs
+    on the event loop, so it should capture and convert off it.
+    """
+
+    def __init__(
+        self,
+        capture: Callable[[], Awaitable[np.ndarray]],
+        stable_time: float = 0.15,
+        max_wait: float = 3.0,
+        quiet_time: float = 0.5,
+        poll_interval: float = 0.03,
+        probe_width: int = 160,
+        pixel_threshold: int = 10,
+        changed_fraction: float = 0.0002,
+        stats: Optional[SettleStats] = None,
+        min_samples: int = 10
+    ):
+        self.capture = capture
+        self.stable_time = stable_time
+        self.max_wait = max_wait
+        self.quiet_time = quiet_time
+        self.poll_interval = poll_interval
+        self.probe_width = probe_width
+        self.pixel_threshold = pixel_threshold
+        self.changed_fraction = changed_fraction
+        self.stats = stats or SettleStats()
+        self.min_samples = min_samples
+
+    def ceiling(self, action: str) -> float:
+        """Longest wait for an action, tightened from observed settle times"""
+        if self.stats.count(action) < self.min_samples:
+            return self.max_wait
+        learned = self.stats.percentile(action, 95) * 1.5 + self.stable_time
+        return min(self.max_wait, max(learned, self.stable_time + self.poll_interval))
+
+    def min_wait(self, action: str, hint: Optional[float] = None) -> float:
+        """How long to wait for a first change before accepting an unchanged screen"""
+        wait = max(self.stable_time, hint or 0.0)
+        if self.stats.count(action) >= self.min_samples:
+            return max(wait, self.stats.percentile(action, 50))
+        return max(wait, self.quiet_time)
+
+    async def wait(
+        self,
+        action: str,
+        ceiling: Optional[float] = None,
+        hint: Optional[float] = None,
+        baseline: Optional[np.ndarray] = None
+    ) -> float:
+        """Return once the screen has been stable for stable_time, or at the ceiling
+
+        hint is an expected delay, such as a recorded step delay, and baseline a
+        probe taken before the action so changes before the first poll count.
+        """
+        start = time.monotonic()
+        min_wait = self.min_wait(action, hint)
+        deadline = start + (ceiling or max(self.ceiling(action), min_wait))
+        previous = await self._probe()
+        last_change = start
+        # A change between the action and the first probe counts as at the start
+        changed = baseline is not None and self._changed(baseline, previous)
+
+        while True:
+            now = time.monotonic()
+            if changed:
+                settled = now - last_change >= self.stable_time
+            else:
+                settled = now - start >= min_wait
+            if settled or now >= deadline:
+                break
+            await asyncio.sleep(self.poll_interval)
+            frame = await self._probe()
+            if self._changed(previous, frame):
+                last_change = time.monotonic()
+                changed = True
+            previous = frame
+
+        # Time until the last visible change, not including the stability window
+        settle_time = max(0.0, last_change - start)
+        self.stats.record(action, settle_time, settled, changed)
+        if not settled:
+            logger.debug(f"Screen did not settle after {action} within {deadline - start:.2f}s")
+        return time.monotonic() - start
+
+    async def _probe(self) -> np.ndarray:
+        return await self.capture()
+
+    def _changed(self, previous: np.ndarray, frame: np.ndarray) -> bool:
+        if previous.shape != frame.shape:
+            return True
+        changed = np.count_nonzero(np.abs(frame - previous) > self.pixel_threshold)
+        return changed > max(1, self.changed_fraction * frame.size)
@@ -30,11 +30,13 @@ def _render_tool_result(result: ToolResult) -> None:
         st.image(result.base64_image)
         
         # Add download button for screenshot
+        media_type = result.media_type or "image/png"
+        extension = media_type.split("/")[-1].replace("jpeg", "jpg")
         st.download_button(
             label="Download Screenshot",
             data=result.base64_image,
-            file_name=f"screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png",
-            mime="image/png"
+            file_name=f"screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}",
+            mime=media_type
         )
     
     if result.system:
@@ -49,22 +49,28 @@ def render_workflow_sidebar(
     # List workflows
     st.sidebar.subheader("Saved Workflows")
     
-    # Filter by tags
+    # Filter by tags and search text
     all_tags = workflow_manager.get_all_tags()
     selected_tag = st.sidebar.selectbox(
         "Filter by tag",
         ["All"] + sorted(all_tags)
     )
+    query = st.sidebar.text_input("Search workflows")
     
-    workflows = workflow_manager.list_workflows(
-        tag=None if selected_tag == "All" else selected_tag
+    workflows = workflow_manager.list_summaries(
+        tag=None if selected_tag == "All" else selected_tag,
+        query=query
     )
     
     for workflow in workflows:
         with st.sidebar.expander(f"{workflow.name} ({workflow.id[:8]})"):
             st.write(f"Description: {workflow.description}")
-            st.write(f"Steps: {len(workflow.steps)}")
-            st.write(f"Success rate: {workflow.success_count} runs")
+            st.write(f"Steps: {workflow.step_count}")
+            runs = workflow.success_count + workflow.failure_count
+            if runs:
+                st.write(f"Success rate: {workflow.success_count / runs:.0%} of {runs} runs")
+            else:
+                st.write("Not run yet")
             if workflow.tags:
                 st.write(f"Tags: {', '.join(workflow.tags)}")
             
@@ -75,7 +81,7 @@ def render_workflow_sidebar(
             
             with col2:
                 if st.button("Edit", key=f"edit_{workflow.id}"):
-                    st.session_state.editing_workflow = workflow
+                    st.session_state.editing_workflow = workflow_manager.load_workflow(workflow.id)
                     
             with col3:
                 if st.button("Delete", key=f"delete_{workflow.id}"):
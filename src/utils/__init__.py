@@ -5,9 +5,15 @@ Utility functions and configurations for the computer control system.
 
 from .config import Config
 from .logger import logger, setup_logger
+from .metrics import MetricsRegistry, metrics
+from .tracing import Tracer, span
 
 __all__ = [
     'Config',
+    'MetricsRegistry',
+    'Tracer',
     'logger',
+    'metrics',
     'setup_logger',
+    'span',
 ]
\ No newline at end of file
@@ -6,4 +6,76 @@ load_dotenv()
 class Config:
     ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
     WORKFLOWS_DIR = os.getenv("WORKFLOWS_DIR", "data/workflows")
-    DEBUG = os.getenv("DEBUG", "false").lower() == "true"
\ No newline at end of file
+    DEBUG = os.getenv("DEBUG", "false").lower() == "true"
+    ANTHROPIC_MODEL = os.getenv("ANTHROPIC_MODEL", "claude-3-opus-20240229")
+    # Alternative API endpoint, e.g. a local mock server; empty uses the default
+    ANTHROPIC_BASE_URL = os.getenv("ANTHROPIC_BASE_URL") or None
+    # Mark the system prompt and tool definitions as cacheable
+    PROMPT_CACHE = os.getenv("PROMPT_CACHE", "true").lower() == "true"
+    # Drive the computer through structured tool calls instead of parsing prose
+    TOOL_USE = os.getenv("TOOL_USE", "true").lower() == "true"
+    MAX_TOOL_TURNS = int(os.getenv("MAX_TOOL_TURNS", "10"))
+    # Without tool use, run actions as each response line streams in
+    STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "true").lower() == "true"
+
+    # Conversation history sent with each request
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "50000"))
+    CONTEXT_KEEP_TURNS = int(os.getenv("CONTEXT_KEEP_TURNS", "4"))
+    CONTEXT_MAX_IMAGES = int(os.getenv("CONTEXT_MAX_IMAGES", "2"))
+    CONTEXT_IMAGE_MAX_DIMENSION = int(os.getenv("CONTEXT_IMAGE_MAX_DIMENSION", "0")) or None
+
+    # Model response cache; an empty path keeps it in memory only
+    RESPONSE_CACHE = os.getenv("RESPONSE_CACHE", "true").lower() == "true"
+    RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+    RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+    RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", "data/response_cache.db")
+    RESPONSE_CACHE_MAX_MB = int(os.getenv("RESPONSE_CACHE_MAX_MB", "50"))
+
+    # Action execution
+    ACTION_TIMEOUT = float(os.getenv("ACTION_TIMEOUT", "10"))
+    ACTION_WORKERS = int(os.getenv("ACTION_WORKERS", "4"))
+    MAX_CONCURRENT_ACTIONS = int(os.getenv("MAX_CONCURRENT_ACTIONS", "2"))
+    INPUT_PAUSE = float(os.getenv("INPUT_PAUSE", "0.02"))
+
+    # Text entry: strings this long or longer are pasted via the clipboard
+    TYPE_INTERVAL = float(os.getenv("TYPE_INTERVAL", "0.01"))
+    PASTE_THRESHOLD = int(os.getenv("PASTE_THRESHOLD", "64"))
+    PASTE_RESTORE_DELAY = float(os.getenv("PASTE_RESTORE_DELAY", "0.1"))
+
+    # Adaptive waits between actions
+    ADAPTIVE_SETTLE = os.getenv("ADAPTIVE_SETTLE", "true").lower() == "true"
+    SETTLE_STABLE_MS = float(os.getenv("SETTLE_STABLE_MS", "150"))
+    SETTLE_POLL_MS = float(os.getenv("SETTLE_POLL_MS", "30"))
+    SETTLE_MAX_WAIT = float(os.getenv("SETTLE_MAX_WAIT", "5"))
+    # Least wait for a first visible change before an unchanged screen counts as settled
+    SETTLE_QUIET_MS = float(os.getenv("SETTLE_QUIET_MS", "500"))
+    SETTLE_STATS_PATH = os.getenv("SETTLE_STATS_PATH", "data/settle_stats.json")
+
+    # Screenshot encoding
+    SCREENSHOT_FORMAT = os.getenv("SCREENSHOT_FORMAT", "png").lower()
+    SCREENSHOT_QUALITY = int(os.getenv("SCREENSHOT_QUALITY", "85"))
+    SCREENSHOT_MAX_DIMENSION = int(os.getenv("SCREENSHOT_MAX_DIMENSION", "0")) or None
+    # Size the model sees screenshots at, e.g. 1280x800; empty uses screen points
+    MODEL_SCREEN_SIZE = os.getenv("MODEL_SCREEN_SIZE", "")
+    SCREENSHOT_ENCODER_WORKERS = int(os.getenv("SCREENSHOT_ENCODER_WORKERS", "2"))
+    SAVE_SCREENSHOTS = os.getenv("SAVE_SCREENSHOTS", "false").lower() == "true"
+    SCREENSHOTS_DIR = os.getenv("SCREENSHOTS_DIR", "data/screenshots")
+    SCREENSHOT_STORE_MAX_MB = int(os.getenv("SCREENSHOT_STORE_MAX_MB", "500"))
+    SCREENSHOT_STORE_MAX_AGE_DAYS = float(os.getenv("SCREENSHOT_STORE_MAX_AGE_DAYS", "7"))
+    SCREENSHOT_DIFF = os.getenv("SCREENSHOT_DIFF", "false").lower() == "true"
+    SCREENSHOT_DIFF_FULL_RATIO = float(os.getenv("SCREENSHOT_DIFF_FULL_RATIO", "0.5"))
+    # Background capture into a ring buffer so screenshots return immediately
+    FRAME_GRABBER = os.getenv("FRAME_GRABBER", "false").lower() == "true"
+    FRAME_GRABBER_FPS = float(os.getenv("FRAME_GRABBER_FPS", "10"))
+    FRAME_GRABBER_BUFFER = int(os.getenv("FRAME_GRABBER_BUFFER", "4"))
+    FRAME_GRABBER_IDLE = float(os.getenv("FRAME_GRABBER_IDLE", "5"))
+    # Template matching for locate/click_image and recorded click templates
+    LOCATE_THRESHOLD = float(os.getenv("LOCATE_THRESHOLD", "0.8"))
+    RECORD_CLICK_TEMPLATES = os.getenv("RECORD_CLICK_TEMPLATES", "true").lower() == "true"
+    CLICK_TEMPLATE_SIZE = int(os.getenv("CLICK_TEMPLATE_SIZE", "64"))
+    # Latency and size metrics; METRICS_PORT serves them in Prometheus format
+    METRICS = os.getenv("METRICS", "false").lower() == "true"
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))
+    # Per-session span traces written as Chrome trace JSON
+    TRACING = os.getenv("TRACING", "false").lower() == "true"
+    TRACE_DIR = os.getenv("TRACE_DIR", "data/traces")
@@ -0,0 +1,266 @@
+# src/utils/metrics.py
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from .config import Config
+from .logger import logger
+
+# Latency buckets in seconds, from input events to model calls
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Size buckets in bytes, for encoded screenshots
+SIZE_BUCKETS = (10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000)
+
+LabelValues = Tuple[str, ...]
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help: str, labels: Sequence[str]):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def _format_labels(self, key: LabelValues, extra: str = "") -> str:
+        parts = [f'{name}="{_escape(value)}"' for name, value in zip(self.labels, key)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def snapshot(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{self._format_labels(key)} {_number(value)}"
+            for key, value in sorted(self.snapshot().items())
+        ]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(*args)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: count per bucket (the last one is +Inf), sum and count
+        self._values: Dict[LabelValues, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0, 0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[Dict[str, Any]]:
+        """Observe the duration of a block; labels may be updated inside it"""
+        if not self.registry.enabled:
+            yield labels
+            return
+        start = time.perf_counter()
+        try:
+            yield labels
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: Any) -> int:
+        entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    def sum(self, **labels: Any) -> float:
+        entry = self._values.get(self._key(labels))
+        return entry[1] if entry else 0.0
+
+    def quantile(self, q: float, **labels: Any) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th quantile"""
+        entry = self._values.get(self._key(labels))
+        if not entry:
+            return None
+        counts, _, count = entry
+        rank = q * count
+        seen = 0
+        for bound, bucket in zip(self.buckets + (float("inf"),), counts):
+            seen += bucket
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> Dict[LabelValues, Dict[str, float]]:
+        with self._lock:
+            return {
+                key: {"count": count, "sum": total, "mean": total / count if count else 0.0}
+                for key, (_, total, count) in self._values.items()
+            }
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = {key: (list(c), t, n) for key, (c, t, n) in self._values.items()}
+        lines = []
+        for key, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{self._format_labels(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {_number(total)}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {count}")
+        return lines
+
+class MetricsRegistry:
+    """Counters and histograms readable from Python or as Prometheus text
+
+    Instruments are created up front; while the registry is disabled every
+    update returns after a single attribute check.
+    """
+
+    def __init__(self, enabled: bool = False, namespace: str = "computer"):
+        self.enabled = enabled
+        self.namespace = namespace
+        self._metrics: Dict[str, _Metric] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self, self._full_name(name), help, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(self, self._full_name(name), help, labels, buckets=buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(self._full_name(name))
+
+    def snapshot(self) -> Dict[str, Dict[LabelValues, Any]]:
+        """Current values of every metric, keyed by name and label values"""
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        for metric in self._metrics.values():
+            with metric._lock:
+                metric._values.clear()
+
+    def start_server(self, port: int, host: str = "127.0.0.1") -> Optional[int]:
+        """Serve /metrics on a background thread; returns the bound port"""
+        if self._server is not None:
+            return self._server.server_address[1]
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            logger.error(f"Could not start metrics server on {host}:{port}: {str(e)}")
+            return None
+        self._server.daemon_threads = True
+        threading.Thread(
+            target=self._server.serve_forever, name="metrics-server", daemon=True
+        ).start()
+        logger.info(f"Serving metrics on http://{host}:{self._server.server_address[1]}/metrics")
+        return self._server.server_address[1]
+
+    def stop_server(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _full_name(self, name: str) -> str:
+        return f"{self.namespace}_{name}" if self.namespace else name
+
+    def _register(self, metric: _Metric) -> Any:
+        if existing := self._metrics.get(metric.name):
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+def serve_metrics() -> Optional[int]:
+    """Start the metrics endpoint when metrics and METRICS_PORT are enabled"""
+    if not metrics.enabled or not Config.METRICS_PORT:
+        return None
+    return metrics.start_server(Config.METRICS_PORT)
+
+metrics = MetricsRegistry(enabled=Config.METRICS)
+
+ACTION_SECONDS = metrics.histogram(
+    "action_seconds", "Duration of computer actions", ["action", "status"]
+)
+MESSAGE_SECONDS = metrics.histogram(
+    "message_seconds", "Duration of process_message by execution path", ["path", "status"]
+)
+LLM_REQUEST_SECONDS = metrics.histogram(
+    "llm_request_seconds", "Duration of Messages API requests", ["mode"]
+)
+LLM_TOKENS = metrics.counter(
+    "llm_tokens_total", "Prompt and output tokens reported by the API", ["kind"]
+)
+SCREENSHOT_ENCODE_SECONDS = metrics.histogram(
+    "screenshot_encode_seconds", "Screenshot encode time", ["format"]
+)
+SCREENSHOT_BYTES = metrics.histogram(
+    "screenshot_bytes", "Encoded screenshot size", ["format"], buckets=SIZE_BUCKETS
+)
+WORKFLOW_STORAGE_SECONDS = metrics.histogram(
+    "workflow_storage_seconds", "Workflow storage operations", ["operation"]
+)
@@ -0,0 +1,186 @@
+# src/utils/tracing.py
+import asyncio
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+_active: contextvars.ContextVar[Optional["Tracer"]] = contextvars.ContextVar(
+    "active_tracer", default=None
+)
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+_ids = itertools.count(1)
+
+@dataclass
+class Span:
+    name: str
+    start: float
+    span_id: int
+    parent_id: Optional[int] = None
+    # Execution lane: the asyncio task or thread the span started on
+    lane: str = ""
+    end: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    tracer: Optional["Tracer"] = field(default=None, repr=False)
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.end is None else self.end - self.start
+
+    def set(self, **attributes: Any) -> "Span":
+        self.attributes.update(attributes)
+        return self
+
+    def finish(self) -> None:
+        if self.end is None:
+            self.end = time.perf_counter()
+            if self.tracer is not None:
+                self.tracer._finished(self)
+
+class _NoopSpan:
+    """Stands in for a span when no tracer is active"""
+
+    def set(self, **attributes: Any) -> "_NoopSpan":
+        return self
+
+    def finish(self) -> None:
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+class Tracer:
+    """Collects the spans of one session for export as a Chrome trace
+
+    Spans are recorded only in contexts where this tracer is activated, and
+    at most max_spans are kept.
+    """
+
+    def __init__(self, session: str, max_spans: int = 100_000):
+        self.session = session
+        self.max_spans = max_spans
+        self.origin = time.perf_counter()
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def activate(self) -> Iterator["Tracer"]:
+        """Record spans from this context, and tasks started in it, in this tracer"""
+        token = _active.set(self)
+        try:
+            yield self
+        finally:
+            _active.reset(token)
+
+    def start_span(self, name: str, parent: Optional[Span] = None, **attributes: Any) -> Span:
+        parent = parent or _current.get()
+        return Span(
+            name=name,
+            start=time.perf_counter(),
+            span_id=next(_ids),
+            parent_id=parent.span_id if parent else None,
+            lane=_lane(),
+            attributes=attributes,
+            tracer=self,
+        )
+
+    def _finished(self, span: Span) -> None:
+        with self._lock:
+            if len(self.spans) < self.max_spans:
+                self.spans.append(span)
+            else:
+                self.dropped += 1
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Spans as Chrome trace events, loadable in chrome://tracing and Perfetto"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        lanes: Dict[str, int] = {}
+        events: List[Dict[str, Any]] = []
+        for span in spans:
+            tid = lanes.setdefault(span.lane, len(lanes) + 1)
+            events.append({
+                "name": span.name,
+                "cat": span.name.split(".")[0],
+                "ph": "X",
+                "ts": round((span.start - self.origin) * 1e6, 3),
+                "dur": round(span.duration * 1e6, 3),
+                "pid": 1,
+                "tid": tid,
+                "args": {"span_id": span.span_id, "parent_id": span.parent_id, **span.attributes},
+            })
+        events += [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": lane}}
+            for lane, tid in lanes.items()
+        ]
+        events.append({
+            "name": "process_name", "ph": "M", "pid": 1, "tid": 0,
+            "args": {"name": f"session {self.session}"},
+        })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path: str) -> Path:
+        """Write the session's trace as JSON, replacing any earlier export"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.chrome_trace(), f, default=str)
+        os.replace(tmp, path)
+        return path
+
+def active_tracer() -> Optional[Tracer]:
+    return _active.get()
+
+@contextmanager
+def activate(tracer: Optional[Tracer]) -> Iterator[Optional[Tracer]]:
+    """Activate a tracer if there is one"""
+    if tracer is None:
+        yield None
+        return
+    with tracer.activate():
+        yield tracer
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Trace a block as a child of the current span; a no-op without an active tracer"""
+    tracer = _active.get()
+    if tracer is None:
+        yield NOOP_SPAN
+        return
+    current = tracer.start_span(name, **attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.set(error=type(e).__name__)
+        raise
+    finally:
+        _current.reset(token)
+        current.finish()
+
+def start_span(name: str, **attributes: Any) -> Any:
+    """A span that is finished explicitly and never becomes the current span
+
+    For work that spans yields of an async generator, where the current span
+    cannot be set and reset in the same context.
+    """
+    tracer = _active.get()
+    return tracer.start_span(name, **attributes) if tracer is not None else NOOP_SPAN
+
+def _lane() -> str:
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    if task is not None:
+        return task.get_name()
+    return threading.current_thread().name
@@ -3,11 +3,18 @@
 Workflow management module for recording and executing computer control sequences.
 """
 
-from .models import Workflow, WorkflowStep
+from .catalog import WorkflowCatalog
+from .models import RunStats, Workflow, WorkflowRun, WorkflowStep, WorkflowSummary
 from .manager import WorkflowManager
+from .runs import RunLog
 
 __all__ = [
     'Workflow',
     'WorkflowStep',
+    'WorkflowSummary',
+    'WorkflowCatalog',
     'WorkflowManager',
+    'WorkflowRun',
+    'RunStats',
+    'RunLog',
 ]
\ No newline at end of file
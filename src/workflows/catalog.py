@@ -0,0 +1,201 @@
+# src/workflows/catalog.py
+import json
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+from .models import Workflow, WorkflowSummary
+from .runs import SCHEMA as RUNS_SCHEMA, TOTALS_QUERY
+from ..utils.logger import logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workflows (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL,
+    tags TEXT NOT NULL,
+    step_count INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    last_run TEXT,
+    success_count INTEGER NOT NULL DEFAULT 0,
+    version TEXT NOT NULL,
+    mtime REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS workflow_tags (
+    workflow_id TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (workflow_id, tag)
+);
+CREATE INDEX IF NOT EXISTS workflow_tags_tag ON workflow_tags (tag);
+CREATE INDEX IF NOT EXISTS workflows_created_at ON workflows (created_at);
+"""
+
+SUMMARY_COLUMNS = (
+    "id, name, description, tags, step_count, created_at, last_run, success_count, version"
+)
+
+# Counts stored in older workflow files plus those from the run log
+SUMMARY_SELECT = f"""
+SELECT w.id, w.name, w.description, w.tags, w.step_count, w.created_at,
+       COALESCE(MAX(w.last_run, r.last_success), w.last_run, r.last_success),
+       w.success_count + COALESCE(r.successes, 0),
+       w.version,
+       COALESCE(r.failures, 0)
+FROM workflows w
+LEFT JOIN ({TOTALS_QUERY}) r ON r.workflow_id = w.id
+WHERE 1 = 1
+"""
+
+class WorkflowCatalog:
+    """SQLite index of workflow metadata, kept in sync with the JSON files by mtime"""
+
+    DB_FILE = "catalog.db"
+
+    def __init__(self, storage_dir: Path):
+        self.storage_dir = Path(storage_dir)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            str(self.storage_dir / self.DB_FILE), check_same_thread=False
+        )
+        self._db.executescript(SCHEMA + RUNS_SCHEMA)
+        self.full_text = self._create_search_index()
+
+    def sync(self) -> None:
+        """Re-index JSON files added, changed or removed outside the manager"""
+        on_disk: Dict[str, float] = {}
+        with os.scandir(self.storage_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json") and entry.is_file():
+                    on_disk[entry.name[:-5]] = entry.stat().st_mtime
+
+        with self._lock:
+            indexed = dict(self._db.execute("SELECT id, mtime FROM workflows"))
+
+        for workflow_id in indexed.keys() - on_disk.keys():
+            self.remove(workflow_id)
+
+        for workflow_id, mtime in on_disk.items():
+            if indexed.get(workflow_id) == mtime:
+                continue
+            path = self.storage_dir / f"{workflow_id}.json"
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+                summary = WorkflowSummary.from_data(data)
+            except (OSError, ValueError) as e:
+                logger.error(f"Error indexing workflow file {path.name}: {str(e)}")
+                continue
+            self._upsert(summary, mtime)
+
+    def add(self, workflow: Workflow) -> None:
+        """Index a workflow the manager has just written"""
+        path = self.storage_dir / f"{workflow.id}.json"
+        self._upsert(WorkflowSummary.from_workflow(workflow), path.stat().st_mtime)
+
+    def remove(self, workflow_id: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM workflows WHERE id = ?", (workflow_id,))
+            self._db.execute("DELETE FROM workflow_tags WHERE workflow_id = ?", (workflow_id,))
+            if self.full_text:
+                self._db.execute("DELETE FROM workflow_search WHERE id = ?", (workflow_id,))
+
+    def list(
+        self,
+        tag: Optional[str] = None,
+        query: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[WorkflowSummary]:
+        """Summaries newest first, filtered by tag and a search over name and description"""
+        sql = SUMMARY_SELECT
+        params: list = []
+        if tag is not None:
+            sql += " AND w.id IN (SELECT workflow_id FROM workflow_tags WHERE tag = ?)"
+            params.append(tag)
+        if query and query.strip():
+            if self.full_text:
+                sql += " AND w.id IN (SELECT id FROM workflow_search WHERE workflow_search MATCH ?)"
+                params.append(_match_expression(query))
+            else:
+                sql += " AND (w.name LIKE ? OR w.description LIKE ?)"
+                params += [f"%{query.strip()}%"] * 2
+        sql += " ORDER BY w.created_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [_summary(row) for row in rows]
+
+    def ids(self, tag: Optional[str] = None) -> List[str]:
+        return [summary.id for summary in self.list(tag=tag)]
+
+    def tags(self) -> List[str]:
+        with self._lock:
+            rows = self._db.execute("SELECT DISTINCT tag FROM workflow_tags ORDER BY tag")
+            return [row[0] for row in rows]
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _upsert(self, summary: WorkflowSummary, mtime: float) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                f"INSERT OR REPLACE INTO workflows ({SUMMARY_COLUMNS}, mtime) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    summary.id,
+                    summary.name,
+                    summary.description,
+                    json.dumps(summary.tags),
+                    summary.step_count,
+                    summary.created_at.isoformat(),
+                    summary.last_run.isoformat() if summary.last_run else None,
+                    summary.success_count,
+                    summary.version,
+                    mtime,
+                )
+            )
+            self._db.execute("DELETE FROM workflow_tags WHERE workflow_id = ?", (summary.id,))
+            self._db.executemany(
+                "INSERT OR IGNORE INTO workflow_tags (workflow_id, tag) VALUES (?, ?)",
+                [(summary.id, tag) for tag in summary.tags]
+            )
+            if self.full_text:
+                self._db.execute("DELETE FROM workflow_search WHERE id = ?", (summary.id,))
+                self._db.execute(
+                    "INSERT INTO workflow_search (id, name, description) VALUES (?, ?, ?)",
+                    (summary.id, summary.name, summary.description)
+                )
+
+    def _create_search_index(self) -> bool:
+        try:
+            self._db.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS workflow_search "
+                "USING fts5(id UNINDEXED, name, description)"
+            )
+            return True
+        except sqlite3.OperationalError:
+            logger.info("SQLite FTS5 unavailable, falling back to LIKE search")
+            return False
+
+def _match_expression(query: str) -> str:
+    """Turn free text into an FTS5 prefix query that matches every word"""
+    words = re.findall(r"\w+", query)
+    return " ".join(f'"{word}"*' for word in words) or '""'
+
+def _summary(row: tuple) -> WorkflowSummary:
+    return WorkflowSummary(
+        id=row[0],
+        name=row[1],
+        description=row[2],
+        tags=json.loads(row[3]),
+        step_count=row[4],
+        created_at=row[5],
+        last_run=row[6],
+        success_count=row[7],
+        version=row[8],
+        failure_count=row[9]
+    )
@@ -1,23 +1,34 @@
 # src/workflows/manager.py
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
+import base64
 import json
 from pathlib import Path
 import uuid
-from .models import Workflow, WorkflowStep
+from .catalog import WorkflowCatalog
+from .models import RunStats, Workflow, WorkflowRun, WorkflowStep, WorkflowSummary
+from .runs import RunLog
 from ..tools.results import ToolResult
+from ..tools.screenshot_store import ScreenshotStore
 from ..utils.logger import logger
+from ..utils.metrics import WORKFLOW_STORAGE_SECONDS
 
 class WorkflowManager:
     def __init__(self, storage_dir: str = "data/workflows"):
         self.storage_dir = Path(storage_dir)
         self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.catalog = WorkflowCatalog(self.storage_dir)
+        self.runs = RunLog(self.storage_dir / WorkflowCatalog.DB_FILE)
+        # Step screenshots are kept here, never evicted, and referenced by hash
+        self.screenshots = ScreenshotStore(root=str(self.storage_dir / "screenshots"))
         self.current_recording: List[WorkflowStep] = []
         self.is_recording = False
+        self.recording_model_size: Optional[Tuple[int, int]] = None
     
     def start_recording(self) -> None:
         """Start recording a new workflow"""
         self.current_recording = []
+        self.recording_model_size = None
         self.is_recording = True
         logger.info("Started recording new workflow")
     
@@ -29,18 +40,93 @@ class WorkflowManager:
     def add_step(
         self,
         action: Dict[str, Any],
-        result: Optional[ToolResult] = None
+        result: Optional[ToolResult] = None,
+        model_size: Optional[Tuple[int, int]] = None
     ) -> None:
-        """Add a step to the current recording"""
+        """Add a step to the current recording
+        
+        model_size is the coordinate space of the action's x, y and region,
+        stored with the workflow so replays can rescale them.
+        """
         if self.is_recording:
+            if model_size is not None:
+                self.recording_model_size = tuple(model_size)
+            parameters = {k: v for k, v in action.items() if k != "action"}
+            if result and result.template:
+                # Replays find the clicked element by this crop when it has moved
+                parameters["template"] = self.screenshots.save(
+                    base64.b64decode(result.template["base64_image"]), "image/png"
+                )
+                parameters["template_offset"] = result.template["offset"]
             step = WorkflowStep(
                 action=action["action"],
-                parameters={k: v for k, v in action.items() if k != "action"},
-                result=result.__dict__ if result else None
+                parameters=parameters,
+                result=self._externalize({**result.__dict__, "template": None}) if result else None
             )
             self.current_recording.append(step)
             logger.debug(f"Added step: {step.action}")
     
+    def load_step_image(self, step: WorkflowStep) -> Optional[str]:
+        """Load the base64 screenshot of a recorded step on demand"""
+        if not step.result:
+            return None
+        if step.result.get("base64_image"):
+            return step.result["base64_image"]
+        if ref := step.result.get("image_ref"):
+            return self.screenshots.load_base64(ref)
+        return None
+    
+    def migrate_workflows(self) -> int:
+        """Move screenshots embedded in existing workflow files into the side store
+        
+        Returns the number of files rewritten.
+        """
+        migrated = 0
+        for path in self.storage_dir.glob("*.json"):
+            with open(path, "r") as f:
+                data = json.load(f)
+            
+            changed = False
+            for step in data.get("steps", []):
+                result = step.get("result")
+                if result and _has_embedded_images(result):
+                    step["result"] = self._externalize(result)
+                    changed = True
+            if not changed:
+                continue
+            
+            size = path.stat().st_size
+            with open(path, "w") as f:
+                json.dump(data, f, indent=2, default=str)
+            migrated += 1
+            logger.info(f"Migrated {path.name}: {size:,} -> {path.stat().st_size:,} bytes")
+        
+        self.catalog.sync()
+        return migrated
+    
+    def _externalize(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace inline base64 images in a step result with store references"""
+        result = dict(result)
+        if result.get("base64_image"):
+            result["image_ref"] = self.screenshots.save(
+                base64.b64decode(result["base64_image"]),
+                result.get("media_type") or "image/png"
+            )
+            result["base64_image"] = None
+        if result.get("crops"):
+            result["crops"] = [
+                {
+                    **crop,
+                    "base64_image": None,
+                    "image_ref": self.screenshots.save(
+                        base64.b64decode(crop["base64_image"]),
+                        crop.get("media_type") or "image/png"
+                    ),
+                } if crop.get("base64_image") else crop
+                for crop in result["crops"]
+            ]
+        return result
+    
     def save_workflow(
         self,
         name: str,
@@ -51,19 +137,30 @@ class WorkflowManager:
         if not self.is_recording or not self.current_recording:
             raise ValueError("No workflow is being recorded")
         
+        with WORKFLOW_STORAGE_SECONDS.time(operation="save"):
+            return self._save_recording(name, description, tags)
+    
+    def _save_recording(
+        self,
+        name: str,
+        description: str,
+        tags: Optional[List[str]]
+    ) -> str:
         workflow = Workflow(
             id=str(uuid.uuid4()),
             name=name,
             description=description,
             steps=self.current_recording,
             created_at=datetime.now(),
-            tags=tags or []
+            tags=tags or [],
+            model_size=self.recording_model_size
         )
         
         # Save to file
         workflow_path = self.storage_dir / f"{workflow.id}.json"
         with open(workflow_path, "w") as f:
             json.dump(workflow.dict(), f, indent=2, default=str)
+        self.catalog.add(workflow)
         
         logger.info(f"Saved workflow {workflow.id}: {name}")
         self.stop_recording()
@@ -71,19 +168,35 @@ class WorkflowManager:
     
     def load_workflow(self, workflow_id: str) -> Workflow:
         """Load a workflow from storage"""
+        with WORKFLOW_STORAGE_SECONDS.time(operation="load"):
+            return self._load_workflow(workflow_id)
+    
+    def _load_workflow(self, workflow_id: str) -> Workflow:
         workflow_path = self.storage_dir / f"{workflow_id}.json"
         if not workflow_path.exists():
             raise ValueError(f"Workflow {workflow_id} not found")
         
         with open(workflow_path, "r") as f:
             data = json.load(f)
-            return Workflow.parse_obj(data)
+            workflow = Workflow.parse_obj(data)
+        
+        # Run statistics live in the run log, not in the definition file
+        successes, _, last_success = self.runs.totals(workflow_id)
+        workflow._run_successes = successes
+        workflow._stored_last_run = workflow.last_run
+        workflow.success_count += successes
+        if last_success:
+            last_success = datetime.fromisoformat(last_success)
+            if workflow.last_run is None or last_success > workflow.last_run:
+                workflow.last_run = last_success
+        return workflow
     
     def update_workflow(self, workflow: Workflow) -> None:
         """Update a workflow in storage"""
         workflow_path = self.storage_dir / f"{workflow.id}.json"
         with open(workflow_path, "w") as f:
-            json.dump(workflow.dict(), f, indent=2, default=str)
+            json.dump(workflow.stored(), f, indent=2, default=str)
+        self.catalog.add(workflow)
         logger.info(f"Updated workflow {workflow.id}")
     
     def delete_workflow(self, workflow_id: str) -> bool:
@@ -91,24 +204,49 @@ class WorkflowManager:
         workflow_path = self.storage_dir / f"{workflow_id}.json"
         if workflow_path.exists():
             workflow_path.unlink()
+            self.catalog.remove(workflow_id)
+            self.runs.delete(workflow_id)
             logger.info(f"Deleted workflow {workflow_id}")
             return True
         return False
     
+    def record_run(self, run: WorkflowRun) -> None:
+        """Append a run to the run log without rewriting the workflow"""
+        self.runs.record(run)
+        if run.success:
+            logger.info(f"Workflow {run.workflow_id} succeeded in {run.duration:.2f}s")
+        else:
+            logger.info(
+                f"Workflow {run.workflow_id} failed at step {run.failed_step} "
+                f"after {run.duration:.2f}s"
+            )
+    
+    def get_run_stats(self, workflow_id: str) -> RunStats:
+        """Success rate, duration percentiles and failure points of a workflow"""
+        return self.runs.stats(workflow_id)
+    
     def list_workflows(self, tag: Optional[str] = None) -> List[Workflow]:
         """List all saved workflows, optionally filtered by tag"""
-        workflows = []
-        for file in self.storage_dir.glob("*.json"):
-            with open(file, "r") as f:
-                data = json.load(f)
-                workflow = Workflow.parse_obj(data)
-                if tag is None or tag in workflow.tags:
-                    workflows.append(workflow)
-        return sorted(workflows, key=lambda w: w.created_at, reverse=True)
+        with WORKFLOW_STORAGE_SECONDS.time(operation="list"):
+            self.catalog.sync()
+            return [self._load_workflow(workflow_id) for workflow_id in self.catalog.ids(tag)]
+    
+    def list_summaries(
+        self,
+        tag: Optional[str] = None,
+        query: Optional[str] = None
+    ) -> List[WorkflowSummary]:
+        """List workflow metadata from the catalog without loading any steps"""
+        with WORKFLOW_STORAGE_SECONDS.time(operation="list_summaries"):
+            self.catalog.sync()
+            return self.catalog.list(tag=tag, query=query)
     
     def get_all_tags(self) -> List[str]:
         """Get all unique tags across all workflows"""
-        tags = set()
-        for workflow in self.list_workflows():
-            tags.update(workflow.tags)
-        return sorted(list(tags))
\ No newline at end of file
+        self.catalog.sync()
+        return self.catalog.tags()
+
+def _has_embedded_images(result: Dict[str, Any]) -> bool:
+    return bool(result.get("base64_image")) or any(
+        crop.get("base64_image") for crop in result.get("crops") or []
+    )
@@ -0,0 +1,21 @@
+# src/workflows/migrate.py
+"""
+Shrink existing workflow files by moving embedded screenshots into the side store.
+
+Usage: python -m src.workflows.migrate [--storage-dir data/workflows]
+"""
+import argparse
+from .manager import WorkflowManager
+from ..utils.config import Config
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--storage-dir", default=Config.WORKFLOWS_DIR)
+    args = parser.parse_args()
+
+    manager = WorkflowManager(storage_dir=args.storage_dir)
+    migrated = manager.migrate_workflows()
+    print(f"Migrated {migrated} workflow file(s)")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 # src/workflows/models.py
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 import uuid
 
@@ -26,14 +26,76 @@ class Workflow(BaseModel):
     success_count: int = Field(default=0, ge=0)
     tags: List[str] = Field(default_factory=list)
     version: str = "1.0"
+    # Model-space size the steps' coordinates were recorded in; None for
+    # workflows recorded before it was stored, whose coordinates are screen points
+    model_size: Optional[Tuple[int, int]] = None
+    # Run-log totals merged in on load; never written back to the definition
+    _run_successes: int = PrivateAttr(default=0)
+    _stored_last_run: Optional[datetime] = PrivateAttr(default=None)
     
     class Config:
         json_encoders = {
             datetime: lambda v: v.isoformat()
         }
+    
+    def stored(self) -> Dict[str, Any]:
+        """The definition as persisted, without statistics merged from the run log"""
+        data = self.dict()
+        data["success_count"] = max(0, self.success_count - self._run_successes)
+        if self._run_successes or self._stored_last_run is not None:
+            data["last_run"] = self._stored_last_run
+        return data
         
     def add_step(self, step: WorkflowStep) -> None:
         self.steps.append(step)
         
     def clear_steps(self) -> None:
-        self.steps = []
\ No newline at end of file
+        self.steps = []
+
+class WorkflowSummary(BaseModel):
+    """Workflow metadata without the step bodies"""
+    id: str
+    name: str
+    description: str
+    tags: List[str] = Field(default_factory=list)
+    step_count: int = 0
+    created_at: datetime
+    last_run: Optional[datetime] = None
+    success_count: int = 0
+    failure_count: int = 0
+    version: str = "1.0"
+
+    @classmethod
+    def from_workflow(cls, workflow: Workflow) -> "WorkflowSummary":
+        fields = {k: v for k, v in workflow.stored().items() if k != "steps"}
+        return cls(step_count=len(workflow.steps), **fields)
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> "WorkflowSummary":
+        """Summarize a raw workflow JSON document without validating its steps"""
+        fields = {k: v for k, v in data.items() if k != "steps"}
+        return cls(step_count=len(data.get("steps", [])), **fields)
+
+class WorkflowRun(BaseModel):
+    """One execution of a workflow, as appended to the run log"""
+    workflow_id: str
+    started_at: datetime = Field(default_factory=datetime.now)
+    duration: float = Field(default=0.0, ge=0)
+    success: bool
+    # Index of the step that failed, if any
+    failed_step: Optional[int] = None
+    error: Optional[str] = None
+    step_timings: List[float] = Field(default_factory=list)
+
+class RunStats(BaseModel):
+    """Aggregates over the run log of one workflow"""
+    workflow_id: str
+    run_count: int = 0
+    success_count: int = 0
+    failure_count: int = 0
+    success_rate: Optional[float] = None
+    p50_duration: Optional[float] = None
+    p95_duration: Optional[float] = None
+    last_run: Optional[datetime] = None
+    # Step index to number of runs that failed there
+    failures_by_step: Dict[int, int] = Field(default_factory=dict)
@@ -0,0 +1,135 @@
+# src/workflows/runs.py
+import json
+import math
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from .models import RunStats, WorkflowRun
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workflow_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    workflow_id TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    duration REAL NOT NULL,
+    success INTEGER NOT NULL,
+    failed_step INTEGER,
+    error TEXT,
+    step_timings TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS workflow_runs_workflow ON workflow_runs (workflow_id, started_at);
+"""
+
+# Per-workflow totals, joined into catalog listings
+TOTALS_QUERY = """
+SELECT workflow_id,
+       SUM(success) AS successes,
+       SUM(1 - success) AS failures,
+       MAX(CASE WHEN success THEN started_at END) AS last_success
+FROM workflow_runs
+GROUP BY workflow_id
+"""
+
+class RunLog:
+    """Append-only log of workflow runs with aggregates computed on demand"""
+
+    def __init__(self, db_path: Path):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def record(self, run: WorkflowRun) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO workflow_runs "
+                "(workflow_id, started_at, duration, success, failed_step, error, step_timings) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run.workflow_id,
+                    run.started_at.isoformat(),
+                    run.duration,
+                    int(run.success),
+                    run.failed_step,
+                    run.error,
+                    json.dumps(run.step_timings),
+                )
+            )
+
+    def runs(self, workflow_id: str, limit: Optional[int] = None) -> List[WorkflowRun]:
+        """Runs of a workflow, newest first"""
+        sql = (
+            "SELECT workflow_id, started_at, duration, success, failed_step, error, step_timings "
+            "FROM workflow_runs WHERE workflow_id = ? ORDER BY started_at DESC, id DESC"
+        )
+        params: list = [workflow_id]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [
+            WorkflowRun(
+                workflow_id=row[0],
+                started_at=row[1],
+                duration=row[2],
+                success=bool(row[3]),
+                failed_step=row[4],
+                error=row[5],
+                step_timings=json.loads(row[6])
+            )
+            for row in rows
+        ]
+
+    def stats(self, workflow_id: str) -> RunStats:
+        """Success rate, duration percentiles and failure points of a workflow"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT duration, success, failed_step, started_at "
+                "FROM workflow_runs WHERE workflow_id = ?",
+                (workflow_id,)
+            ).fetchall()
+        if not rows:
+            return RunStats(workflow_id=workflow_id)
+
+        durations = sorted(row[0] for row in rows)
+        successes = sum(row[1] for row in rows)
+        failures_by_step: Dict[int, int] = {}
+        for row in rows:
+            if not row[1] and row[2] is not None:
+                failures_by_step[row[2]] = failures_by_step.get(row[2], 0) + 1
+
+        return RunStats(
+            workflow_id=workflow_id,
+            run_count=len(rows),
+            success_count=successes,
+            failure_count=len(rows) - successes,
+            success_rate=successes / len(rows),
+            p50_duration=_percentile(durations, 50),
+            p95_duration=_percentile(durations, 95),
+            last_run=max(row[3] for row in rows),
+            failures_by_step=failures_by_step
+        )
+
+    def totals(self, workflow_id: str) -> Tuple[int, int, Optional[str]]:
+        """Successes, failures and the last successful run of one workflow"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT SUM(success), SUM(1 - success), "
+                "MAX(CASE WHEN success THEN started_at END) "
+                "FROM workflow_runs WHERE workflow_id = ?",
+                (workflow_id,)
+            ).fetchone()
+        return row[0] or 0, row[1] or 0, row[2]
+
+    def delete(self, workflow_id: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM workflow_runs WHERE workflow_id = ?", (workflow_id,))
+
+    def close(self) -> None:
+        self._db.close()
+
+def _percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
@@ -5,6 +5,8 @@ from pathlib import Path
 from typing import Generator
 from src.workflows.manager import WorkflowManager
 from src.tools.computer import MacComputer
+from src.tools.fake_backend import FakeBackend
+from src.utils.config import Config
 from src.agent.enhanced_agent import EnhancedComputerAgent
 
 @pytest.fixture
@@ -21,6 +23,23 @@ def workflow_manager(temp_workflow_dir) -> WorkflowManager:
 def computer_tool() -> MacComputer:
     return MacComputer()
 
+@pytest.fixture
+def isolated_settle_stats(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(Config, "SETTLE_STATS_PATH", str(tmp_path / "settle_stats.json"))
+
+@pytest.fixture
+def fake_backend(request) -> FakeBackend:
+    """Parametrize indirectly with FakeBackend keyword arguments"""
+    return FakeBackend(**getattr(request, "param", {}))
+
+@pytest.fixture
+def fake_computer(request, fake_backend, isolated_settle_stats) -> MacComputer:
+    """Parametrize indirectly with MacComputer keyword arguments"""
+    options = {"save_screenshots": False, **getattr(request, "param", {})}
+    computer = MacComputer(backend=fake_backend, **options)
+    yield computer
+    computer.close()
+
 @pytest.fixture
 def enhanced_agent(workflow_manager) -> EnhancedComputerAgent:
     agent = EnhancedComputerAgent()
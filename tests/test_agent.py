@@ -1,8 +1,25 @@
 # tests/test_agent.py
+import asyncio
+import base64
+import io
+import json
+import threading
+import time
 import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from PIL import Image
 from unittest.mock import Mock, patch
 from src.agent.enhanced_agent import EnhancedComputerAgent
+from src.agent import conversation
+from src.agent.conversation import ConversationMemory, estimate_tokens
+from src.agent.request_builder import PromptCacheStats
+from src.agent.response_cache import ResponseCache
+from src.agent.action_parser import ActionParser, Click, Hotkey, MouseMove, PressKey, TypeText, parse_actions
+from src.agent.streaming import ActionPipeline, get_async_client, replay, stream_text
 from src.tools.results import ToolResult
+from src.utils.config import Config
+from src.utils.tracing import Tracer
 
 @pytest.mark.asyncio
 async def test_agent_process_message(enhanced_agent):
@@ -36,4 +53,416 @@ async def test_agent_workflow_recording(enhanced_agent):
         
         workflows = enhanced_agent.workflow_manager.list_workflows()
         assert len(workflows) == 1
-        assert workflows[0].steps[0].action == "screenshot"
\ No newline at end of file
+        assert workflows[0].steps[0].action == "screenshot"
+class StubMessages:
+    """Local stand-in for client.messages that counts round trips"""
+
+    def __init__(self, text="Taking screenshot"):
+        self.text = text
+        self.calls = 0
+
+    def create(self, **request):
+        self.calls += 1
+        return SimpleNamespace(content=[SimpleNamespace(type="text", text=self.text)])
+
+def _request(content="Take a screenshot", model="claude-3-opus-20240229", system="prompt"):
+    return {
+        "model": model,
+        "max_tokens": 1024,
+        "system": system,
+        "messages": [{"role": "user", "content": content}],
+    }
+
+@pytest.mark.asyncio
+async def test_response_cache_hits_on_repeated_request():
+    cache = ResponseCache()
+    stub = StubMessages()
+
+    assert await cache.complete(stub.create, **_request()) == "Taking screenshot"
+    assert await cache.complete(stub.create, **_request()) == "Taking screenshot"
+    assert stub.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    await cache.complete(stub.create, **_request(model="other-model"))
+    await cache.complete(stub.create, **_request(system="changed prompt"))
+    assert stub.calls == 3
+
+@pytest.mark.asyncio
+async def test_response_cache_bypasses_images():
+    cache = ResponseCache()
+    stub = StubMessages()
+    content = [
+        {"type": "image", "source": {"type": "base64", "media_type": "image/png", "data": "x"}},
+        {"type": "text", "text": "What is on screen?"},
+    ]
+    for _ in range(2):
+        await cache.complete(stub.create, **_request(content=content))
+    assert stub.calls == 2
+    assert cache.stats()["bypassed"] == 2
+
+@pytest.mark.asyncio
+async def test_response_cache_persists_and_expires(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.db")
+    stub = StubMessages()
+    await ResponseCache(path=path).complete(stub.create, **_request())
+
+    reopened = ResponseCache(path=path, ttl=60)
+    assert await reopened.complete(stub.create, **_request()) == "Taking screenshot"
+    assert stub.calls == 1
+
+    later = time.time() + 120
+    monkeypatch.setattr(time, "time", lambda: later)
+    await ResponseCache(path=path, ttl=60).complete(stub.create, **_request())
+    assert stub.calls == 2
+
+def test_response_cache_evicts_by_count_and_size(tmp_path):
+    cache = ResponseCache(max_entries=2, path=str(tmp_path / "cache.db"), max_disk_bytes=10)
+    for key in ("a", "b", "c"):
+        cache.put(key, "12345")
+    assert cache.stats()["entries"] == 2
+
+    cache._memory.clear()
+    assert cache.get("a") is None
+    assert cache.get("c") == "12345"
+
+STREAM_LINES = ["Clicking the button\n", "Click again\n", "Done"]
+STREAM_DELAY = 0.2
+
+class MockStreamingHandler(BaseHTTPRequestHandler):
+    """Serves a Messages API event stream that sends one line per STREAM_DELAY"""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        self._event("message_start", {"type": "message_start", "message": {
+            "id": "msg_1", "type": "message", "role": "assistant", "model": "mock",
+            "content": [], "stop_reason": None, "stop_sequence": None,
+            "usage": {"input_tokens": 1, "output_tokens": 1}}})
+        self._event("content_block_start", {"type": "content_block_start", "index": 0,
+                                            "content_block": {"type": "text", "text": ""}})
+        for line in STREAM_LINES:
+            self._event("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                                "delta": {"type": "text_delta", "text": line}})
+            time.sleep(STREAM_DELAY)
+        self._event("content_block_stop", {"type": "content_block_stop", "index": 0})
+        self._event("message_delta", {"type": "message_delta",
+                                      "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                      "usage": {"output_tokens": 3}})
+        self._event("message_stop", {"type": "message_stop"})
+
+    def _event(self, name, data):
+        self.wfile.write(f"event: {name}\ndata: {json.dumps(data)}\n\n".encode())
+        self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def mock_api():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockStreamingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+@pytest.mark.asyncio
+async def test_streamed_actions_start_before_response_completes(mock_api, fake_computer):
+    client = get_async_client(api_key="test", base_url=mock_api)
+    chunks = stream_text(
+        client, model="mock", max_tokens=64, messages=[{"role": "user", "content": "go"}]
+    )
+    pipeline = ActionPipeline(fake_computer)
+
+    text, batch, metrics = await pipeline.run(chunks)
+    assert text == "".join(STREAM_LINES)
+    assert [a["action"] for a in batch.actions] == ["click", "click"]
+    assert metrics.lines == 3
+    assert metrics.time_to_first_action < STREAM_DELAY
+    assert metrics.total_time >= STREAM_DELAY * len(STREAM_LINES)
+    assert get_async_client(api_key="test", base_url=mock_api) is client
+
+@pytest.mark.asyncio
+async def test_pipeline_stops_executing_after_error(fake_computer, fake_backend, monkeypatch):
+    def broken_click(*args, **kwargs):
+        raise RuntimeError("click failed")
+    monkeypatch.setattr(fake_backend, "click", broken_click)
+
+    text, batch, _ = await ActionPipeline(fake_computer).run(
+        replay("Take a screenshot\nClick here\nType 'never'")
+    )
+    assert [a["action"] for a in batch.actions] == ["screenshot", "click"]
+    assert "click failed" in batch.error
+    assert text.endswith("Type 'never'")
+
+def test_parser_keeps_case_and_reads_chords_and_coordinates():
+    response = (
+        "First, move the mouse to 120, 340\n"
+        "Then I'll type \"Hello World\" into the field\n"
+        "Press Command + Shift + T to reopen the tab\n"
+        "Double-click at 5, 6\n"
+        "Press the Enter key.\n"
+        "That's all for the prototype."
+    )
+    assert parse_actions(response) == [
+        MouseMove(120, 340),
+        TypeText("Hello World"),
+        Hotkey(("command", "shift", "t")),
+        parse_actions("double click at 5, 6")[0],
+        PressKey("enter"),
+    ]
+    assert parse_actions("double click at 5, 6")[0].to_dict() == {
+        "action": "double_click", "x": 5, "y": 6
+    }
+
+def test_parser_consumes_chunks_incrementally():
+    parser = ActionParser()
+    assert parser.feed("Cli") == []
+    assert parser.feed("ck at 1, 2\ntype 'A") == [Click(1, 2)]
+    assert parser.feed("bc'\npress cmd+") == [TypeText("Abc")]
+    assert parser.feed("v") == []
+    assert parser.close() == [Hotkey(("command", "v"))]
+    assert parser.lines == 3
+
+class ScriptedMessages:
+    """Fake messages API replaying scripted responses and recording requests"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    async def create(self, **request):
+        self.requests.append(request)
+        return SimpleNamespace(content=self.responses.pop(0))
+
+def _tool_use(id, name, input):
+    return SimpleNamespace(type="tool_use", id=id, name=name, input=input)
+
+def _text(text):
+    return SimpleNamespace(type="text", text=text)
+
+@pytest.fixture
+def tool_agent(fake_computer, workflow_manager, monkeypatch):
+    monkeypatch.setattr(Config, "RESPONSE_CACHE", False)
+    monkeypatch.setattr(Config, "TOOL_USE", True)
+    messages = ScriptedMessages([
+        [
+            _text("Opening Spotlight and searching."),
+            _tool_use("tu_1", "batch", {"actions": [
+                {"action": "hotkey", "keys": ["command", "space"]},
+                {"action": "type", "text": "Safari"},
+                {"action": "press_key", "key": "enter"},
+            ]}),
+            _tool_use("tu_2", "screenshot", {}),
+        ],
+        [_text("Safari is open.")],
+    ])
+    agent = EnhancedComputerAgent(
+        computer=fake_computer,
+        workflow_manager=workflow_manager,
+        client=SimpleNamespace(messages=messages)
+    )
+    return agent, messages
+
+@pytest.mark.asyncio
+async def test_tool_use_runs_batches_and_returns_structured_results(tool_agent, fake_backend):
+    agent, messages = tool_agent
+    result = await agent.process_message("Open Safari")
+
+    assert not result.error
+    assert result.base64_image
+    assert [e[0] for e in fake_backend.events if e[0] != "screenshot"] == [
+        "hotkey", "write", "press"
+    ]
+    assert agent.last_tool_stats.round_trips == 2
+    assert agent.last_tool_stats.tool_calls == 2
+    assert agent.last_tool_stats.actions == 4
+
+    first, second = messages.requests
+    assert {tool["name"] for tool in first["tools"]} >= {"batch", "click", "type", "hotkey"}
+    tool_results = second["messages"][-1]["content"]
+    assert [r["tool_use_id"] for r in tool_results] == ["tu_1", "tu_2"]
+    assert not tool_results[0]["is_error"]
+    assert "3. press_key: Pressed key: enter" in tool_results[0]["content"][0]["text"]
+    assert tool_results[1]["content"][-1]["type"] == "image"
+
+@pytest.mark.asyncio
+async def test_tool_use_reports_invalid_calls_to_the_model(tool_agent):
+    agent, messages = tool_agent
+    messages.responses[0] = [_tool_use("tu_1", "batch", {"actions": [{"action": "launch"}]})]
+
+    await agent.process_message("Open Safari")
+    tool_result = messages.requests[1]["messages"][-1]["content"][0]
+    assert tool_result["is_error"]
+    assert "launch" in tool_result["content"][0]["text"]
+
+def _screenshot_turn(request, size=(400, 300)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "white").save(buffer, format="PNG")
+    image = {"type": "image", "source": {
+        "type": "base64", "media_type": "image/png",
+        "data": base64.b64encode(buffer.getvalue()).decode()}}
+    return [
+        {"role": "user", "content": request},
+        {"role": "assistant", "content": [_tool_block("screenshot")]},
+        {"role": "user", "content": [{"type": "tool_result", "tool_use_id": "tu",
+                                      "content": [{"type": "text", "text": "ok"}, image]}]},
+        {"role": "assistant", "content": [{"type": "text", "text": f"Done: {request}"}]},
+    ]
+
+def _tool_block(name):
+    return {"type": "tool_use", "id": "tu", "name": name, "input": {}}
+
+def test_memory_keeps_latest_images_and_collapses_old_turns():
+    memory = ConversationMemory(keep_turns=2, max_images=1, image_max_dimension=100)
+    for i in range(4):
+        memory.add_turn(_screenshot_turn(f"task {i}"))
+
+    messages = memory.context([{"role": "user", "content": "next"}])
+    images = [b for m in messages if isinstance(m["content"], list)
+              for r in m["content"] for b in r.get("content") or [] if b["type"] == "image"]
+    assert len(images) == 1
+    with Image.open(io.BytesIO(base64.b64decode(images[0]["source"]["data"]))) as image:
+        assert image.size == (100, 75)
+
+    assert messages[0] == {"role": "user", "content": "task 0"}
+    assert messages[1] == {"role": "assistant", "content": "[actions: screenshot] Done: task 0"}
+    assert len(messages) == 2 * 2 + 4 * 2 + 1
+    assert [m["role"] for m in messages] == ["user", "assistant"] * 6 + ["user"]
+
+def test_memory_prepares_turns_once(monkeypatch):
+    memory = ConversationMemory(keep_turns=2, max_images=1)
+    for i in range(3):
+        memory.add_turn(_screenshot_turn(f"task {i}"))
+    assert [turn.images for turn in memory.turns] == [0, 0, 1]
+
+    sizes = []
+    monkeypatch.setattr(conversation, "_image_size", lambda block: sizes.append(block))
+    current = [{"role": "user", "content": "next"}]
+    first = memory.context(current)
+    assert memory.context(current) == first
+    assert sizes == []
+
+    # An image in the current turn displaces the stored one without touching history
+    current = _screenshot_turn("now")[:3]
+    messages = memory.context(current)
+    images = [b for m in messages if isinstance(m["content"], list)
+              for r in m["content"] for b in r.get("content") or [] if b["type"] == "image"]
+    assert len(images) == 1 and images[0] is current[2]["content"][0]["content"][1]
+    assert memory.turns[-1].images == 1
+
+def test_memory_drops_oldest_turns_over_budget():
+    memory = ConversationMemory(token_budget=60, keep_turns=10)
+    for i in range(5):
+        memory.add_turn([
+            {"role": "user", "content": f"request {i} " + "x" * 80},
+            {"role": "assistant", "content": "ok"},
+        ])
+    messages = memory.context([{"role": "user", "content": "latest"}])
+    assert estimate_tokens(messages) <= 60
+    assert messages[0]["content"].startswith("request 3")
+    assert messages[-1]["content"] == "latest"
+
+@pytest.mark.asyncio
+async def test_agent_sends_history_on_the_next_message(tool_agent):
+    agent, messages = tool_agent
+    await agent.process_message("Open Safari")
+    messages.responses.append([_text("It is still open.")])
+    await agent.process_message("Is Safari open?")
+
+    history = messages.requests[-1]["messages"]
+    assert history[0] == {"role": "user", "content": "Open Safari"}
+    assert history[-1] == {"role": "user", "content": "Is Safari open?"}
+    assert sum(1 for m in history if m["role"] == "user") == 3
+
+class CachingMessages(ScriptedMessages):
+    """Scripted client that simulates prompt caching of the marked prefix"""
+
+    def __init__(self, responses):
+        super().__init__(responses)
+        self.cached = set()
+
+    async def create(self, **request):
+        response = await super().create(**request)
+        # The API caches tools, then system, up to the last cache_control marker
+        prefix = json.dumps([request.get("tools", []), request["system"]], sort_keys=True)
+        prefix_tokens = len(prefix) // 4
+        read = prefix in self.cached
+        self.cached.add(prefix)
+        response.usage = SimpleNamespace(
+            input_tokens=len(json.dumps(request["messages"])) // 4,
+            cache_read_input_tokens=prefix_tokens if read else 0,
+            cache_creation_input_tokens=0 if read else prefix_tokens,
+            output_tokens=10,
+        )
+        return response
+
+@pytest.mark.asyncio
+async def test_prompt_prefix_is_cacheable_and_stable(tool_agent):
+    agent, scripted = tool_agent
+    messages = CachingMessages(scripted.responses + [[_text("Still open.")]])
+    agent._client = SimpleNamespace(messages=messages)
+
+    await agent.process_message("Open Safari")
+    await agent.process_message("Is it open?")
+
+    prefixes = {json.dumps([r["tools"], r["system"]]) for r in messages.requests}
+    assert len(prefixes) == 1
+    first = messages.requests[0]
+    assert first["system"][0]["cache_control"] == {"type": "ephemeral"}
+    assert "spotlight: command+space" in first["system"][0]["text"]
+    assert first["tools"][-1]["cache_control"] == {"type": "ephemeral"}
+    assert agent.requests.check_prefix()
+
+    usage = list(agent.requests.stats.requests)
+    assert len(usage) == 3
+    assert usage[0].cache_write_tokens > 0 and usage[0].cache_read_tokens == 0
+    assert all(u.cache_read_tokens == usage[0].cache_write_tokens for u in usage[1:])
+    assert agent.requests.stats.totals().cache_read_tokens == 2 * usage[0].cache_write_tokens
+
+def test_prompt_cache_stats_keep_totals_beyond_history():
+    stats = PromptCacheStats(history=2)
+    for tokens in (100, 200, 300):
+        stats.record({"input_tokens": tokens, "cache_read_input_tokens": 10})
+    assert [u.input_tokens for u in stats.requests] == [200, 300]
+    assert stats.count == 3
+    assert (stats.totals().input_tokens, stats.totals().cache_read_tokens) == (600, 30)
+
+@pytest.mark.asyncio
+async def test_tool_turn_is_traced_per_session(tool_agent, tmp_path, monkeypatch):
+    agent, _ = tool_agent
+    monkeypatch.setattr(Config, "TRACE_DIR", str(tmp_path / "traces"))
+    agent.tracer = Tracer(session="s1")
+    await agent.process_message("Open Safari")
+
+    trace = json.loads((tmp_path / "traces" / "s1.json").read_text())
+    events = {e["name"]: e for e in trace["traceEvents"] if e["ph"] == "X"}
+    assert {"process_message", "llm.request", "action", "encode"} <= set(events)
+    assert events["process_message"]["args"]["path"] == "tools"
+    actions = [e["args"]["action"] for e in trace["traceEvents"] if e["name"] == "action"]
+    assert actions == ["hotkey", "type", "press_key", "screenshot"]
+    assert events["encode"]["args"]["bytes"] > 0
+
+@pytest.mark.asyncio
+async def test_clicks_save_templates_while_the_manager_records(tool_agent):
+    agent, _ = tool_agent
+    assert (await agent.computer(action="click", x=100, y=100)).template is None
+
+    # The sidebar starts and stops recording on the manager directly
+    agent.workflow_manager.start_recording()
+    assert (await agent.computer(action="click", x=100, y=100)).template is not None
+    agent.workflow_manager.stop_recording()
+    assert (await agent.computer(action="click", x=100, y=100)).template is None
+
+def test_clients_of_finished_event_loops_are_closed():
+    async def current():
+        client = get_async_client(api_key="test", base_url="http://127.0.0.1:9")
+        await asyncio.sleep(0)
+        return client
+
+    first = asyncio.run(current())
+    second = asyncio.run(current())
+    assert second is not first
+    assert first.is_closed() and not second.is_closed()
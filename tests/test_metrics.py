@@ -0,0 +1,64 @@
+# tests/test_metrics.py
+import urllib.request
+import pytest
+from src.utils.metrics import ACTION_SECONDS, WORKFLOW_STORAGE_SECONDS, MetricsRegistry, metrics
+
+@pytest.fixture
+def enabled_metrics(monkeypatch):
+    monkeypatch.setattr(metrics, "enabled", True)
+    metrics.reset()
+    yield metrics
+    metrics.reset()
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry(enabled=False)
+    counter = registry.counter("events_total", "Events")
+    histogram = registry.histogram("latency_seconds", "Latency")
+    counter.inc()
+    histogram.observe(0.2)
+    with histogram.time():
+        pass
+    assert counter.value() == 0 and histogram.count() == 0
+
+def test_prometheus_text_and_endpoint():
+    registry = MetricsRegistry(enabled=True, namespace="test")
+    counter = registry.counter("events_total", "Events", ["kind"])
+    histogram = registry.histogram("latency_seconds", "Latency", ["op"], buckets=(0.1, 1.0))
+    counter.inc(kind="a")
+    counter.inc(2, kind="a")
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, op="load")
+
+    assert counter.value(kind="a") == 3
+    assert histogram.count(op="load") == 3 and histogram.sum(op="load") == pytest.approx(5.55)
+    assert histogram.quantile(0.5, op="load") == 1.0
+
+    text = registry.render()
+    assert "# TYPE test_events_total counter" in text
+    assert 'test_events_total{kind="a"} 3' in text
+    assert 'test_latency_seconds_bucket{op="load",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{op="load",le="+Inf"} 3' in text
+    assert 'test_latency_seconds_count{op="load"} 3' in text
+
+    port = registry.start_server(0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            assert response.read().decode() == registry.render()
+    finally:
+        registry.stop_server()
+
+@pytest.mark.asyncio
+async def test_actions_and_workflow_storage_are_measured(enabled_metrics, fake_computer, workflow_manager):
+    await fake_computer(action="click", x=1, y=1)
+    await fake_computer(action="teleport")
+    await fake_computer(action="press_key")
+    assert ACTION_SECONDS.count(action="click", status="ok") == 1
+    assert ACTION_SECONDS.count(action="press_key", status="error") == 1
+
+    workflow_manager.start_recording()
+    workflow_manager.add_step({"action": "mouse_move", "x": 1, "y": 1})
+    workflow_id = workflow_manager.save_workflow(name="Move", description="")
+    workflow_manager.load_workflow(workflow_id)
+    assert WORKFLOW_STORAGE_SECONDS.count(operation="save") == 1
+    assert WORKFLOW_STORAGE_SECONDS.count(operation="load") == 1
+    assert "computer_screenshot_bytes" in enabled_metrics.render()
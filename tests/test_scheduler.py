@@ -0,0 +1,102 @@
+# tests/test_scheduler.py
+import asyncio
+import pytest
+from pathlib import Path
+from src.runner import WorkflowScheduler
+from src.runner.cli import main
+from src.tools.fake_backend import FakeBackend
+from src.utils.config import Config
+
+# Workers build their own computers, which record settle statistics
+pytestmark = pytest.mark.usefixtures("isolated_settle_stats")
+
+def _record(manager, name, steps=2):
+    manager.start_recording()
+    for i in range(steps):
+        manager.add_step({"action": "click", "x": i, "y": i})
+    return manager.save_workflow(name=name, description="")
+
+@pytest.mark.asyncio
+async def test_scheduler_runs_by_priority(workflow_manager):
+    low = _record(workflow_manager, "Low")
+    high = _record(workflow_manager, "High")
+    scheduler = WorkflowScheduler(workflow_manager, backend_factory=FakeBackend)
+    scheduler.submit(low, priority=0)
+    scheduler.submit(high, priority=5)
+
+    jobs = await scheduler.run()
+    assert all(job.status == "succeeded" for job in jobs)
+    by_start = sorted(jobs, key=lambda job: job.started_at)
+    assert [job.workflow_id for job in by_start] == [high, low]
+
+    status = scheduler.status()
+    assert (status.succeeded, status.failed, status.queued) == (2, 0, 0)
+    assert workflow_manager.get_run_stats(high).success_count == 1
+
+@pytest.mark.asyncio
+async def test_scheduler_runs_jobs_concurrently_on_separate_backends(workflow_manager):
+    workflow_id = _record(workflow_manager, "Slow", steps=1)
+    backends = []
+
+    def factory():
+        backends.append(FakeBackend(latency=0.2))
+        return backends[-1]
+
+    scheduler = WorkflowScheduler(workflow_manager, backend_factory=factory, concurrency=3)
+    for _ in range(3):
+        scheduler.submit(workflow_id)
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await scheduler.run()
+    assert loop.time() - start < 0.5
+    assert len(backends) == 3
+    assert all(any(e[0] == "click" for e in b.events) for b in backends)
+
+@pytest.mark.asyncio
+async def test_scheduler_retries_timed_out_jobs(workflow_manager):
+    workflow_id = _record(workflow_manager, "Hangs", steps=1)
+    scheduler = WorkflowScheduler(
+        workflow_manager, backend_factory=lambda: FakeBackend(latency=0.5)
+    )
+    job = scheduler.submit(workflow_id, timeout=0.1, retries=1)
+
+    await scheduler.run()
+    assert job.status == "timed_out"
+    assert job.attempts == 2
+    assert scheduler.status().retried == 1
+    assert scheduler.status().failed == 1
+
+    stats = workflow_manager.get_run_stats(workflow_id)
+    assert stats.failure_count == 2
+
+@pytest.mark.asyncio
+async def test_scheduler_reports_missing_workflow(workflow_manager):
+    scheduler = WorkflowScheduler(workflow_manager, backend_factory=FakeBackend)
+    job = scheduler.submit("missing")
+    await scheduler.run()
+    assert job.status == "failed"
+    assert "missing" in job.result.error
+
+def test_cli_rejects_concurrent_runs_on_the_mac_backend(capsys):
+    with pytest.raises(SystemExit) as exc:
+        main(["some-workflow", "--backend", "mac", "--concurrency", "2"])
+    assert exc.value.code == 2
+    assert "--concurrency 1" in capsys.readouterr().err
+
+@pytest.mark.asyncio
+async def test_scheduler_persists_settle_stats_only_when_asked(workflow_manager, tmp_path):
+    workflow_id = _record(workflow_manager, "Settles", steps=2)
+    scheduler = WorkflowScheduler(workflow_manager, backend_factory=FakeBackend, concurrency=2)
+    scheduler.submit(workflow_id)
+    scheduler.submit(workflow_id)
+    await scheduler.run()
+    assert not Path(Config.SETTLE_STATS_PATH).exists()
+
+    path = tmp_path / "runner_settle.json"
+    scheduler = WorkflowScheduler(
+        workflow_manager, backend_factory=FakeBackend, settle_stats_path=str(path)
+    )
+    scheduler.submit(workflow_id)
+    await scheduler.run()
+    assert path.exists()
@@ -0,0 +1,117 @@
+import base64
+import io
+import pytest
+from PIL import Image
+from src.tools.encoding import EncodingOptions, ScreenshotEncoder, encode_image
+from src.tools.frame_diff import FrameDiffer
+from src.tools.screenshot_store import ScreenshotStore, screenshot_ref
+
+def _frame(width=400, height=300, color=(200, 200, 200)) -> Image.Image:
+    return Image.new("RGB", (width, height), color)
+
+@pytest.mark.parametrize("fmt,media_type", [
+    ("png", "image/png"),
+    ("jpeg", "image/jpeg"),
+    ("webp", "image/webp"),
+])
+def test_encode_image_formats(fmt, media_type):
+    encoded = encode_image(_frame(), EncodingOptions(format=fmt))
+    assert encoded.media_type == media_type
+    decoded = Image.open(io.BytesIO(base64.b64decode(encoded.base64)))
+    assert decoded.size == (400, 300)
+
+def test_encode_image_downscales_to_max_dimension():
+    encoded = encode_image(_frame(2880, 1800), EncodingOptions(max_dimension=1280))
+    assert (encoded.width, encoded.height) == (1280, 800)
+
+def test_invalid_encoding_options():
+    with pytest.raises(ValueError):
+        EncodingOptions(format="gif")
+    with pytest.raises(ValueError):
+        EncodingOptions(quality=0)
+
+@pytest.mark.asyncio
+async def test_encoder_persists_in_background(tmp_path):
+    encoder = ScreenshotEncoder(EncodingOptions(format="jpeg"))
+    encoded = await encoder.encode(_frame())
+    encoder.persist((tmp_path / "frame.jpg").write_bytes, encoded.data).result()
+    encoder.shutdown()
+    assert (tmp_path / "frame.jpg").read_bytes() == encoded.data
+
+def test_frame_differ_detects_unchanged_partial_and_full():
+    differ = FrameDiffer(tile_size=16)
+    frame = _frame()
+    assert differ.diff(frame).kind == "full"
+    assert differ.diff(frame.copy()).kind == "unchanged"
+
+    changed = frame.copy()
+    changed.paste((0, 0, 0), (100, 50, 140, 70))
+    delta = differ.diff(changed)
+    assert delta.kind == "partial"
+    assert len(delta.regions) == 1
+    region = delta.regions[0]
+    assert region.x <= 100 and region.y <= 50
+    assert region.x + region.width >= 140 and region.y + region.height >= 70
+
+    assert differ.diff(_frame(color=(10, 10, 10))).kind == "full"
+
+def test_frame_differ_separates_distant_regions():
+    differ = FrameDiffer(tile_size=16)
+    frame = _frame()
+    differ.reset(frame)
+    changed = frame.copy()
+    changed.paste((0, 0, 0), (0, 0, 10, 10))
+    changed.paste((0, 0, 0), (380, 280, 400, 300))
+    delta = differ.diff(changed)
+    assert delta.kind == "partial"
+    assert len(delta.regions) == 2
+
+def test_screenshot_store_deduplicates_by_content(tmp_path):
+    store = ScreenshotStore(root=str(tmp_path))
+    ref = store.save(b"frame-a", "image/png")
+    assert store.save(b"frame-a", "image/png") == ref == screenshot_ref(b"frame-a")
+    assert len(store) == 1
+    assert store.load(ref) == b"frame-a"
+
+    reopened = ScreenshotStore(root=str(tmp_path))
+    assert ref in reopened
+    assert reopened.media_type(ref) == "image/png"
+
+def test_screenshot_store_evicts_least_recently_used(tmp_path):
+    store = ScreenshotStore(root=str(tmp_path), max_bytes=20)
+    first = store.save(b"a" * 10)
+    second = store.save(b"b" * 10)
+    store.load(first)
+    third = store.save(b"c" * 10)
+    assert first in store and third in store
+    assert second not in store
+    assert store.load(second) is None
+
+def test_screenshot_store_appends_to_its_journal(tmp_path):
+    store = ScreenshotStore(root=str(tmp_path), max_bytes=20)
+    refs = [store.save(bytes([i]) * 10) for i in range(3)]
+    assert not (tmp_path / ScreenshotStore.INDEX_FILE).exists()
+    assert len((tmp_path / ScreenshotStore.JOURNAL_FILE).read_text().splitlines()) == 4
+
+    reopened = ScreenshotStore(root=str(tmp_path))
+    assert refs[0] not in reopened
+    assert reopened.load(refs[2]) == bytes([2]) * 10
+
+    reopened.flush()
+    reopened.evict()
+    assert not (tmp_path / ScreenshotStore.JOURNAL_FILE).exists()
+    assert [ref in ScreenshotStore(root=str(tmp_path)) for ref in refs] == [False, True, True]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fake_computer", [{"save_screenshots": True}], indirect=True)
+async def test_screenshot_ref_only_after_a_successful_save(fake_computer, monkeypatch, tmp_path):
+    fake_computer.screenshot_store = ScreenshotStore(root=str(tmp_path))
+    result = await fake_computer(action="screenshot")
+    assert fake_computer.screenshot_store.load(result.image_ref) is not None
+
+    def fail(data, media_type):
+        raise OSError("disk full")
+    monkeypatch.setattr(fake_computer.screenshot_store, "save", fail)
+    fake_computer.frame_differ = None
+    result = await fake_computer(action="screenshot")
+    assert result.image_ref is None and result.base64_image
@@ -1,7 +1,16 @@
 # tests/test_tools.py
+import asyncio
+import base64
+import io
+import time
 import pytest
+from PIL import Image, ImageDraw
+from src.tools.batch import coalesce_actions
 from src.tools.computer import MacComputer
+from src.tools.frame_grabber import FrameGrabber
+from src.tools.locator import Template, TemplateLocator
 from src.tools.results import ToolResult
+from src.tools.scaling import ScreenScaler, parse_size
 
 @pytest.mark.asyncio
 async def test_mouse_move(computer_tool):
@@ -27,4 +36,348 @@ async def test_invalid_action(computer_tool):
     result = await computer_tool(action="invalid_action")
     assert isinstance(result, ToolResult)
     assert result.error is not None
-    assert "Unknown action" in result.error
\ No newline at end of file
+    assert "Unknown action" in result.error
+
+@pytest.mark.asyncio
+async def test_backend_calls_run_off_the_event_loop(fake_computer, fake_backend):
+    result = await fake_computer(action="mouse_move", x=10, y=20)
+    assert result.error is None
+    assert fake_backend.events == [("move_to", 10, 20)]
+
+@pytest.mark.asyncio
+async def test_action_timeout(fake_computer, fake_backend):
+    fake_backend.latency = 0.5
+    result = await fake_computer(action="type", text="slow", timeout=0.05)
+    assert result.status == "timeout"
+    assert "Timed out" in result.error
+    assert "may still complete" in result.error
+
+@pytest.mark.asyncio
+async def test_timed_out_input_blocks_later_input_until_it_finishes(fake_computer, fake_backend):
+    fake_backend.latency = 0.3
+    result = await fake_computer(action="type", text="slow", timeout=0.05)
+    assert result.status == "timeout"
+    fake_backend.latency = 0.0
+    await fake_computer(action="click", x=5, y=5)
+    assert fake_backend.events[0] == ("write", "slow")
+    assert fake_backend.events[1:] == [("move_to", 5, 5), ("click", 1, "left")]
+
+@pytest.mark.asyncio
+async def test_cancel_pending_returns_cancelled_result(fake_computer, fake_backend):
+    fake_backend.latency = 0.5
+    task = asyncio.create_task(fake_computer(action="click"))
+    await asyncio.sleep(0.05)
+    assert fake_computer.cancel_pending() == 1
+    assert fake_computer.cancel_pending() == 0
+    result = await task
+    assert result.status == "cancelled"
+    assert result.error == "Cancelled click"
+    assert not fake_computer._cancelled
+
+@pytest.mark.asyncio
+async def test_read_only_actions_overlap_input(fake_computer, fake_backend):
+    fake_backend.latency = 0.3
+    typing = asyncio.create_task(fake_computer(action="type", text="hello"))
+    await asyncio.sleep(0.05)
+    result = await fake_computer(action="get_position")
+    assert not typing.done()
+    assert "Mouse position" in result.output
+    await typing
+
+def test_coalesce_actions():
+    actions = [
+        {"action": "mouse_move", "x": 1, "y": 1},
+        {"action": "mouse_move", "x": 50, "y": 60},
+        {"action": "click"},
+        {"action": "type", "text": "Hello, "},
+        {"action": "type", "text": "World"},
+        {"action": "mouse_move", "x": 5, "y": 5},
+        {"action": "screenshot"},
+    ]
+    assert coalesce_actions(actions) == [
+        {"action": "click", "x": 50, "y": 60},
+        {"action": "type", "text": "Hello, World"},
+        {"action": "mouse_move", "x": 5, "y": 5},
+        {"action": "screenshot"},
+    ]
+
+@pytest.mark.asyncio
+async def test_batch_runs_coalesced_actions(fake_computer, fake_backend):
+    plan = [{"action": "mouse_move", "x": i, "y": i} for i in range(8)]
+    plan += [{"action": "click"}, {"action": "type", "text": "done"}]
+    batch = await fake_computer.batch(plan)
+    assert batch.original_count == 10
+    assert len(batch.results) == len(batch.timings) == 2
+    assert batch.error is None
+    assert batch.total_time < 1.0
+    inputs = [e for e in fake_backend.events if e[0] != "screenshot"]
+    assert inputs == [("move_to", 7, 7), ("click", 1, "left"), ("write", "done")]
+
+@pytest.mark.asyncio
+async def test_batch_stops_on_error(fake_computer):
+    batch = await fake_computer.batch([{"action": "bogus"}, {"action": "click"}])
+    assert len(batch.results) == 1
+    assert "Unknown action" in batch.error
+
+@pytest.mark.asyncio
+async def test_settle_returns_once_screen_is_stable(fake_computer, fake_backend):
+    def redraw():
+        fake_backend.set_frame(Image.new("RGB", (1440, 900), (0, 0, 0)))
+    asyncio.get_running_loop().call_later(0.1, redraw)
+
+    waited = await fake_computer.wait_for_settle("click")
+    stats = fake_computer.settle.stats.summary()["click"]
+    assert 0.1 <= stats["p50"] < 0.5
+    assert waited >= stats["p50"] + fake_computer.settle.stable_time
+    assert waited < fake_computer.settle.max_wait
+
+@pytest.mark.asyncio
+async def test_settle_gives_up_at_ceiling(fake_computer, fake_backend):
+    frames = iter(range(1000))
+    fake_backend.probe = lambda: Image.new("L", (160, 100), next(frames) * 40 % 256)
+    waited = await fake_computer.settle.wait("hotkey", ceiling=0.3)
+    assert 0.3 <= waited < 0.6
+    assert fake_computer.settle.stats.summary()["hotkey"]["timeouts"] == 1
+
+@pytest.mark.asyncio
+async def test_settle_waits_for_a_late_first_change(fake_computer, fake_backend):
+    await fake_computer(action="click", x=5, y=5)
+    def redraw():
+        fake_backend.set_frame(Image.new("RGB", (1440, 900), (0, 0, 0)))
+    asyncio.get_running_loop().call_later(0.4, redraw)
+
+    waited = await fake_computer.wait_for_settle("click", fallback=0.6)
+    assert waited >= 0.4 + fake_computer.settle.stable_time
+    assert fake_computer.settle.stats.summary()["click"]["p50"] >= 0.35
+
+@pytest.mark.asyncio
+async def test_settle_without_change_is_not_a_sample(fake_computer, fake_backend):
+    await fake_computer(action="click", x=5, y=5)
+    waited = await fake_computer.wait_for_settle("click")
+    assert waited >= fake_computer.settle.quiet_time
+    summary = fake_computer.settle.stats.summary()["click"]
+    assert (summary["count"], summary["quiet"], summary["timeouts"]) == (0, 1, 0)
+
+    # A change made by the action itself, before the first probe, is seen
+    fake_backend.click = lambda *args, **kwargs: fake_backend.frame.paste(0, (0, 0, 50, 50))
+    await fake_computer(action="click", x=5, y=5)
+    waited = await fake_computer.wait_for_settle("click")
+    assert waited < fake_computer.settle.quiet_time
+    assert fake_computer.settle.stats.summary()["click"]["count"] == 1
+
+@pytest.mark.asyncio
+async def test_long_text_is_pasted_and_clipboard_restored(fake_computer, fake_backend):
+    fake_backend.clipboard = "user clipboard"
+    text = "x" * 500
+    result = await fake_computer(action="type", text=text)
+    assert not result.error and result.system is None
+    assert fake_backend.events == [("paste", text)]
+    assert fake_backend.clipboard == "user clipboard"
+
+@pytest.mark.asyncio
+async def test_type_falls_back_to_keys(fake_computer, fake_backend):
+    await fake_computer(action="type", text="x" * 500, strategy="keys")
+    assert fake_backend.events == [("write", "x" * 500)]
+
+    def broken_clipboard(text):
+        raise RuntimeError("no clipboard")
+    fake_backend.set_clipboard = broken_clipboard
+    result = await fake_computer(action="type", text="y" * 500)
+    assert not result.error
+    assert fake_backend.events[-1] == ("write", "y" * 500)
+
+@pytest.mark.asyncio
+async def test_failures_after_the_paste_do_not_type_again(fake_computer, fake_backend):
+    text = "x" * 500
+    set_clipboard = fake_backend.set_clipboard
+    def restore_fails(value):
+        if value != text:
+            raise RuntimeError("clipboard busy")
+        set_clipboard(value)
+    fake_backend.set_clipboard = restore_fails
+    result = await fake_computer(action="type", text=text)
+    assert not result.error
+    assert fake_backend.events == [("paste", text)]
+
+    def unreadable():
+        raise RuntimeError("accessibility denied")
+    fake_backend.focused_text = unreadable
+    fake_backend.set_clipboard = set_clipboard
+    await fake_computer(action="type", text=text)
+    assert [e[0] for e in fake_backend.events] == ["paste", "paste"]
+    assert fake_backend.text == text * 2
+
+@pytest.mark.asyncio
+async def test_ignored_paste_is_typed_instead(fake_computer, fake_backend):
+    fake_backend.accepts_paste = False
+    text = "z" * 500
+    result = await fake_computer(action="type", text=text)
+    assert not result.error
+    assert fake_backend.events == [("paste", text), ("write", text)]
+    assert fake_backend.text == text
+
+    result = await fake_computer(action="type", text=text, strategy="paste")
+    assert result.error == "Paste had no effect on the focused element"
+
+def test_scaler_maps_model_space_to_screen_points():
+    scaler = ScreenScaler((1440, 900), target=(1280, 800), scale_factor=2.0)
+    assert scaler.model_size == (1280, 800)
+    assert scaler.capture_size == (2880, 1800)
+    assert scaler.to_screen(640, 400) == (720, 450)
+    assert scaler.to_model(720, 450) == (640, 400)
+    assert scaler.to_screen(5000, -3) == (1439, 0)
+
+    # The aspect ratio is kept and small screens are never upscaled
+    assert ScreenScaler((1512, 982), target=(1280, 800)).model_size == (1232, 800)
+    assert ScreenScaler((1024, 768), target=(1280, 800)).model_size == (1024, 768)
+    assert ScreenScaler((1440, 900), max_dimension=720).model_size == (720, 450)
+    assert parse_size("1280x800") == (1280, 800)
+    with pytest.raises(ValueError):
+        parse_size("wide")
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fake_backend", [{"scale": 2.0}], indirect=True)
+@pytest.mark.parametrize("fake_computer", [{"model_size": (1280, 800)}], indirect=True)
+async def test_hidpi_screenshots_and_clicks_use_model_space(fake_computer, fake_backend):
+    result = await fake_computer(action="screenshot")
+    with Image.open(io.BytesIO(base64.b64decode(result.base64_image))) as image:
+        assert image.size == (1280, 800)
+
+    await fake_computer(action="click", x=1280 // 2, y=800 // 2)
+    assert ("move_to", 720, 450) in fake_backend.events
+    position = await fake_computer(action="get_position")
+    assert position.output == "Mouse position: 640, 400"
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fake_backend", [{"scale": 2.0}], indirect=True)
+@pytest.mark.parametrize("fake_computer", [{"model_size": (1280, 800)}], indirect=True)
+async def test_region_and_window_capture(fake_computer, fake_backend):
+    fake_backend.frame.paste((255, 0, 0), (720, 450, 760, 490))
+    fake_backend.windows["Notes"] = (100, 50, 400, 300)
+
+    # A model-space region maps to points and comes back zoomed to native density
+    result = await fake_computer(action="screenshot", region=[320, 200, 40, 40], zoom=2)
+    assert ("screenshot", (360, 225, 45, 45)) in fake_backend.events
+    assert result.region == {"x": 320, "y": 200, "width": 40, "height": 40, "scale": 2}
+    assert "is model coordinate (320 + px / 2, 200 + py / 2)" in result.output
+    with Image.open(io.BytesIO(base64.b64decode(result.base64_image))) as image:
+        assert image.size == (80, 80)
+        assert image.convert("RGB").getpixel((0, 0)) == (255, 0, 0)
+
+    # Zoom never exceeds the captured pixel density
+    result = await fake_computer(action="screenshot", region=[0, 0, 40, 40], zoom=4)
+    assert result.region["scale"] == pytest.approx(2.25)
+
+    result = await fake_computer(action="screenshot", window="Notes")
+    assert ("screenshot", (100, 50, 400, 300)) in fake_backend.events
+    assert (result.region["x"], result.region["y"]) == (89, 44)
+
+    assert (await fake_computer(action="screenshot", window="Missing")).error
+    assert (await fake_computer(action="screenshot", region=[2000, 2000, 10, 10])).error
+
+def test_frame_grabber_ring_buffer_and_idle_pause():
+    counter = iter(range(10**6))
+    grabber = FrameGrabber(
+        capture=lambda: Image.new("L", (8, 8), next(counter) % 256),
+        fps=200, buffer_size=3, idle_timeout=0.2
+    ).start()
+    try:
+        first = grabber.wait_for()
+        assert first is not None
+        mark = time.monotonic()
+        later = grabber.wait_for(after=mark)
+        assert later.seq > first.seq and later.timestamp >= mark
+        assert len(grabber.frames()) <= 3
+
+        # Poll rather than sleep a fixed time, so a slow machine cannot fail it
+        deadline = time.monotonic() + 5.0
+        while not grabber.stats()["paused"]:
+            assert time.monotonic() < deadline, "grabber never paused"
+            time.sleep(0.01)
+        # A paused grabber blocks until the next request, so nothing is captured
+        captured = grabber.captured
+        time.sleep(0.05)
+        assert grabber.captured == captured
+
+        # A request wakes the grabber and waits for a new frame
+        assert grabber.wait_for().seq >= captured
+        stats = grabber.stats()
+        assert not stats["paused"] and stats["served"] == 3 and stats["fps"] > 0
+    finally:
+        grabber.stop()
+    assert not grabber.running
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fake_computer", [{"frame_grabber": True}], indirect=True)
+async def test_screenshot_uses_frame_after_last_input(fake_computer, fake_backend):
+    await fake_computer(action="screenshot")
+    # The frame changes before the click returns, so buffered frames are stale
+    fake_backend.frame.paste((0, 0, 255), (0, 0, 50, 50))
+    await fake_computer(action="click", x=10, y=10)
+    result = await fake_computer(action="screenshot")
+    with Image.open(io.BytesIO(base64.b64decode(result.base64_image))) as image:
+        assert image.convert("RGB").getpixel((5, 5)) == (0, 0, 255)
+    assert fake_computer.grabber.wait_for(after=0).timestamp >= fake_computer._last_input
+    assert fake_computer.grabber.stats()["served"] >= 1
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fake_computer", [{"frame_grabber": True}], indirect=True)
+async def test_settle_probes_reuse_grabbed_frames(fake_computer, fake_backend):
+    def direct_probe():
+        raise AssertionError("probed the backend directly")
+    fake_backend.probe = direct_probe
+
+    await fake_computer(action="click", x=10, y=10)
+    served = fake_computer.grabber.served
+    await fake_computer.wait_for_settle("click")
+    assert fake_computer.grabber.served >= served + 2
+    assert fake_computer.settle.stats.summary()["click"]["timeouts"] == 0
+
+def _draw_buttons(image, origin=(0, 0)):
+    draw = ImageDraw.Draw(image)
+    for i in range(12):
+        x, y = origin[0] + i * 70 + 5, origin[1] + 100
+        draw.rectangle((x, y, x + 55, y + 40), outline="black", fill=(i * 20, 100, 200))
+        draw.text((x + 5, y + 10), f"B{i}", fill="black")
+
+def test_locator_finds_template_among_similar_elements():
+    screen = Image.new("RGB", (1000, 600), "white")
+    _draw_buttons(screen)
+    template = Template.from_image(screen.crop((7 * 70, 95, 7 * 70 + 70, 145)))
+    locator = TemplateLocator()
+
+    match = locator.locate(screen, template)
+    assert (match.x, match.y, match.scale) == (490, 95, 1.0)
+    assert match.score > 0.99
+
+    # Coarse-to-fine across scales finds the element on a magnified screen
+    scaled = locator.locate(screen.resize((1100, 660)), template)
+    assert scaled.scale == 1.1 and abs(scaled.x - 539) <= 2
+
+    assert locator.locate(Image.new("RGB", (400, 300), "white"), template) is None
+    assert locator.template("key", lambda: Image.new("L", (4, 4))) is locator.template("key")
+
+@pytest.mark.asyncio
+async def test_locate_and_click_image(fake_computer, fake_backend):
+    _draw_buttons(fake_backend.frame)
+    crop = fake_backend.frame.crop((3 * 70, 95, 3 * 70 + 70, 145))
+    buffer = io.BytesIO()
+    crop.save(buffer, format="PNG")
+    template = base64.b64encode(buffer.getvalue()).decode()
+
+    result = await fake_computer(action="locate", template=template)
+    assert result.match["x"] == 245 and result.match["y"] == 120
+    assert result.match["confidence"] > 0.99
+
+    # Restricted to a region that does not contain the element
+    result = await fake_computer(action="locate", template=template, region=[0, 300, 1000, 300])
+    assert result.error == "Template not found on screen"
+
+    await fake_computer(action="click_image", template=template, click="double_click")
+    assert fake_backend.events[-2:] == [("move_to", 245, 120), ("click", 2, "left")]
+
+    # Falls back to the recorded position when the element is gone
+    fake_backend.frame.paste((255, 255, 255), (0, 0, 1000, 600))
+    result = await fake_computer(action="click_image", template=template, x=10, y=20)
+    assert "recorded position" in result.output
+    assert fake_backend.events[-2:] == [("move_to", 10, 20), ("click", 1, "left")]
@@ -0,0 +1,48 @@
+# tests/test_tracing.py
+import asyncio
+import json
+from src.utils.tracing import Tracer, activate, span, start_span
+
+def test_spans_nest_and_export_as_chrome_trace(tmp_path):
+    tracer = Tracer(session="test")
+
+    async def turn():
+        with span("process_message") as root:
+            with span("llm.request", model="m"):
+                await asyncio.sleep(0.01)
+            streamed = start_span("llm.stream")
+            await asyncio.gather(*(action(i) for i in range(2)))
+            streamed.finish()
+            root.set(path="tools")
+
+    async def action(i):
+        with span("action", action="click", index=i):
+            await asyncio.sleep(0.005)
+
+    with tracer.activate():
+        asyncio.run(turn())
+    # Nothing is recorded once the tracer is no longer active
+    with span("ignored") as ignored:
+        ignored.set(value=1)
+
+    spans = {s.name: s for s in tracer.spans}
+    assert len(tracer.spans) == 5
+    root = spans["process_message"]
+    assert root.attributes == {"path": "tools"}
+    assert spans["llm.request"].parent_id == root.span_id
+    assert all(s.parent_id == root.span_id for s in tracer.spans if s.name == "action")
+    assert spans["llm.request"].duration >= 0.01
+
+    trace = json.loads(tracer.export(str(tmp_path / "trace.json")).read_text())
+    events = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    assert [e["name"] for e in events][0] == "process_message"
+    assert {e["cat"] for e in events} == {"process_message", "llm", "action"}
+    first = next(e for e in events if e["name"] == "action")
+    assert first["args"]["action"] == "click" and first["dur"] > 0
+    # Concurrent actions run on their own task lanes
+    assert len({e["tid"] for e in events if e["name"] == "action"}) == 2
+
+def test_inactive_tracing_is_a_noop():
+    with activate(None), span("anything") as traced:
+        traced.set(bytes=10)
+    assert start_span("stream").finish() is None
@@ -1,7 +1,13 @@
 # tests/test_workflows.py
+import base64
+import json
+import os
 import pytest
 from datetime import datetime
-from src.workflows.models import Workflow, WorkflowStep
+from src.workflows.models import Workflow, WorkflowRun, WorkflowStep
+from PIL import ImageDraw
+from src.agent.workflow_compiler import WorkflowCompiler
+from src.agent.workflow_runner import WorkflowRunner
 from src.tools.results import ToolResult
 
 def test_workflow_creation(workflow_manager):
@@ -58,4 +64,207 @@ async def test_workflow_execution(workflow_manager, computer_tool):
     # Check that success count was incremented
     workflow = workflow_manager.load_workflow(workflow_id)
     assert workflow.success_count == 1
-    assert workflow.last_run is not None
\ No newline at end of file
+    assert workflow.last_run is not None
+
+def _record_workflow(manager, name, description="", tags=None, steps=1):
+    manager.start_recording()
+    for i in range(steps):
+        manager.add_step({"action": "mouse_move", "x": i, "y": i})
+    return manager.save_workflow(name=name, description=description, tags=tags)
+
+def test_catalog_lists_summaries_without_loading_steps(workflow_manager, monkeypatch):
+    _record_workflow(workflow_manager, "Open Safari", "Launch the browser", ["browser"], steps=3)
+    _record_workflow(workflow_manager, "Compose mail", "Write an email", ["mail"])
+
+    def fail(workflow_id):
+        raise AssertionError("list_summaries must not load workflow files")
+    monkeypatch.setattr(workflow_manager, "load_workflow", fail)
+
+    summaries = workflow_manager.list_summaries()
+    assert [s.name for s in summaries] == ["Compose mail", "Open Safari"]
+    assert summaries[1].step_count == 3
+    assert workflow_manager.get_all_tags() == ["browser", "mail"]
+    assert [s.name for s in workflow_manager.list_summaries(tag="mail")] == ["Compose mail"]
+    assert [s.name for s in workflow_manager.list_summaries(query="brow")] == ["Open Safari"]
+
+def test_catalog_tracks_external_changes(workflow_manager, temp_workflow_dir):
+    workflow_id = _record_workflow(workflow_manager, "Original", tags=["a"])
+    path = temp_workflow_dir / f"{workflow_id}.json"
+
+    data = json.loads(path.read_text())
+    data["name"] = "Edited"
+    data["tags"] = ["b"]
+    path.write_text(json.dumps(data))
+    os.utime(path, (path.stat().st_atime, path.stat().st_mtime + 10))
+
+    assert [s.name for s in workflow_manager.list_summaries()] == ["Edited"]
+    assert workflow_manager.get_all_tags() == ["b"]
+
+    path.unlink()
+    assert workflow_manager.list_summaries() == []
+    assert workflow_manager.list_workflows() == []
+
+def test_run_log_records_runs_without_rewriting_workflow(workflow_manager, temp_workflow_dir):
+    workflow_id = _record_workflow(workflow_manager, "Runs", steps=3)
+    path = temp_workflow_dir / f"{workflow_id}.json"
+    before = path.read_text()
+
+    for duration in (1.0, 2.0, 3.0):
+        workflow_manager.record_run(WorkflowRun(
+            workflow_id=workflow_id, success=True, duration=duration,
+            step_timings=[duration / 3] * 3
+        ))
+    workflow_manager.record_run(WorkflowRun(
+        workflow_id=workflow_id, success=False, duration=0.5,
+        failed_step=1, error="boom"
+    ))
+
+    assert path.read_text() == before
+    stats = workflow_manager.get_run_stats(workflow_id)
+    assert stats.run_count == 4
+    assert stats.success_rate == 0.75
+    assert stats.p50_duration == 1.0
+    assert stats.p95_duration == 3.0
+    assert stats.failures_by_step == {1: 1}
+
+    workflow = workflow_manager.load_workflow(workflow_id)
+    assert workflow.success_count == 3
+    assert workflow.last_run is not None
+    summary = workflow_manager.list_summaries()[0]
+    assert (summary.success_count, summary.failure_count) == (3, 1)
+
+def test_update_does_not_persist_run_log_stats(workflow_manager, temp_workflow_dir):
+    workflow_id = _record_workflow(workflow_manager, "Update", steps=2)
+    for _ in range(3):
+        workflow_manager.record_run(WorkflowRun(workflow_id=workflow_id, success=True))
+
+    workflow = workflow_manager.load_workflow(workflow_id)
+    workflow.description = "Edited"
+    workflow_manager.update_workflow(workflow)
+
+    stored = json.loads((temp_workflow_dir / f"{workflow_id}.json").read_text())
+    assert stored["success_count"] == 0
+    assert stored["last_run"] is None
+    reloaded = workflow_manager.load_workflow(workflow_id)
+    assert reloaded.description == "Edited"
+    assert reloaded.success_count == 3
+    assert workflow_manager.list_summaries()[0].success_count == 3
+
+def test_recorded_screenshots_are_stored_by_reference(workflow_manager, temp_workflow_dir):
+    image = base64.b64encode(b"\x89PNG fake screenshot" * 1000).decode()
+    workflow_manager.start_recording()
+    workflow_manager.add_step(
+        {"action": "screenshot"},
+        ToolResult(output="Screenshot taken", base64_image=image, media_type="image/png")
+    )
+    workflow_id = workflow_manager.save_workflow(name="Shots", description="")
+
+    assert image not in (temp_workflow_dir / f"{workflow_id}.json").read_text()
+    step = workflow_manager.load_workflow(workflow_id).steps[0]
+    assert step.result["base64_image"] is None
+    assert step.result["image_ref"].startswith("sha256:")
+    assert workflow_manager.load_step_image(step) == image
+
+def test_migrate_workflows_externalizes_embedded_images(workflow_manager, temp_workflow_dir):
+    image = base64.b64encode(b"legacy" * 5000).decode()
+    legacy = Workflow(
+        name="Legacy",
+        description="",
+        steps=[WorkflowStep(action="screenshot", parameters={},
+                            result={"output": "Screenshot taken", "base64_image": image})]
+    )
+    path = temp_workflow_dir / f"{legacy.id}.json"
+    path.write_text(json.dumps(legacy.dict(), indent=2, default=str))
+    size = path.stat().st_size
+
+    assert workflow_manager.migrate_workflows() == 1
+    assert path.stat().st_size < size / 10
+    step = workflow_manager.load_workflow(legacy.id).steps[0]
+    assert workflow_manager.load_step_image(step) == image
+    assert workflow_manager.migrate_workflows() == 0
+
+def test_compiler_merges_steps_and_drops_unused_screenshots():
+    steps = [
+        WorkflowStep(action="hotkey", parameters={"shortcut": "spotlight"}),
+        WorkflowStep(action="type", parameters={"text": "Safa"}),
+        WorkflowStep(action="type", parameters={"text": "ri"}),
+        WorkflowStep(action="screenshot", parameters={}),
+        WorkflowStep(action="mouse_move", parameters={"x": 10, "y": 10}),
+        WorkflowStep(action="mouse_move", parameters={"x": 200, "y": 100}),
+        WorkflowStep(action="click", parameters={}),
+        WorkflowStep(action="screenshot", parameters={}),
+    ]
+    workflow = Workflow(name="Open Safari", description="", steps=steps)
+    compiler = WorkflowCompiler()
+    plan = compiler.compile(workflow)
+
+    assert [s.action for s in plan.steps] == [
+        {"action": "hotkey", "keys": ["command", "space"]},
+        {"action": "type", "text": "Safari"},
+        {"action": "click", "x": 200, "y": 100},
+        {"action": "screenshot"},
+    ]
+    assert plan.steps[2].source_steps == [4, 5, 6]
+    assert plan.report.dropped_screenshots == 1
+    assert plan.report.compiled_estimate < plan.report.original_estimate
+    assert compiler.compile(workflow) is plan
+
+    workflow.steps[1].parameters["text"] = "Maps"
+    assert compiler.compile(workflow) is not plan
+
+def test_compiler_rejects_invalid_steps():
+    compiler = WorkflowCompiler()
+    bad = Workflow(name="Bad", description="", steps=[
+        WorkflowStep(action="hotkey", parameters={"shortcut": "teleport"})
+    ])
+    with pytest.raises(ValueError, match="Step 0"):
+        compiler.compile(bad)
+
+@pytest.mark.asyncio
+async def test_recorded_click_template_survives_moved_window(workflow_manager, fake_computer, fake_backend):
+    draw = ImageDraw.Draw(fake_backend.frame)
+    draw.rectangle((300, 200, 380, 230), outline="black", fill=(40, 120, 220))
+    draw.text((310, 210), "Submit", fill="white")
+
+    fake_computer.record_templates = lambda: workflow_manager.is_recording
+    workflow_manager.start_recording()
+    result = await fake_computer(action="click", x=340, y=215)
+    workflow_manager.add_step(
+        {"action": "click", "x": 340, "y": 215}, result, model_size=fake_computer.scaler.model_size
+    )
+    workflow_id = workflow_manager.save_workflow(name="Submit", description="")
+
+    step = workflow_manager.load_workflow(workflow_id).steps[0]
+    assert step.parameters["template"] in workflow_manager.screenshots
+    assert step.result["template"] is None
+
+    # The window moved 25 points right and 12 down
+    fake_backend.frame.paste((255, 255, 255), (0, 0, *fake_backend.frame.size))
+    draw.rectangle((325, 212, 405, 242), outline="black", fill=(40, 120, 220))
+    draw.text((335, 222), "Submit", fill="white")
+    workflow_manager.stop_recording()
+
+    result = await WorkflowRunner(workflow_manager, fake_computer).run(workflow_id)
+    assert not result.error and "confidence 1.00" in result.output
+    assert fake_backend.events[-2:] == [("move_to", 365, 227), ("click", 1, "left")]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fake_computer", [{"model_size": (720, 450)}], indirect=True)
+async def test_replay_rescales_coordinates_recorded_in_another_space(
+    workflow_manager, fake_computer, fake_backend
+):
+    workflow_manager.start_recording()
+    workflow_manager.add_step({"action": "mouse_move", "x": 640, "y": 400}, model_size=(1280, 800))
+    recorded = workflow_manager.save_workflow(name="Recorded at 1280x800", description="")
+
+    # Recorded before the model size was stored, in screen points
+    workflow_manager.start_recording()
+    workflow_manager.add_step({"action": "mouse_move", "x": 720, "y": 450})
+    legacy = workflow_manager.save_workflow(name="Legacy", description="")
+    assert workflow_manager.load_workflow(legacy).model_size is None
+
+    runner = WorkflowRunner(workflow_manager, fake_computer)
+    for workflow_id in (recorded, legacy):
+        fake_backend.events.clear()
+        assert not (await runner.run(workflow_id)).error
+        assert fake_backend.events == [("move_to", 720, 450)]